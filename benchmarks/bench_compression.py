@@ -0,0 +1,59 @@
+"""
+End-to-end throughput with compressed files: ingest of the same export as
+plain CSV, .csv.gz, .csv.bz2 and .csv.xz (decoded while streaming), and the
+report engine writing plain against compressed reports.
+
+Run from the project root:
+    python -m benchmarks.bench_compression [row_count]
+"""
+import bz2
+import gzip
+import lzma
+import os
+import sys
+import tempfile
+from src import ingest, reports, transform
+from src.cohorts import at_risk_rule
+from .bench_ingest import QUIZ_COUNT, write_sample_csv, best_of
+
+COMPRESSORS = {'gzip': gzip.compress, 'bz2': bz2.compress, 'xz': lzma.compress}
+EXTENSIONS = {None: '', 'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, 'input.csv')
+        write_sample_csv(plain_path, n, bad_rate=0.0)
+        with open(plain_path, 'rb') as f:
+            content = f.read()
+        inputs = {None: plain_path}
+        for codec, compress in COMPRESSORS.items():
+            inputs[codec] = plain_path + EXTENSIONS[codec]
+            with open(inputs[codec], 'wb') as f:
+                f.write(compress(content))
+
+        print(f"{n:,} rows, {len(content) / 1e6:.1f} MB of CSV")
+        print("Ingest (read + validate, streamed):")
+        for codec, path in inputs.items():
+            seconds = best_of(lambda: ingest.read_and_validate_csv(path, QUIZ_COUNT, as_table=True), 1)
+            print(f"  {codec or 'plain':<6} {os.path.getsize(path) / 1e6:7.1f} MB on disk  "
+                  f"{seconds:6.2f}s  {n / seconds:>10,.0f} rows/s")
+
+        records, _ = ingest.read_and_validate_csv(plain_path, QUIZ_COUNT, as_table=True)
+        transform.compute_weighted_grade(records, {"quizzes": 0.3, "midterm": 0.3, "final": 0.3, "attendance": 0.1},
+                                         QUIZ_COUNT)
+        transform.assign_letter_grade(records, {"A": 90, "B": 80, "C": 70, "D": 60})
+        at_risk = at_risk_rule(65, 80).evaluate(records).select(records)
+        print("Reports (render + write, 4 threads):")
+        for codec in inputs:
+            output_dir = os.path.join(tmp, f"reports-{codec or 'plain'}")
+            os.makedirs(output_dir)
+            summary = {}
+
+            def write():
+                summary.update(reports.write_reports(records, at_risk, output_dir, workers=4, compression=codec))
+            seconds = best_of(write, 1)
+            print(f"  {codec or 'plain':<6} {summary['bytes'] / 1e6:7.1f} MB written  {seconds:6.2f}s")
+
+if __name__ == "__main__":
+    main()
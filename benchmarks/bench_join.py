@@ -0,0 +1,76 @@
+"""
+Multi-source join: one wide export split into roster, scores and attendance
+files (shuffled), joined back in memory, with an external sort spilling
+runs of a tenth of the rows, and as presorted files merged directly.
+Peak traced memory shows what the spilled sort saves.
+
+Run from the project root:
+    python -m benchmarks.bench_join [row_count]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from src.join import join_sources
+from .bench_ingest import write_sample_csv, best_of
+
+GROUPS = {
+    'roster': ['last_name', 'first_name', 'section'],
+    'scores': ['quiz1', 'quiz2', 'quiz3', 'quiz4', 'quiz5', 'midterm', 'final'],
+    'attendance': ['attendance_percent'],
+}
+
+def split_sources(wide_path: str, directory: str, shuffle: bool) -> list:
+    with open(wide_path, newline='', encoding='utf-8') as f:
+        header, *rows = list(csv.reader(f))
+    if shuffle:
+        random.Random(7).shuffle(rows)
+    paths = []
+    for name, columns in GROUPS.items():
+        positions = [header.index('student_id')] + [header.index(column) for column in columns]
+        path = os.path.join(directory, f"{name}.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['student_id'] + columns)
+            writer.writerows([row[p] for p in positions] for row in rows)
+        paths.append(path)
+    return paths
+
+def measure(func):
+    """(seconds, peak traced MB): timed untraced, since tracemalloc slows the run down several times."""
+    seconds = best_of(func, 1)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        wide = os.path.join(tmp, 'wide.csv')
+        write_sample_csv(wide, n, bad_rate=0.0)  # datagen writes ids in order
+        shuffled_dir = os.path.join(tmp, 'shuffled')
+        sorted_dir = os.path.join(tmp, 'sorted')
+        os.makedirs(shuffled_dir)
+        os.makedirs(sorted_dir)
+        shuffled = split_sources(wide, shuffled_dir, shuffle=True)
+        in_order = split_sources(wide, sorted_dir, shuffle=False)
+        output = os.path.join(tmp, 'joined.csv')
+
+        runs = [
+            ('in-memory sort', lambda: join_sources(shuffled, output)),
+            (f'external sort ({n // 10:,} rows/run)',
+             lambda: join_sources(shuffled, output, memory_rows=max(n // 10, 1), temp_dir=tmp)),
+            ('presorted merge', lambda: join_sources(in_order, output, presorted=True)),
+        ]
+        results = [(name, *measure(run)) for name, run in runs]
+
+    print(f"{n:,} students in 3 files")
+    for name, seconds, peak in results:
+        print(f"  {name:<30}: {seconds:6.2f}s  {n / seconds:>10,.0f} rows/s  peak {peak:7.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Live grade corrections: cost of one student's grade update followed by the
+class statistics, through StudentIndex.update_student (its grade index is a
+RankedColumn, src/ranking.py) against what it replaces: calculate_statistics
+over the records after every correction, and a bisect-patched sorted list
+summarised by a SortedColumn (watch mode before). Also times rank,
+percentile and top-10 queries on the index.
+
+Run from the project root:
+    python -m benchmarks.bench_ranking [row_count] [updates]
+"""
+import bisect
+import random
+import sys
+import time
+from src import analyze
+from src.analyze import SortedColumn
+from src.index import StudentIndex
+from src.ranking import RankedColumn
+
+def per_call(func, calls: int) -> float:
+    """Mean seconds per call over 'calls' calls of func(i)."""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(5)
+    records = [{'student_id': i, 'final_grade': round(rng.uniform(40, 100), 4)} for i in range(n)]
+    changes = [(rng.randrange(n), round(rng.uniform(40, 100), 4)) for _ in range(updates)]
+
+    def rescan(i):
+        position, grade = changes[i]
+        records[position]['final_grade'] = grade
+        analyze.calculate_statistics(records, 'final_grade')
+    rescan_time = per_call(rescan, min(updates, 20))
+
+    grades = sorted(row['final_grade'] for row in records)
+    current = [row['final_grade'] for row in records]
+
+    def patched_list(i):
+        position, grade = changes[i]
+        del grades[bisect.bisect_left(grades, current[position])]
+        bisect.insort(grades, grade)
+        current[position] = grade
+        SortedColumn(list(grades)).summary()
+    patched_time = per_call(patched_list, min(updates, 200))
+
+    build_start = time.perf_counter()
+    live = StudentIndex(records)
+    build_time = time.perf_counter() - build_start
+
+    def ranked(i):
+        student_id, grade = changes[i]
+        live.update_student(student_id, {'final_grade': grade})
+        live.statistics()
+    ranked_time = per_call(ranked, updates)
+    ids = [rng.randrange(n) for _ in range(1000)]
+    rank_time = per_call(lambda i: live.rank(ids[i]), len(ids))
+    percentile_time = per_call(lambda i: live.percentiles([i % 100]), 1000)
+    top_time = per_call(lambda i: live.top(10), 1000)
+
+    column = RankedColumn(row['final_grade'] for row in records)
+    assert column.summary() == analyze.calculate_statistics(records, 'final_grade')
+
+    print(f"{n:,} students, one grade corrected, then the class statistics:")
+    print(f"  calculate_statistics rescan : {rescan_time * 1e3:9.3f} ms per update")
+    print(f"  bisect list + SortedColumn  : {patched_time * 1e3:9.3f} ms per update")
+    print(f"  StudentIndex.update_student : {ranked_time * 1e3:9.3f} ms per update "
+          f"(x{rescan_time / ranked_time:,.0f} vs rescan; built once in {build_time:.2f}s)")
+    print(f"  rank {rank_time * 1e6:.1f} us, percentile {percentile_time * 1e6:.1f} us, "
+          f"top 10 {top_time * 1e6:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Report writing with many sections: the sequential exporters (one DictWriter
+per file, separate at-risk pass) against the write_reports engine
+(one grouping, files rendered in memory, written atomically by a thread pool).
+
+Run from the project root:
+    python -m benchmarks.bench_reports [row_count] [section_count]
+"""
+import sys
+import tempfile
+from src import analyze, reports, transform
+from .bench_ingest import best_of
+from .compare_table import make_rows, WEIGHTS, CUTOFFS, QUIZ_COUNT
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    section_count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    rows = make_rows(n)
+    for i, row in enumerate(rows):
+        row['section'] = f'S{i % section_count:03d}'
+    transform.compute_weighted_grade(rows, WEIGHTS, QUIZ_COUNT)
+    transform.assign_letter_grade(rows, CUTOFFS)
+    at_risk, _ = analyze.find_at_risk_students(rows, 65, 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def sequential():
+            reports.export_at_risk_csv(at_risk, tmp)
+            reports.export_section_reports(rows, tmp)
+
+        old = best_of(sequential)
+        timings = {workers: best_of(lambda: reports.write_reports(rows, at_risk, tmp, workers=workers))
+                   for workers in (1, 4)}
+
+    print(f"\n{n:,} rows, {section_count} sections")
+    print(f"  sequential exporters : {old:7.3f}s")
+    for workers, seconds in timings.items():
+        print(f"  write_reports x{workers}     : {seconds:7.3f}s  (x{old / seconds:.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Load time of the cleaned records: parsing the CSV again against opening the
+binary snapshot (memory-mapped, checksum verified).
+
+Run from the project root:
+    python -m benchmarks.bench_snapshot [row_count]
+"""
+import os
+import sys
+import tempfile
+from src import ingest
+from src.cache import stage_key
+from src.snapshot import load_snapshot, write_snapshot
+from .bench_ingest import QUIZ_COUNT, write_sample_csv, best_of
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'input.csv')
+        snapshot_path = os.path.join(tmp, 'records.snapshot')
+        write_sample_csv(csv_path, n, bad_rate=0.0)
+        key = stage_key('ingest', 'bench', QUIZ_COUNT)
+
+        records, _ = ingest.read_and_validate_csv(csv_path, QUIZ_COUNT, as_table=True)
+        size = write_snapshot(records, snapshot_path, key)
+        assert load_snapshot(snapshot_path, key).to_rows() == records.to_rows()
+
+        from_csv = best_of(lambda: ingest.read_and_validate_csv(csv_path, QUIZ_COUNT, as_table=True), 1)
+        from_snapshot = best_of(lambda: load_snapshot(snapshot_path, key))
+
+    print(f"{n:,} rows, snapshot {size / 1e6:.1f} MB")
+    print(f"  parse CSV     : {from_csv:7.3f}s")
+    print(f"  load snapshot : {from_snapshot:7.3f}s  (x{from_csv / from_snapshot:.0f})")
+
+if __name__ == "__main__":
+    main()
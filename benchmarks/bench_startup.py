@@ -0,0 +1,97 @@
+"""
+Cold-start budget for the CLI: how long importing what `python -m src
+lookup/stats/at-risk` needs takes, measured with `python -X importtime`
+in a fresh interpreter.
+
+Fails (exit 1) when that import time is over the budget, or when one of
+the heavy modules (NumPy, ingest, transform, reports, the menu) gets
+imported on that path, e.g. because a new optional backend is imported at
+module level somewhere.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [--budget-ms 100] [--repeats 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+# What the lightweight commands import: the CLI, then the saved results, the SQLite store and the analysis
+LIGHT_MODULES = ['src.cli', 'src.results', 'src.store', 'src.analyze']
+# Must never be imported by those commands
+FORBIDDEN = ['numpy', 'src.ingest', 'src.transform', 'src.transform_numpy', 'src.reports',
+             'src.main', 'concurrent.futures']
+# Reference point: the full menu module with every pipeline stage
+FULL_MODULES = ['src.main']
+
+DEFAULT_BUDGET_MS = 100.0
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_profile(modules: List[str]) -> List[Tuple[str, int, int, int]]:
+    """
+    Imports 'modules' in a fresh interpreter with -X importtime.
+    Returns (module, self us, cumulative us, nesting depth) per import, in the
+    order they finished.
+    """
+    statement = "; ".join(f"import {name}" for name in modules)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def project_import_us(entries: List[Tuple[str, int, int, int]]) -> int:
+    """Total time of the project's own top-level imports (children included)."""
+    return sum(cumulative for name, _, cumulative, depth in entries
+               if depth == 0 and (name == 'src' or name.startswith('src.')))
+
+def best_import_ms(modules: List[str], repeats: int) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """Best-of-N import time in ms, plus the profile of that best run."""
+    best = None
+    for _ in range(repeats):
+        entries = import_profile(modules)
+        ms = project_import_us(entries) / 1000
+        if best is None or ms < best[0]:
+            best = (ms, entries)
+    return best
+
+def forbidden_imports(entries: List[Tuple[str, int, int, int]]) -> List[str]:
+    names = {name for name, _, _, _ in entries}
+    return [name for name in FORBIDDEN if name in names]
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeats", type=int, default=5, help="best of this many fresh interpreters")
+    args = parser.parse_args(argv)
+
+    light_ms, entries = best_import_ms(LIGHT_MODULES, args.repeats)
+    full_ms, _ = best_import_ms(FULL_MODULES, args.repeats)
+
+    print(f"CLI commands ({', '.join(LIGHT_MODULES)}): {light_ms:7.1f} ms  (budget {args.budget_ms:g} ms)")
+    print(f"Full menu    ({', '.join(FULL_MODULES)}): {full_ms:14.1f} ms")
+    print("Slowest imports on the CLI path (self time):")
+    for name, self_us, _, _ in sorted(entries, key=lambda entry: entry[1], reverse=True)[:5]:
+        print(f"  {self_us / 1000:6.2f} ms  {name}")
+
+    failed = False
+    heavy = forbidden_imports(entries)
+    if heavy:
+        print(f"FAIL: the CLI path imports {', '.join(heavy)}")
+        failed = True
+    if light_ms > args.budget_ms:
+        print(f"FAIL: {light_ms:.1f} ms is over the {args.budget_ms:g} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
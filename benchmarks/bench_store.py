@@ -0,0 +1,65 @@
+"""
+The SQLite student store: bulk-load time, reload time against re-running
+ingest + transform on the CSV, and indexed queries against Python scans
+over the records.
+
+The Python side works on records already in memory; the store answers
+without loading them at all, which is what the CLI needs.
+
+Run from the project root:
+    python -m benchmarks.bench_store [row_count]
+"""
+import os
+import sys
+import tempfile
+from src import analyze, ingest, transform
+from src.cohorts import at_risk_rule
+from src.store import StudentStore, write_store
+from .bench_ingest import QUIZ_COUNT, write_sample_csv, best_of
+
+WEIGHTS = {"quizzes": 0.30, "midterm": 0.30, "final": 0.30, "attendance": 0.10}
+CUTOFFS = {"A": 90, "B": 80, "C": 70, "D": 60}
+
+def csv_pipeline(csv_path: str):
+    """What the store replaces: parse, validate and grade the CSV again."""
+    records, _ = ingest.read_and_validate_csv(csv_path, QUIZ_COUNT, as_table=True)
+    transform.compute_weighted_grade(records, WEIGHTS, QUIZ_COUNT)
+    transform.assign_letter_grade(records, CUTOFFS)
+    return records
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'input.csv')
+        db_path = os.path.join(tmp, 'students.db')
+        write_sample_csv(csv_path, n, bad_rate=0.0)
+        records = csv_pipeline(csv_path)
+        some_ids = list(records.student_id[::max(n // 20, 1)])
+        wanted = set(some_ids)
+
+        load = best_of(lambda: write_store(records, db_path, 'bench'), 1)
+        from_csv = best_of(lambda: csv_pipeline(csv_path), 1)
+        with StudentStore(db_path) as store:
+            reload = best_of(store.to_table, 1)
+            timings = [
+                ('lookup 20 ids', lambda: store.lookup(some_ids),
+                 lambda: [records[i] for i, student_id in enumerate(records.student_id) if student_id in wanted]),
+                ('at-risk', lambda: store.at_risk(65, 80),
+                 lambda: at_risk_rule(65, 80).evaluate(records).select(records)),
+                ('at-risk top 20', lambda: (store.count_at_risk(65, 80), store.at_risk(65, 80, limit=20)),
+                 lambda: records.take(at_risk_rule(65, 80).evaluate(records).positions()[:20])),
+                ('section stats', lambda: store.section_statistics(),
+                 lambda: analyze.grouped_statistics(records)),
+            ]
+            results = [(name, best_of(sql), best_of(python, 1)) for name, sql, python in timings]
+        size = os.path.getsize(db_path)
+
+    print(f"{n:,} rows, database {size / 1e6:.1f} MB")
+    print(f"  bulk load        : {load:7.3f}s")
+    print(f"  re-run CSV stages: {from_csv:7.3f}s")
+    print(f"  reload store     : {reload:7.3f}s  (x{from_csv / reload:.1f})")
+    for name, sql, python in results:
+        print(f"  {name:<15}: SQL {sql:7.4f}s  Python {python:7.4f}s  (x{python / sql:.1f})")
+
+if __name__ == "__main__":
+    main()
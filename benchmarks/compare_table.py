@@ -0,0 +1,62 @@
+"""
+Memory / throughput comparison: list of dicts (StudentData) vs StudentTable.
+
+Run from the project root:
+    python -m benchmarks.compare_table [row_count]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from src import transform, analyze
+from src.table import StudentTable
+
+WEIGHTS = {"quizzes": 0.30, "midterm": 0.30, "final": 0.30, "attendance": 0.10}
+CURVE = {"apply_curve": True, "target_max_grade": 100, "curve_cap": 100}
+CUTOFFS = {"A": 90, "B": 80, "C": 70, "D": 60}
+QUIZ_COUNT = 5
+
+def make_rows(n: int, seed: int = 7):
+    """Builds n cleaned rows, shaped like ingest output (about 5% missing scores)."""
+    rng = random.Random(seed)
+    fields = [f'quiz{i}' for i in range(1, QUIZ_COUNT + 1)] + ['midterm', 'final', 'attendance_percent']
+    rows = []
+    for i in range(n):
+        row = {
+            'student_id': i + 1,
+            'last_name': f'Last{i}',
+            'first_name': f'First{i}',
+            'section': f'S{i % 40:02d}',
+        }
+        for field in fields:
+            row[field] = None if rng.random() < 0.05 else float(rng.randint(40, 100))
+        rows.append(row)
+    return rows
+
+def measure(label, build):
+    """Builds the data under tracemalloc, then times the transform + analysis stages."""
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    transform.compute_weighted_grade(data, WEIGHTS, QUIZ_COUNT)
+    transform.apply_grade_curve(data, CURVE)
+    transform.assign_letter_grade(data, CUTOFFS)
+    analyze.calculate_statistics(data, 'final_grade')
+    analyze.find_at_risk_students(data, 65, 80)
+    elapsed = time.perf_counter() - start
+
+    n = len(data)
+    print(f"{label:<14} memory: {current / 1e6:8.1f} MB  "
+          f"({current / n:6.0f} B/row)  pipeline: {elapsed:6.3f}s  ({n / elapsed:,.0f} rows/s)")
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Comparing representations on {n:,} rows\n")
+    measure("list of dicts", lambda: make_rows(n))
+    measure("StudentTable", lambda: StudentTable.from_rows(make_rows(n), QUIZ_COUNT))
+
+if __name__ == "__main__":
+    main()
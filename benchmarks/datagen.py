@@ -0,0 +1,79 @@
+"""
+Deterministic synthetic class data, shaped like data/input.csv.
+
+The same arguments (and seed) always give the same file, byte for byte.
+Rows are written as they are generated, so 10^7 rows need no extra memory.
+
+Run from the project root:
+    python -m benchmarks.datagen OUTPUT.csv [--rows N] [--quiz-count Q]
+        [--missing-rate R] [--bad-rate R] [--sections S] [--seed SEED]
+"""
+import argparse
+import csv
+import random
+from typing import Iterator, List
+
+def header(quiz_count: int) -> List[str]:
+    return (
+        ['student_id', 'last_name', 'first_name', 'section']
+        + [f'quiz{i}' for i in range(1, quiz_count + 1)]
+        + ['midterm', 'final', 'attendance_percent']
+    )
+
+def generate_rows(
+    rows: int,
+    quiz_count: int = 5,
+    missing_rate: float = 0.01,
+    bad_rate: float = 0.0,
+    sections: int = 40,
+    seed: int = 11
+) -> Iterator[List[str]]:
+    """
+    Yields CSV rows (as lists of strings, header not included).
+      missing_rate: chance that any one score is blank
+      bad_rate:     chance that a row gets one out-of-range score (105 or -5),
+                    so ingest rejects it
+      sections:     number of distinct sections (S0001, S0002, ...)
+    """
+    rng = random.Random(seed)
+    score_count = quiz_count + 3
+    for i in range(rows):
+        scores = [
+            '' if rng.random() < missing_rate else str(rng.randint(40, 100))
+            for _ in range(score_count)
+        ]
+        if rng.random() < bad_rate:
+            scores[rng.randrange(score_count)] = rng.choice(('105', '-5'))
+        yield [str(i + 1), f'Last{i}', f'First{i}', f'S{rng.randrange(sections) + 1:04d}'] + scores
+
+def write_csv(
+    path: str,
+    rows: int,
+    quiz_count: int = 5,
+    missing_rate: float = 0.01,
+    bad_rate: float = 0.0,
+    sections: int = 40,
+    seed: int = 11
+) -> None:
+    """Writes generate_rows(...) to 'path' with a header line."""
+    with open(path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header(quiz_count))
+        writer.writerows(generate_rows(rows, quiz_count, missing_rate, bad_rate, sections, seed))
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic class CSV.")
+    parser.add_argument("output")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--quiz-count", type=int, default=5)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--bad-rate", type=float, default=0.0)
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.quiz_count, args.missing_rate,
+              args.bad_rate, args.sections, args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
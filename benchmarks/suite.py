@@ -0,0 +1,203 @@
+"""
+Benchmark suite: times every pipeline stage on synthetic data of several
+sizes, records the results as JSON and can gate on regressions.
+
+Run from the project root:
+    # time the stages at 10^3..10^5 rows and save the results
+    python -m benchmarks.suite run --sizes 1e3,1e4,1e5 --output bench.json
+
+    # same, then fail (exit 1) if any stage is >25% slower than a baseline
+    python -m benchmarks.suite run --sizes 1e3,1e4,1e5 --output new.json \
+        --compare baseline.json --threshold 0.25
+
+    # compare two saved result files
+    python -m benchmarks.suite compare baseline.json new.json --threshold 0.25
+
+Stages (in pipeline order, each timed on the output of the previous one):
+    read_and_validate_csv, compute_weighted_grade, apply_grade_curve,
+    assign_letter_grade, calculate_statistics, find_at_risk_students,
+    export_reports (at-risk + section reports)
+
+Synthetic CSVs are written once per size into --data-dir and reused.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple
+from src import analyze, ingest, reports, transform
+from . import datagen
+
+QUIZ_COUNT = 5
+WEIGHTS = {"quizzes": 0.30, "midterm": 0.30, "final": 0.30, "attendance": 0.10}
+CURVE = {"apply_curve": True, "target_max_grade": 100, "curve_cap": 100}
+CUTOFFS = {"A": 90, "B": 80, "C": 70, "D": 60}
+THRESHOLDS = {"at_risk_grade": 65, "at_risk_attendance": 80}
+
+STAGES = [
+    'read_and_validate_csv', 'compute_weighted_grade', 'apply_grade_curve',
+    'assign_letter_grade', 'calculate_statistics', 'find_at_risk_students',
+    'export_reports',
+]
+
+# Differences smaller than this are timer noise, never a regression
+MIN_REGRESSION_SECONDS = 0.005
+
+def dataset_path(data_dir: str, rows: int, args: argparse.Namespace) -> str:
+    """Generates the CSV for this size (once) and returns its path."""
+    name = (f"synthetic_{rows}_q{args.quiz_count}_m{args.missing_rate}"
+            f"_b{args.bad_rate}_s{args.sections}_seed{args.seed}.csv")
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        datagen.write_csv(path + '.tmp', rows, args.quiz_count, args.missing_rate,
+                          args.bad_rate, args.sections, args.seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+def time_pipeline(csv_path: str, quiz_count: int, as_table: bool, output_dir: str) -> Dict[str, float]:
+    """One timed pass through every stage. Stage output (prints) is discarded."""
+    timings: Dict[str, float] = {}
+
+    def timed(stage, func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings[stage] = time.perf_counter() - start
+        return result
+
+    records, _ = timed('read_and_validate_csv', ingest.read_and_validate_csv,
+                       csv_path, quiz_count, as_table=as_table)
+    timed('compute_weighted_grade', transform.compute_weighted_grade, records, WEIGHTS, quiz_count)
+    timed('apply_grade_curve', transform.apply_grade_curve, records, CURVE)
+    timed('assign_letter_grade', transform.assign_letter_grade, records, CUTOFFS)
+    timed('calculate_statistics', analyze.calculate_statistics, records, 'final_grade')
+    at_risk, _ = timed('find_at_risk_students', analyze.find_at_risk_students, records,
+                       THRESHOLDS["at_risk_grade"], THRESHOLDS["at_risk_attendance"])
+
+    def export_reports():
+        reports.export_at_risk_csv(at_risk, output_dir)
+        reports.export_section_reports(records, output_dir)
+    timed('export_reports', export_reports)
+    return timings
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Best-of-N seconds per (size, stage), plus rows/sec, with machine metadata."""
+    transform.set_backend(args.backend)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for rows in args.sizes:
+        csv_path = dataset_path(args.data_dir, rows, args)
+        best: Dict[str, float] = {}
+        with tempfile.TemporaryDirectory() as output_dir:
+            for _ in range(args.repeats):
+                for stage, seconds in time_pipeline(csv_path, args.quiz_count, args.table, output_dir).items():
+                    best[stage] = min(seconds, best.get(stage, seconds))
+        results[str(rows)] = {
+            stage: {'seconds': round(seconds, 6), 'rows_per_sec': round(rows / seconds) if seconds else None}
+            for stage, seconds in best.items()
+        }
+        print(f"{rows:>10,} rows: " + ", ".join(f"{stage} {best[stage]:.4f}s" for stage in STAGES))
+
+    return {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'backend': transform.BACKEND,
+            'table': args.table,
+            'repeats': args.repeats,
+            'dataset': {'quiz_count': args.quiz_count, 'missing_rate': args.missing_rate,
+                        'bad_rate': args.bad_rate, 'sections': args.sections, 'seed': args.seed},
+        },
+        'results': results,
+    }
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float
+) -> List[Tuple[str, str, float, float, bool]]:
+    """
+    (size, stage, baseline seconds, current seconds, regressed) for every
+    (size, stage) in both files. A stage regresses when it is more than
+    'threshold' (0.25 = 25%) slower and the difference is above timer noise.
+    """
+    rows = []
+    for size, stages in current['results'].items():
+        for stage, entry in stages.items():
+            old = baseline['results'].get(size, {}).get(stage)
+            if old is None:
+                continue
+            before, after = old['seconds'], entry['seconds']
+            regressed = after > before * (1 + threshold) and after - before > MIN_REGRESSION_SECONDS
+            rows.append((size, stage, before, after, regressed))
+    return rows
+
+def print_comparison(rows: List[Tuple[str, str, float, float, bool]], threshold: float) -> bool:
+    """Prints the comparison table; returns True if anything regressed."""
+    print(f"\n{'Rows':>10}  {'Stage':<24}{'Baseline':>10}{'Current':>10}{'Change':>9}")
+    for size, stage, before, after, regressed in rows:
+        change = (after / before - 1) if before else 0.0
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{int(size):>10,}  {stage:<24}{before:>10.4f}{after:>10.4f}{change:>+9.1%}{flag}")
+    regressions = sum(row[4] for row in rows)
+    print(f"\n{regressions} regression(s) past {threshold:.0%}")
+    return regressions > 0
+
+def _parse_sizes(text: str) -> List[int]:
+    return [int(float(part)) for part in text.split(',') if part]
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time every stage and save the results as JSON")
+    run.add_argument("--sizes", type=_parse_sizes, default=_parse_sizes("1e3,1e4,1e5"),
+                     help="comma separated row counts, e.g. 1e3,1e5,1e7")
+    run.add_argument("--repeats", type=int, default=3, help="best of this many runs per size")
+    run.add_argument("--output", default="bench_results.json")
+    run.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "pupqc_bench_data"))
+    run.add_argument("--backend", default="auto", choices=["auto", "numpy", "python"])
+    run.add_argument("--table", action="store_true", help="ingest into a StudentTable instead of dicts")
+    run.add_argument("--quiz-count", type=int, default=QUIZ_COUNT)
+    run.add_argument("--missing-rate", type=float, default=0.01)
+    run.add_argument("--bad-rate", type=float, default=0.01)
+    run.add_argument("--sections", type=int, default=40)
+    run.add_argument("--seed", type=int, default=11)
+    run.add_argument("--compare", metavar="BASELINE", help="fail if slower than this result file")
+    run.add_argument("--threshold", type=float, default=0.25)
+
+    compare = commands.add_parser("compare", help="compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.25)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        current = run_suite(args)
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.output}")
+        if not args.compare:
+            return 0
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+
+    regressed = print_comparison(compare_results(baseline, current, args.threshold), args.threshold)
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
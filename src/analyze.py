@@ -1,70 +1,408 @@
+import math
+import random
 from typing import List, Dict, Any, Tuple
+from .table import StudentTable
 
 # Type Aliases for clarity
 StudentRow = Dict[str, Any]
 StudentData = List[StudentRow]
 
-def calculate_statistics(student_data: StudentData, field: str) -> Dict[str, float | None]:
+def _project_values(student_data: StudentData | StudentTable, field: str) -> List[float]:
     """
-    Calculates mean, median, min, and max for a given numeric field,
-    ignoring 'None' values.
+    Projects one numeric field to a plain list, skipping None values.
+    A StudentTable already stores the field as a column, so it is read directly.
     """
-    # 1. Project: Create a new array (list) of only the values we need
-    # This is a core array operation.
-    values = [row[field] for row in student_data if row.get(field) is not None]
-    
-    if not values:
-        return {'mean': None, 'median': None, 'min': None, 'max': None}
+    if isinstance(student_data, StudentTable):
+        return student_data.values(field)
+    return [row[field] for row in student_data if row.get(field) is not None]
+
+class SortedColumn:
+    """
+    One numeric field, sorted once, that answers every summary question.
 
-    # 2. Sort: An essential array operation for median, min, and max
-    values.sort()
+    Sorting is the only O(N log N) step; after that min, max, mean and median
+    are O(1) and a batch of k percentiles is O(k). Build it with
+    sorted_column() so a StudentTable reuses it until the table changes.
+    """
 
-    # 3. Calculate Mean
-    mean = sum(values) / len(values)
-    
-    # 4. Calculate Median
-    median = 0.0
-    n = len(values)
-    if n % 2 == 1:
-        # Odd number of elements
-        median = values[n // 2]
-    else:
+    def __init__(self, values: List[float]):
+        # Takes ownership of 'values' and sorts it in place
+        values.sort()
+        self.values = values
+        self.count = len(values)
+        # Summed in sorted order, exactly like calculate_statistics always did
+        self.total = sum(values)
+
+    @property
+    def min(self) -> float | None:
+        return self.values[0] if self.values else None
+
+    @property
+    def max(self) -> float | None:
+        return self.values[-1] if self.values else None
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.values else None
+
+    @property
+    def median(self) -> float | None:
+        n = self.count
+        if not n:
+            return None
+        if n % 2 == 1:
+            # Odd number of elements
+            return self.values[n // 2]
         # Even number of elements
-        mid1 = values[n // 2 - 1]
-        mid2 = values[n // 2]
-        median = (mid1 + mid2) / 2
-        
-    # 5. Min and Max
-    min_val = values[0]
-    max_val = values[-1]
+        return (self.values[n // 2 - 1] + self.values[n // 2]) / 2
+
+    def percentile(self, percentile: float) -> float | None:
+        """Nearest-rank percentile, same rule as find_percentile."""
+        if not self.values:
+            return None
+        return self.values[_nearest_rank(self.count, percentile)]
+
+    def percentiles(self, percentiles: List[float]) -> Dict[float, float | None]:
+        """Any batch of percentiles, O(1) each."""
+        return {p: self.percentile(p) for p in percentiles}
 
-    return {
-        'mean': round(mean, 2),
-        'median': round(median, 2),
-        'min': round(min_val, 2),
-        'max': round(max_val, 2)
-    }
+    def summary(self) -> Dict[str, float | None]:
+        """The dict calculate_statistics returns."""
+        if not self.values:
+            return {'mean': None, 'median': None, 'min': None, 'max': None}
+        return {
+            'mean': round(self.mean, 2),
+            'median': round(self.median, 2),
+            'min': round(self.min, 2),
+            'max': round(self.max, 2)
+        }
+
+def _cached_column(student_data: StudentData | StudentTable, field: str) -> SortedColumn | None:
+    """
+    The SortedColumn a StudentTable already holds for this field at its
+    current version, if any. A list of dicts has no version to check (its
+    rows can be edited in place without changing its identity or length),
+    so nothing is cached for it; the menu uses StudentIndex.statistics()
+    for the list path instead.
+    """
+    if isinstance(student_data, StudentTable):
+        return student_data.derived().get(('sorted_column', field))
+    return None
+
+def sorted_column(student_data: StudentData | StudentTable, field: str) -> SortedColumn:
+    """
+    Returns the SortedColumn for one field. A StudentTable keeps it (see
+    StudentTable.derived) until the table changes; a list is sorted each
+    time, because an in-place edit of one of its rows cannot be detected.
+    """
+    if not isinstance(student_data, StudentTable):
+        return SortedColumn(_project_values(student_data, field))
+    derived = student_data.derived()
+    column = derived.get(('sorted_column', field))
+    if column is None:
+        column = derived[('sorted_column', field)] = SortedColumn(student_data.values(field))
+    return column
+
+def _nearest_rank(n: int, percentile: float) -> int:
+    """0-based index of the nearest-rank percentile in a sorted list of n values."""
+    # We use (n - 1) for 0-based indexing
+    index = (percentile / 100) * (n - 1)
+    # Simple nearest rank: round to nearest whole number
+    return int(round(index))
+
+def _select(values: List[float], k: int) -> float:
+    """
+    Quickselect: the k-th smallest value (0-based) in expected O(N), without
+    sorting. Partitions are built with list comprehensions, and values equal to
+    the pivot are set aside in one go, so repeated grades don't slow it down.
+    """
+    while True:
+        pivot = values[random.randrange(len(values))]
+        lows = [v for v in values if v < pivot]
+        if k < len(lows):
+            values = lows
+            continue
+        highs = [v for v in values if v > pivot]
+        equal_count = len(values) - len(lows) - len(highs)
+        if k < len(lows) + equal_count:
+            return pivot
+        k -= len(lows) + equal_count
+        values = highs
+
+def calculate_statistics(student_data: StudentData, field: str) -> Dict[str, float | None]:
+    """
+    Calculates mean, median, min, and max for a given numeric field,
+    ignoring 'None' values.
+    A StudentTable caches the sorted column, so asking again (or asking for
+    percentiles of the same field) does not sort the table again.
+    """
+    return sorted_column(student_data, field).summary()
+
+def summarize_values(values: List[float]) -> Dict[str, float | None]:
+    """
+    Mean, median, min and max of an already-projected list of numbers.
+    The list is sorted in place. Used directly by the streaming pipeline,
+    which only keeps the final grades instead of whole rows.
+    """
+    return SortedColumn(values).summary()
 
 def find_percentile(student_data: StudentData, field: str, percentile: int) -> float | None:
     """
     Finds the value at a given percentile (e.g., 90th percentile).
     Uses the "Nearest Rank" method.
+    Reuses a StudentTable's cached sorted column if there is one; otherwise
+    quickselect finds the value in O(N) without sorting.
     """
-    values = [row[field] for row in student_data if row.get(field) is not None]
+    column = _cached_column(student_data, field)
+    if column is not None:
+        return column.percentile(percentile)
+    values = _project_values(student_data, field)
     if not values:
         return None
+    return _select(values, _nearest_rank(len(values), percentile))
 
-    values.sort()
-    
-    # Calculate index
+def find_percentiles(
+    student_data: StudentData,
+    field: str,
+    percentiles: List[int]
+) -> Dict[int, float | None]:
+    """
+    Several percentiles of one field (e.g. P10/P25/P75/P90) from a single sort.
+    """
+    return sorted_column(student_data, field).percentiles(percentiles)
+
+def find_median(student_data: StudentData, field: str) -> float | None:
+    """
+    Median of one field. Uses a StudentTable's cached sorted column if there
+    is one, otherwise quickselect (O(N), no sort).
+    """
+    column = _cached_column(student_data, field)
+    if column is not None:
+        return column.median
+    values = _project_values(student_data, field)
+    if not values:
+        return None
     n = len(values)
-    # We use (n - 1) for 0-based indexing
-    index = (percentile / 100) * (n - 1)
-    
-    # Simple nearest rank: round to nearest whole number
-    rank = int(round(index))
-    
-    return values[rank]
+    if n % 2 == 1:
+        return _select(values, n // 2)
+    return (_select(values, n // 2 - 1) + _select(values, n // 2)) / 2
+
+DEFAULT_GROUP_PERCENTILES = [10, 25, 75, 90]
+
+def group_positions(student_data: StudentData | StudentTable, by: str) -> Dict[Any, List[int]]:
+    """One scan: value of 'by' -> row positions, in first-seen order."""
+    groups: Dict[Any, List[int]] = {}
+    if isinstance(student_data, StudentTable):
+        if by in student_data.text:
+            column = student_data.text[by]
+        else:
+            column = [student_data.get_value(i, by) for i in range(len(student_data))]
+        for i, key in enumerate(column):
+            groups.setdefault(key, []).append(i)
+        return groups
+    for i, row in enumerate(student_data):
+        groups.setdefault(row.get(by), []).append(i)
+    return groups
+
+def _gather_values(
+    student_data: StudentData | StudentTable,
+    field: str,
+    positions: List[int]
+) -> List[float]:
+    """The non-missing values of one field at the given positions."""
+    if isinstance(student_data, StudentTable):
+        if field not in student_data.numeric:
+            return []
+        column, mask = student_data.numeric[field], student_data.missing[field]
+        return [column[i] for i in positions if not mask[i]]
+    values = []
+    for i in positions:
+        value = student_data[i].get(field)
+        if value is not None:
+            values.append(value)
+    return values
+
+def grouped_statistics(
+    student_data: StudentData | StudentTable,
+    by: str = 'section',
+    fields: List[str] | None = None,
+    percentiles: List[float] | None = None,
+    groups: Dict[Any, List[int]] | None = None
+) -> Dict[Any, Dict[str, Dict[str, float | None]]]:
+    """
+    calculate_statistics for every group at once:
+        {group: {field: {'count', 'mean', 'median', 'min', 'max', 'p10', ...}}}
+
+    The data is scanned once to group it (or 'groups' from group_positions /
+    reports.group_by_section is reused), then each group's values are sorted
+    once per field, so the cost is O(N log(N / groups)) instead of one filter
+    pass over all N rows per section.
+    """
+    if fields is None:
+        fields = ['final_grade']
+    if percentiles is None:
+        percentiles = DEFAULT_GROUP_PERCENTILES
+    if groups is None:
+        groups = group_positions(student_data, by)
+
+    result: Dict[Any, Dict[str, Dict[str, float | None]]] = {}
+    for key, positions in groups.items():
+        result[key] = {}
+        for field in fields:
+            column = SortedColumn(_gather_values(student_data, field, positions))
+            stats: Dict[str, float | None] = {'count': column.count}
+            stats.update(column.summary())
+            for p, value in column.percentiles(percentiles).items():
+                stats[percentile_label(p)] = value
+            result[key][field] = stats
+    return result
+
+def percentile_label(percentile: float) -> str:
+    """Column name for a percentile: 10 -> 'p10', 2.5 -> 'p2.5'."""
+    return f"p{percentile:g}"
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: approximate percentiles in fixed memory.
+
+    Values are fed one at a time (update) or in batches (extend), so it can
+    follow a stream during ingest/transform without keeping the values.
+    Sketches built on separate shards or sections combine with merge().
+    Memory stays around 3 * k values however many students there are; the
+    rank error shrinks as k grows (see rank_error).
+
+    Level h keeps values that each stand for 2**h original values. When a level
+    fills up it is sorted and every other value moves up a level (a random
+    half, which keeps the estimate unbiased).
+    """
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.total = 0.0
+        self._levels: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+
+    @classmethod
+    def for_error(cls, error: float, seed: int | None = None) -> 'QuantileSketch':
+        """Builds a sketch whose normalized rank error is about 'error' (e.g. 0.01)."""
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1")
+        # Inverse of rank_error() below
+        k = math.ceil((2.296 / error) ** (1 / 0.9723))
+        return cls(max(k, 8), seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Approximate normalized rank error (99% confidence), from the KLL paper's fit."""
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level: int) -> int:
+        # Lower levels get smaller buffers: k * (2/3)^(distance from the top)
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, value: float) -> None:
+        """Adds one value."""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._levels[0].append(value)
+        if len(self._levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def extend(self, values: List[float]) -> None:
+        """Adds a batch of values."""
+        for value in values:
+            self.update(value)
+
+    def _compress(self) -> None:
+        """Compacts every level that is over capacity, from the bottom up."""
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append([])
+                items.sort()
+                # With an odd count, one value stays behind at this level
+                keep = [items.pop()] if len(items) % 2 else []
+                offset = self._random.randint(0, 1)
+                self._levels[level + 1].extend(items[offset::2])
+                self._levels[level] = keep
+            level += 1
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Folds another sketch (e.g. from another shard or section) into this one."""
+        if other.count == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted_items(self) -> List[Tuple[float, int]]:
+        items = [
+            (value, 1 << level)
+            for level, values in enumerate(self._levels)
+            for value in values
+        ]
+        items.sort()
+        return items
+
+    def percentiles(self, percentiles: List[float]) -> Dict[float, float | None]:
+        """Approximate nearest-rank percentiles (same rank rule as find_percentile)."""
+        if not self.count:
+            return {p: None for p in percentiles}
+        items = self._weighted_items()
+        results: Dict[float, float | None] = {}
+        for p in percentiles:
+            if p <= 0:
+                results[p] = self.min
+                continue
+            if p >= 100:
+                results[p] = self.max
+                continue
+            rank = _nearest_rank(self.count, p)
+            seen = 0
+            results[p] = items[-1][0]
+            for value, weight in items:
+                seen += weight
+                if seen > rank:
+                    results[p] = value
+                    break
+        return results
+
+    def percentile(self, percentile: float) -> float | None:
+        return self.percentiles([percentile])[percentile]
+
+    @property
+    def median(self) -> float | None:
+        return self.percentile(50)
+
+    def summary(self) -> Dict[str, float | None]:
+        """Same keys as calculate_statistics; only the median is approximate."""
+        if not self.count:
+            return {'mean': None, 'median': None, 'min': None, 'max': None}
+        return {
+            'mean': round(self.total / self.count, 2),
+            'median': round(self.median, 2),
+            'min': round(self.min, 2),
+            'max': round(self.max, 2)
+        }
 
 def find_at_risk_students(
     student_data: StudentData,
@@ -78,7 +416,11 @@ def find_at_risk_students(
     2. attendance_percent < attendance_threshold
     
     Returns two lists: at_risk_students and the remaining (safe) students.
+    A StudentTable input gives two StudentTables back.
     """
+    if isinstance(student_data, StudentTable):
+        return _find_at_risk_table(student_data, grade_threshold, attendance_threshold)
+
     at_risk_list: StudentData = []
     safe_list: StudentData = []
 
@@ -100,3 +442,26 @@ def find_at_risk_students(
             safe_list.append(row)
             
     return at_risk_list, safe_list
+
+def _find_at_risk_table(
+    table: StudentTable,
+    grade_threshold: float,
+    attendance_threshold: float
+) -> Tuple[StudentTable, StudentTable]:
+    """Column-wise version of find_at_risk_students."""
+    table.ensure_numeric('final_grade')
+    grades = table.numeric['final_grade']
+    grade_missing = table.missing['final_grade']
+    attendance = table.numeric['attendance_percent']
+    attendance_missing = table.missing['attendance_percent']
+
+    at_risk_idx: List[int] = []
+    safe_idx: List[int] = []
+    for i in range(len(table)):
+        if (not grade_missing[i] and grades[i] < grade_threshold) or \
+           (not attendance_missing[i] and attendance[i] < attendance_threshold):
+            at_risk_idx.append(i)
+        else:
+            safe_idx.append(i)
+
+    return table.take(at_risk_idx), table.take(safe_idx)
@@ -0,0 +1,142 @@
+import io
+import os
+import sys
+import threading
+from typing import List, Dict, Any, Tuple
+from .index import StudentIndex
+from .progress import PipelineProgress, PipelineCancelled
+from .table import StudentTable
+
+StudentData = List[Dict[str, Any]]
+# What the menu serves: the processed data and its index, always replaced together
+Dataset = Tuple[StudentData | StudentTable, StudentIndex | None]
+
+LOG_FILE = "pipeline.log"
+
+
+class _ThreadRoutedOutput(io.TextIOBase):
+    """
+    sys.stdout replacement that sends each thread's prints to that thread's
+    own stream (if it registered one) and everything else to the real
+    stdout. Lets the pipeline thread log to a file while the menu keeps
+    printing to the terminal.
+    """
+
+    def __init__(self, default: Any):
+        self.default = default
+        self.targets: Dict[int, Any] = {}
+
+    def _stream(self) -> Any:
+        return self.targets.get(threading.get_ident(), self.default)
+
+    def write(self, text: str) -> int:
+        return self._stream().write(text)
+
+    def flush(self) -> None:
+        self._stream().flush()
+
+
+def _route_output_of_current_thread(stream: Any) -> _ThreadRoutedOutput:
+    if not isinstance(sys.stdout, _ThreadRoutedOutput):
+        sys.stdout = _ThreadRoutedOutput(sys.stdout)
+    sys.stdout.targets[threading.get_ident()] = stream
+    return sys.stdout
+
+
+def _stop_routing_current_thread(router: _ThreadRoutedOutput) -> None:
+    router.targets.pop(threading.get_ident(), None)
+    if not router.targets and sys.stdout is router:
+        sys.stdout = router.default
+
+
+class BackgroundPipeline:
+    """
+    Runs run_full_pipeline in a worker thread so the menu stays usable.
+
+    The worker builds a complete new Dataset (records + StudentIndex) and
+    only then publishes it; the menu picks it up with take_result() and
+    replaces its own (data, index) pair in one assignment, so lookups never
+    see a half-built dataset. The pipeline's printed output goes to
+    <output_dir>/pipeline.log instead of the terminal.
+
+    States: 'idle', 'running', 'done', 'cancelled', 'failed'.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.state = 'idle'
+        self.error: str | None = None
+        self.progress: PipelineProgress | None = None
+        self._result: Dataset | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.config["paths"]["output_dir"], LOG_FILE)
+
+    def start(self) -> bool:
+        """Starts a run; returns False if one is already running."""
+        if self.running:
+            return False
+        self.state = 'running'
+        self.error = None
+        self._result = None
+        self.progress = PipelineProgress()
+        self._thread = threading.Thread(target=self._run, name="pipeline", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self) -> None:
+        from .main import run_full_pipeline
+
+        os.makedirs(self.config["paths"]["output_dir"], exist_ok=True)
+        with open(self.log_path, 'w', encoding='utf-8') as log:
+            router = _route_output_of_current_thread(log)
+            try:
+                records = run_full_pipeline(self.config, progress=self.progress)
+                if records:
+                    self._result = (records, StudentIndex(records))
+                    self.state = 'done'
+                else:
+                    self.error = f"no records were processed (see {self.log_path})"
+                    self.state = 'failed'
+            except PipelineCancelled:
+                print("\n--- Pipeline Cancelled ---")
+                self.state = 'cancelled'
+            except Exception as e:
+                print(f"Error: {type(e).__name__}: {e}")
+                self.error = f"{type(e).__name__}: {e}"
+                self.state = 'failed'
+            finally:
+                _stop_routing_current_thread(router)
+
+    def cancel(self) -> bool:
+        """Asks the running pipeline to stop at its next stage boundary or batch."""
+        if not self.running:
+            return False
+        self.progress.cancel()
+        return True
+
+    def wait(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def take_result(self) -> Dataset | None:
+        """The finished Dataset, handed out once; None while running or after a failure."""
+        result, self._result = self._result, None
+        return result
+
+    def status(self) -> str:
+        if self.state == 'running':
+            return f"Pipeline running ({self.progress.describe()})"
+        if self.state == 'cancelled':
+            return "Last pipeline run was cancelled."
+        if self.state == 'failed':
+            return f"Last pipeline run failed: {self.error}"
+        if self.state == 'done':
+            return f"Last pipeline run finished (output in {self.log_path})."
+        return "Pipeline not started."
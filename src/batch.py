@@ -0,0 +1,235 @@
+"""
+Non-interactive batch runner: the full pipeline over many inputs, for cron.
+
+    python -m src.batch [--config config.json] [--output-root batch_output]
+                        [--workers N] INPUT [INPUT ...]
+
+Each INPUT is a CSV file (plain or .gz/.bz2/.xz), a config (.json) file,
+or a glob of either (quoted, e.g. "exports/*.csv.gz"). A CSV runs with the base config and its
+path swapped in; a config runs as it is. Every input gets its own output
+directory (<output-root>/<input name>/) holding its reports, its snapshot,
+its metrics, its quarantine.csv of bad rows and a pipeline.log with
+everything the pipeline printed.
+
+Stdin is never read: it is replaced by an empty stream, so anything that
+would prompt fails fast instead of hanging the job.
+
+Exit codes:
+    0  every input succeeded
+    1  some inputs failed
+    2  every input failed (or bad arguments)
+    3  no input files matched
+"""
+import argparse
+import contextlib
+import copy
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
+from .compression import strip_extension
+
+EXIT_OK = 0
+EXIT_SOME_FAILED = 1
+EXIT_ALL_FAILED = 2
+EXIT_NO_INPUT = 3
+
+SUMMARY_FILE = "batch_summary.json"
+LOG_FILE = "pipeline.log"
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Expands globs; keeps order and drops duplicates. Plain paths are kept even if missing."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def _output_names(paths: List[str]) -> List[str]:
+    """One output directory name per input (file name without extension(s), made unique)."""
+    names = []
+    seen: Dict[str, int] = {}
+    for path in paths:
+        name = os.path.splitext(strip_extension(os.path.basename(path)))[0]
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}-{seen[name]}")
+    return names
+
+
+def build_job_config(
+    input_path: str,
+    base_config: Dict[str, Any],
+    output_dir: str,
+    nested_workers: bool
+) -> Dict[str, Any]:
+    """
+    The config one input runs with: its own input file, output directory and snapshots.
+    cache.dir stays shared on purpose: entries are content-addressed, so jobs
+    with the same input reuse them, and the cache tolerates parallel eviction.
+    """
+    if input_path.endswith('.json'):
+        with open(input_path, 'r') as f:
+            config = json.load(f)
+    else:
+        config = copy.deepcopy(base_config)
+        config.setdefault("paths", {})["input_csv"] = input_path
+        # The CSV is this job's whole input: nothing to join into it
+        config.pop("sources", None)
+
+    config.setdefault("paths", {})["output_dir"] = output_dir
+    if config.get("snapshot", {}).get("enabled", False):
+        config["snapshot"]["path"] = os.path.join(output_dir, "cleaned_records.snapshot")
+    if config.get("results", {}).get("enabled", False):
+        config["results"]["path"] = os.path.join(output_dir, "results.snapshot")
+    if config.get("store", {}).get("enabled", False):
+        config["store"]["path"] = os.path.join(output_dir, "students.db")
+    if config.get("quarantine", {}).get("enabled", False):
+        config["quarantine"]["path"] = os.path.join(output_dir, "quarantine.csv")
+    if config.get("metrics", {}).get("enabled", False):
+        config["metrics"]["path"] = os.path.join(output_dir, "pipeline_metrics.jsonl")
+    if not nested_workers:
+        # The batch pool already uses the cores; no process pool inside each job
+        config.setdefault("ingest", {})["workers"] = 1
+    return config
+
+
+def _no_stdin() -> None:
+    """Pool initializer (and main-process setup): stdin reads hit EOF at once."""
+    sys.stdin = open(os.devnull, 'r')
+
+
+def run_one(input_path: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs the full pipeline for one input, with its output captured to
+    <output_dir>/pipeline.log. Never raises: failures are reported in the result.
+    """
+    from .main import run_full_pipeline
+
+    output_dir = config["paths"]["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    result: Dict[str, Any] = {'input': input_path, 'output_dir': output_dir,
+                              'ok': False, 'records': 0, 'error': None}
+    start = time.perf_counter()
+    with open(os.path.join(output_dir, LOG_FILE), 'w', encoding='utf-8') as log:
+        with contextlib.redirect_stdout(log):
+            try:
+                records = run_full_pipeline(config)
+                result['records'] = len(records)
+                result['ok'] = bool(records)
+                if not records:
+                    result['error'] = "no valid records (see pipeline.log)"
+            except Exception as e:
+                print(f"Error: {type(e).__name__}: {e}")
+                result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(
+    input_paths: List[str],
+    base_config: Dict[str, Any],
+    output_root: str,
+    workers: int = 1
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Runs every input (in a process pool when workers > 1) and returns
+    (per-input results in input order, exit code).
+    """
+    if not input_paths:
+        return [], EXIT_NO_INPUT
+
+    jobs = []
+    for path, name in zip(input_paths, _output_names(input_paths)):
+        output_dir = os.path.join(output_root, name)
+        try:
+            jobs.append((path, build_job_config(path, base_config, output_dir, workers <= 1)))
+        except (OSError, ValueError) as e:
+            jobs.append((path, e))
+
+    results: List[Dict[str, Any] | None] = [None] * len(jobs)
+    runnable = [(i, path, config) for i, (path, config) in enumerate(jobs) if isinstance(config, dict)]
+    for i, (path, config) in enumerate(jobs):
+        if not isinstance(config, dict):
+            results[i] = {'input': path, 'output_dir': None, 'ok': False, 'records': 0,
+                          'error': f"bad config: {config}", 'seconds': 0.0}
+
+    if workers > 1 and len(runnable) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_no_stdin) as pool:
+            futures = {i: pool.submit(run_one, path, config) for i, path, config in runnable}
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:  # e.g. a worker process died
+                    results[i] = {'input': jobs[i][0], 'output_dir': None, 'ok': False,
+                                  'records': 0, 'error': f"{type(e).__name__}: {e}", 'seconds': 0.0}
+    else:
+        for i, path, config in runnable:
+            results[i] = run_one(path, config)
+
+    failed = sum(not result['ok'] for result in results)
+    if failed == 0:
+        code = EXIT_OK
+    elif failed == len(results):
+        code = EXIT_ALL_FAILED
+    else:
+        code = EXIT_SOME_FAILED
+    return results, code
+
+
+def print_summary(results: List[Dict[str, Any]], elapsed: float) -> None:
+    """Aggregate summary: one line per input, then the totals."""
+    print(f"\n{'Status':<7} {'Records':>9} {'Seconds':>8}  Input")
+    for result in results:
+        status = 'ok' if result['ok'] else 'FAILED'
+        print(f"{status:<7} {result['records']:>9} {result['seconds']:>8.2f}  {result['input']}")
+        if result['error']:
+            print(f"{'':<27}{result['error']}")
+    succeeded = sum(result['ok'] for result in results)
+    total_records = sum(result['records'] for result in results)
+    print(f"\n{succeeded} of {len(results)} inputs succeeded, "
+          f"{total_records} records, {elapsed:.2f}s total")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Run the grading pipeline over many CSV files or configs, without prompts."
+    )
+    parser.add_argument("inputs", nargs="+", help="CSV files, config .json files, or globs of them")
+    parser.add_argument("--config", default="config.json", help="base config used for CSV inputs")
+    parser.add_argument("--output-root", default="batch_output", help="one sub-directory per input goes here")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="inputs processed in parallel")
+    args = parser.parse_args(argv)
+
+    _no_stdin()
+    try:
+        with open(args.config, 'r') as f:
+            base_config = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read base config {args.config}: {e}")
+        return EXIT_ALL_FAILED
+
+    input_paths = expand_inputs(args.inputs)
+    if not input_paths:
+        print("Error: no input files matched.")
+        return EXIT_NO_INPUT
+
+    print(f"Batch: {len(input_paths)} inputs, {args.workers} workers, output in {args.output_root}/")
+    start = time.perf_counter()
+    results, code = run_batch(input_paths, base_config, args.output_root, args.workers)
+    elapsed = time.perf_counter() - start
+    print_summary(results, elapsed)
+
+    os.makedirs(args.output_root, exist_ok=True)
+    with open(os.path.join(args.output_root, SUMMARY_FILE), 'w') as f:
+        json.dump({'exit_code': code, 'seconds': round(elapsed, 3), 'results': results}, f, indent=2)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
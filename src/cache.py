@@ -0,0 +1,183 @@
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+from typing import List, Dict, Any, Tuple
+
+# Bump this when the cached data layout changes, so old entries stop matching
+CACHE_FORMAT = 2
+
+
+# Absolute path -> the stamp of the last digest computed in this process
+_DIGESTS: Dict[str, Dict[str, Any]] = {}
+
+
+def file_digest(path: str, known: Dict[str, Any] | None = None) -> str:
+    """
+    SHA-256 of a file's bytes, read in 1 MB chunks.
+    The file is only read when its size or mtime differs from 'known' (a
+    file_stamp saved with earlier results) and from the last digest taken
+    in this process, so checking unchanged results is O(1), not O(file size).
+    """
+    stat = os.stat(path)
+    absolute = os.path.abspath(path)
+    for stamp in (_DIGESTS.get(absolute), known):
+        if stamp and stamp.get('digest') and (stamp.get('size'), stamp.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+            break
+    else:
+        digest = hashlib.sha256()
+        with open(path, mode='rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        stamp = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest.hexdigest()}
+    _DIGESTS[absolute] = stamp
+    return stamp['digest']
+
+
+def file_stamp(path: str) -> Dict[str, Any]:
+    """Size, mtime and digest of a file, to be saved with results and passed back to file_digest."""
+    file_digest(path)
+    return dict(_DIGESTS[os.path.abspath(path)])
+
+
+def stage_key(*parts: Any) -> str:
+    """
+    Content address for one pipeline stage: a hash of everything the stage
+    depends on (the previous stage's key plus its own config sections).
+    """
+    text = json.dumps([CACHE_FORMAT, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def pipeline_stage_keys(
+    config: Dict[str, Any],
+    input_stamp: Dict[str, Any] | None = None
+) -> Dict[str, str]:
+    """
+    Cache keys for each stage. Every key includes the previous one, so a change
+    to the input file invalidates everything, a weights/curve/cutoffs change
+    invalidates transform and reports, and a thresholds (or report compression)
+    change only reports. input_stamp (a saved file_stamp of the input) lets an
+    unchanged input skip the hashing.
+    """
+    ingest_key = stage_key(
+        'ingest', file_digest(config["paths"]["input_csv"], input_stamp), config["quiz_count"]
+    )
+    transform_key = stage_key(
+        'transform', ingest_key, config["weights"],
+        config.get("curve_settings", {}), config["grade_cutoffs"]
+    )
+    reports_key = stage_key(
+        'reports', transform_key, config["thresholds"], config.get("section_statistics", {}),
+        config.get("reports", {}).get("compression")
+    )
+    return {'ingest': ingest_key, 'transform': transform_key, 'reports': reports_key}
+
+
+class PipelineCache:
+    """
+    On-disk cache of pipeline stage results, one pickle file per entry:
+        <cache_dir>/<stage>-<key>.pkl
+    Entries never need updating: a change to the input or the config gives a
+    new key. Reading an entry refreshes its mtime, and when the cache grows
+    past max_bytes the least recently used entries are deleted.
+    Several processes may share one cache dir, so any entry can disappear
+    between listing and using it; a vanished entry is simply skipped.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{stage}-{key}.pkl")
+
+    def load(self, stage: str, key: str) -> Any | None:
+        """Returns the cached value, or None on a miss (or an unreadable entry)."""
+        path = self._path(stage, key)
+        try:
+            with open(path, mode='rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Cache: dropping unreadable entry {path}: {e}")
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            return None
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)  # mark as recently used
+        return value
+
+    def store(self, stage: str, key: str, value: Any) -> None:
+        """Saves a value (atomically: temp file + rename), then enforces the size limit."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(stage, key)
+        # Per-process temp name: parallel runs may store the same entry at once
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, mode='wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) for every cache entry."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if name.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            if _remove_entry(path):
+                removed += 1
+        return removed
+
+    def invalidate(self, stage: str | None = None) -> int:
+        """Deletes every entry (or only one stage's entries). Returns how many."""
+        removed = 0
+        for _, _, path in self._entries():
+            if stage is None or os.path.basename(path).startswith(f"{stage}-"):
+                removed += _remove_entry(path)
+        return removed
+
+
+def _remove_entry(path: str) -> bool:
+    """Deletes a cache entry; False if another process already deleted it."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def open_cache(config: Dict[str, Any]) -> PipelineCache | None:
+    """The cache described by config["cache"], or None when it is disabled."""
+    settings = config.get("cache", {})
+    if not settings.get("enabled", False):
+        return None
+    return PipelineCache(
+        settings.get("dir", ".pipeline_cache"),
+        int(settings.get("max_mb", 256) * 1024 * 1024)
+    )
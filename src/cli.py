@@ -0,0 +1,243 @@
+"""
+Command-line entry point with subcommands:
+
+    python -m src [--config config.json] run           # full pipeline, saves the results
+    python -m src [--config config.json] stats [--field F] [--by-section]
+    python -m src [--config config.json] lookup ID [ID ...]
+    python -m src [--config config.json] at-risk [--limit N]
+    python -m src [--config config.json] scenarios [--grid grid.json]
+    python -m src [--config config.json] join [--output PATH] [--presorted] [FILE ...]
+    python -m src [--config config.json] menu          # the interactive menu (also the default)
+
+stats, lookup and at-risk query the SQLite student store (src/store.py)
+when it is enabled and up to date, else read the results the last run
+saved (src/results.py), and only run the pipeline when there are neither
+for the current input and config. Every module is imported inside the command that
+needs it, so a lookup never pays for importing ingest, transform (NumPy)
+or reports. benchmarks/bench_startup.py keeps that import cost in check.
+"""
+import argparse
+import contextlib
+import json
+import sys
+from typing import List, Dict, Any
+
+EXIT_OK = 0
+EXIT_NOT_FOUND = 1
+
+
+def _load_config(config_path: str) -> Dict[str, Any]:
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+def _load_records(config: Dict[str, Any]) -> Any:
+    """The saved results, or (if missing or stale) a fresh pipeline run's records."""
+    from .results import load_results
+
+    records = load_results(config)
+    if records is not None:
+        return records
+    print("No up-to-date saved results; running the pipeline first...", file=sys.stderr)
+    from .main import run_full_pipeline
+
+    # The pipeline's progress output would get mixed into the answer
+    with contextlib.redirect_stdout(sys.stderr):
+        return run_full_pipeline(config)
+
+
+def _student_line(student: Dict[str, Any]) -> str:
+    return (f"  {student['student_id']:>8}  {student['last_name']}, {student['first_name']}"
+            f"  {student['section']}  {student['final_grade']} ({student['letter_grade']})")
+
+
+def command_run(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    from .main import run_full_pipeline
+
+    return EXIT_OK if run_full_pipeline(config) else EXIT_NOT_FOUND
+
+
+def _open_store(config: Dict[str, Any]) -> Any:
+    """The SQLite student store (src/store.py) if it is up to date, else None."""
+    if not config.get("store", {}).get("enabled", False):
+        return None
+    from .store import open_store
+
+    return open_store(config)
+
+
+def _print_section_statistics(field: str, section_stats: Dict[str, Any]) -> None:
+    print(f"--- Section Statistics ({field}) ---")
+    print(f"  {'Section':<10}{'Count':>7}{'Mean':>8}{'Median':>8}{'Min':>8}{'Max':>8}")
+    for section, fields in section_stats.items():
+        stats = fields[field]
+        print(f"  {section:<10}{stats['count']:>7}{stats['mean']!s:>8}{stats['median']!s:>8}"
+              f"{stats['min']!s:>8}{stats['max']!s:>8}")
+
+
+def _print_class_statistics(field: str, count: int, stats: Dict[str, Any]) -> None:
+    print(f"--- Class Statistics ({field}) ---")
+    print(f"  Count:  {count}")
+    for name in ('mean', 'median', 'min', 'max'):
+        print(f"  {name.capitalize() + ':':<8}{stats[name]}")
+
+
+def command_stats(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    store = _open_store(config)
+    if store is not None:
+        with store:
+            count = len(store)
+            if not count:
+                print("Error: no records to summarize.")
+                return EXIT_NOT_FOUND
+            if args.by_section:
+                _print_section_statistics(args.field, store.section_statistics([args.field], percentiles=[]))
+            else:
+                _print_class_statistics(args.field, count, store.statistics(args.field))
+        return EXIT_OK
+
+    records = _load_records(config)
+    if not records:
+        print("Error: no records to summarize.")
+        return EXIT_NOT_FOUND
+    from . import analyze
+
+    if args.by_section:
+        section_stats = analyze.grouped_statistics(records, by='section', fields=[args.field], percentiles=[])
+        _print_section_statistics(args.field, section_stats)
+    else:
+        _print_class_statistics(args.field, len(records), analyze.calculate_statistics(records, args.field))
+    return EXIT_OK
+
+
+def command_lookup(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    store = _open_store(config)
+    if store is not None:
+        with store:
+            students = store.lookup(args.student_ids)
+    else:
+        records = _load_records(config)
+        from .table import StudentTable
+
+        wanted = set(args.student_ids)
+        # One scan of the id column beats building a StudentIndex for a handful of lookups
+        if isinstance(records, StudentTable):
+            ids = records.student_id
+        else:
+            ids = [row['student_id'] for row in records]
+        students = [records[i] for i, student_id in enumerate(ids) if student_id in wanted]
+
+    found = set()
+    for student in students:
+        found.add(student['student_id'])
+        print(f"--- Student {student['student_id']} ---")
+        print(f"  Name:    {student['first_name']} {student['last_name']}")
+        print(f"  Section: {student['section']}")
+        print(f"  Grade:   {student['final_grade']} ({student['letter_grade']})")
+        print(f"  Att.:    {student['attendance_percent']}%")
+    for student_id in args.student_ids:
+        if student_id not in found:
+            print(f"Error: Student with id {student_id} not found.")
+    return EXIT_OK if found == set(args.student_ids) else EXIT_NOT_FOUND
+
+
+def command_at_risk(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    grade_threshold = config["thresholds"]["at_risk_grade"]
+    attendance_threshold = config["thresholds"]["at_risk_attendance"]
+    store = _open_store(config)
+    if store is not None:
+        # Only the rows that get printed are fetched
+        with store:
+            total = store.count_at_risk(grade_threshold, attendance_threshold)
+            at_risk = store.at_risk(grade_threshold, attendance_threshold, limit=args.limit)
+    else:
+        records = _load_records(config)
+        from .cohorts import at_risk_rule
+
+        at_risk = at_risk_rule(grade_threshold, attendance_threshold).evaluate(records).select(records)
+        total = len(at_risk)
+    print(f"--- {total} student(s) at risk ---")
+    shown = total if args.limit is None else min(args.limit, total)
+    for i in range(shown):
+        print(_student_line(at_risk[i]))
+    if shown < total:
+        print(f"  ... and {total - shown} more")
+    return EXIT_OK
+
+
+def command_scenarios(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    grid = None
+    if args.grid:
+        with open(args.grid, 'r') as f:
+            grid = json.load(f)
+    from .main import run_scenario_sweep
+
+    try:
+        rows = run_scenario_sweep(config, grid)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return EXIT_NOT_FOUND
+    return EXIT_OK if rows else EXIT_NOT_FOUND
+
+
+def command_join(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    from .join import run_join
+
+    sources = config.setdefault("sources", {})
+    if args.files:
+        sources["files"] = args.files
+    if not sources.get("files"):
+        print("Error: no source files (give them, or set sources.files in the config)")
+        return EXIT_NOT_FOUND
+    if args.presorted:
+        sources["presorted"] = True
+    if args.output:
+        config["paths"]["input_csv"] = args.output
+    return EXIT_OK if run_join(config) else EXIT_NOT_FOUND
+
+
+def command_menu(config_path: str) -> int:
+    from .main import main as run_menu
+
+    run_menu(config_path)
+    return EXIT_OK
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src", description="PUPQC Academic Analytics")
+    parser.add_argument("--config", default="config.json")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("run", help="run the full pipeline and save the results")
+    stats = commands.add_parser("stats", help="class statistics of one field")
+    stats.add_argument("--field", default="final_grade")
+    stats.add_argument("--by-section", action="store_true", help="one line per section")
+    lookup = commands.add_parser("lookup", help="print students by id")
+    lookup.add_argument("student_ids", type=int, nargs="+", metavar="ID")
+    at_risk = commands.add_parser("at-risk", help="list the at-risk students")
+    at_risk.add_argument("--limit", type=int, default=None, help="print at most this many")
+    scenarios = commands.add_parser("scenarios", help="compare what-if grading scenarios")
+    scenarios.add_argument("--grid", help="JSON file with the grid (default: config's scenarios.grid)")
+    join = commands.add_parser("join", help="join separate exports on student_id into the input CSV")
+    join.add_argument("files", nargs="*", metavar="FILE", help="roster first (default: config's sources.files)")
+    join.add_argument("--output", help="the joined CSV (default: config's paths.input_csv)")
+    join.add_argument("--presorted", action="store_true", help="the files are already sorted by student_id")
+    commands.add_parser("menu", help="the interactive menu (default)")
+    args = parser.parse_args(argv)
+
+    if args.command in (None, "menu"):
+        return command_menu(args.config)
+    config = _load_config(args.config)
+    handler = {
+        "run": command_run,
+        "stats": command_stats,
+        "lookup": command_lookup,
+        "at-risk": command_at_risk,
+        "scenarios": command_scenarios,
+        "join": command_join,
+    }[args.command]
+    return handler(config, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Cohort rules: small composable predicates over student records.
+
+    from src.cohorts import field, missing_count, evaluate_many
+
+    struggling = (missing_count(['quiz1', 'quiz2', 'quiz3']) >= 2) & (field('midterm') < 60)
+    at_risk = (field('final_grade') < 65) | (field('attendance_percent') < 80)
+
+    cohorts = evaluate_many({'struggling': struggling, 'at_risk': at_risk}, records)
+    both = cohorts['struggling'] & cohorts['at_risk']      # IndexSet
+    rows = both.select(records)
+
+A rule is evaluated a column at a time and gives an IndexSet (the matching
+row positions as a bitmask, one bit per row), not copied rows. IndexSets
+combine with & | ~ and -, which work on whole bitmasks at once.
+evaluate_many evaluates every distinct condition once, however many rules
+use it, so cohorts for several threshold sets come out of one pass per
+condition.
+
+A missing value (None) never satisfies a comparison, the same rule
+find_at_risk_students uses. rule.row_test() compiles the same rule into a
+plain function of one row dict, for code that works row by row.
+"""
+import operator
+from abc import ABC, abstractmethod
+from itertools import compress, repeat
+from typing import List, Dict, Any, Callable, Iterator, Tuple
+from .table import StudentTable
+
+StudentRow = Dict[str, Any]
+StudentData = List[StudentRow]
+
+# Below this many rows importing NumPy costs more than it saves
+NUMPY_MIN_ROWS = 50_000
+
+_numpy = None
+
+# Comparisons that raise TypeError on None (== and != just give a bool)
+_ORDERING = (operator.lt, operator.le, operator.gt, operator.ge)
+
+# 0/1 mask bytes <-> binary digits, for converting masks to and from ints
+_TO_DIGITS = bytes([ord('0')] + [ord('1')] * 255)
+_FROM_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _load_numpy() -> Any:
+    """NumPy if it is installed (imported on first use only), else False."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy
+
+
+class IndexSet:
+    """
+    A set of row positions in a dataset of 'size' rows, stored as one Python
+    int with one bit per row (bit i is set when row i is in the set). Set
+    operations are single big-integer operations; len() is a bit count.
+    """
+    __slots__ = ('size', 'bits')
+
+    # size -> (1 << size) - 1, the bits of every row, for ~
+    _all_bits: Dict[int, int] = {}
+
+    def __init__(self, size: int, bits: int = 0):
+        self.size = size
+        self.bits = bits
+
+    @classmethod
+    def from_mask(cls, mask: bytes | bytearray) -> 'IndexSet':
+        """From a 0/1 byte per row."""
+        if not mask:
+            return cls(0)
+        # Row 0 is the lowest bit, so the last row is the first binary digit
+        return cls(len(mask), int(bytes(mask).translate(_TO_DIGITS)[::-1], 2))
+
+    @classmethod
+    def from_positions(cls, size: int, positions: List[int]) -> 'IndexSet':
+        mask = bytearray(size)
+        for position in positions:
+            mask[position] = 1
+        return cls.from_mask(mask)
+
+    @classmethod
+    def everything(cls, size: int) -> 'IndexSet':
+        bits = cls._all_bits.get(size)
+        if bits is None:
+            if len(cls._all_bits) >= 8:
+                cls._all_bits.clear()
+            bits = cls._all_bits[size] = (1 << size) - 1
+        return cls(size, bits)
+
+    def _check(self, other: 'IndexSet') -> None:
+        if self.size != other.size:
+            raise ValueError(f"IndexSets over different datasets ({self.size} vs {other.size} rows)")
+
+    def __and__(self, other: 'IndexSet') -> 'IndexSet':
+        self._check(other)
+        return IndexSet(self.size, self.bits & other.bits)
+
+    def __or__(self, other: 'IndexSet') -> 'IndexSet':
+        self._check(other)
+        return IndexSet(self.size, self.bits | other.bits)
+
+    def __sub__(self, other: 'IndexSet') -> 'IndexSet':
+        self._check(other)
+        return IndexSet(self.size, self.bits & ~other.bits)
+
+    def __invert__(self) -> 'IndexSet':
+        return IndexSet(self.size, IndexSet.everything(self.size).bits ^ self.bits)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IndexSet) and (self.size, self.bits) == (other.size, other.bits)
+
+    def __hash__(self) -> int:
+        return hash((self.size, self.bits))
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def mask(self) -> bytes:
+        """One 0/1 byte per row."""
+        if not self.size:
+            return b''
+        return format(self.bits, f'0{self.size}b').encode('ascii')[::-1].translate(_FROM_DIGITS)
+
+    def positions(self) -> List[int]:
+        """The row positions in the set, ascending (file order)."""
+        return list(compress(range(self.size), self.mask()))
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.positions())
+
+    def __contains__(self, position: int) -> bool:
+        return 0 <= position < self.size and bool((self.bits >> position) & 1)
+
+    def select(self, student_data: StudentData | StudentTable) -> StudentData | StudentTable:
+        """The matching rows: the same dict objects (no copies), or a new StudentTable."""
+        if isinstance(student_data, StudentTable):
+            return student_data.take(self.positions())
+        return list(map(student_data.__getitem__, self.positions()))
+
+    def __repr__(self) -> str:
+        return f"IndexSet({len(self)} of {self.size} rows)"
+
+
+# --- terms: what a condition compares ---
+
+class Term(ABC):
+    """A value per row (a field, or something derived from fields) that can be compared."""
+
+    key: Tuple[Any, ...] = ()
+
+    @abstractmethod
+    def column(self, student_data: StudentData | StudentTable) -> Tuple[Any, bytes | None]:
+        """(one value per row, missing mask or None). Without a mask, None marks missing values."""
+
+    @abstractmethod
+    def row_value(self) -> Callable[[StudentRow], Any]:
+        """The value of one row dict."""
+
+    def _compare(self, op: Callable[[Any, Any], bool], value: Any) -> 'Compare':
+        return Compare(self, op, value)
+
+    def __lt__(self, value: Any) -> 'Compare':
+        return self._compare(operator.lt, value)
+
+    def __le__(self, value: Any) -> 'Compare':
+        return self._compare(operator.le, value)
+
+    def __gt__(self, value: Any) -> 'Compare':
+        return self._compare(operator.gt, value)
+
+    def __ge__(self, value: Any) -> 'Compare':
+        return self._compare(operator.ge, value)
+
+    def __eq__(self, value: Any) -> 'Compare':  # type: ignore[override]
+        return self._compare(operator.eq, value)
+
+    def __ne__(self, value: Any) -> 'Compare':  # type: ignore[override]
+        return self._compare(operator.ne, value)
+
+    __hash__ = object.__hash__
+
+
+class Field(Term):
+    """One field of the records, e.g. field('midterm')."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = ('field', name)
+
+    def column(self, student_data: StudentData | StudentTable) -> Tuple[Any, bytes | None]:
+        if isinstance(student_data, StudentTable):
+            if self.name == 'student_id':
+                return student_data.student_id, None
+            if self.name in student_data.numeric:
+                return student_data.numeric[self.name], student_data.missing[self.name]
+            if self.name in student_data.text:
+                return student_data.text[self.name], None
+            return [None] * len(student_data), None
+        name = self.name
+        return [row.get(name) for row in student_data], None
+
+    def row_value(self) -> Callable[[StudentRow], Any]:
+        return operator.methodcaller('get', self.name)
+
+    def is_missing(self) -> 'IsMissing':
+        return IsMissing(self)
+
+
+class MissingCount(Term):
+    """How many of the given fields are missing (None) in each row."""
+
+    def __init__(self, names: List[str]):
+        self.names = list(names)
+        self.key = ('missing_count', tuple(self.names))
+
+    def column(self, student_data: StudentData | StudentTable) -> Tuple[Any, bytes | None]:
+        masks = []
+        for name in self.names:
+            values, missing = Field(name).column(student_data)
+            masks.append(missing if missing is not None else [value is None for value in values])
+        if not masks:
+            return [0] * len(student_data), None
+        return [sum(flags) for flags in zip(*masks)], None
+
+    def row_value(self) -> Callable[[StudentRow], Any]:
+        names = self.names
+        return lambda row: sum(row.get(name) is None for name in names)
+
+
+def field(name: str) -> Field:
+    return Field(name)
+
+
+def missing_count(names: List[str]) -> MissingCount:
+    return MissingCount(names)
+
+
+def _column(term: Term, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> Tuple[Any, bytes | None]:
+    """term.column(), projected once per evaluation however many conditions use it."""
+    key = ('column', term.key)
+    if key not in cache:
+        cache[key] = term.column(student_data)
+    return cache[key]
+
+
+# --- predicates ---
+
+class Predicate(ABC):
+    """A condition on a row. Combine with & (and), | (or) and ~ (not)."""
+
+    def __and__(self, other: 'Predicate') -> 'Predicate':
+        return And(self, other)
+
+    def __or__(self, other: 'Predicate') -> 'Predicate':
+        return Or(self, other)
+
+    def __invert__(self) -> 'Predicate':
+        return Not(self)
+
+    def evaluate(self, student_data: StudentData | StudentTable) -> IndexSet:
+        """The rows that satisfy the rule."""
+        return self._evaluate(student_data, {})
+
+    @abstractmethod
+    def _evaluate(self, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> IndexSet:
+        """'cache' holds the columns and condition results of one evaluation."""
+
+    @abstractmethod
+    def row_test(self) -> Callable[[StudentRow], bool]:
+        """The rule as a function of one row dict."""
+
+
+class Compare(Predicate):
+    """term <op> value; a missing value never matches."""
+
+    def __init__(self, term: Term, op: Callable[[Any, Any], bool], value: Any):
+        self.term = term
+        self.op = op
+        self.value = value
+        self.key = ('compare', term.key, op.__name__, value)
+
+    def _evaluate(self, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> IndexSet:
+        result = cache.get(self.key)
+        if result is not None:
+            return result
+        values, missing = _column(self.term, student_data, cache)
+        op, value = self.op, self.value
+        numpy = _load_numpy() if missing is not None and len(values) >= NUMPY_MIN_ROWS else False
+        if numpy:
+            matches = op(numpy.frombuffer(values, dtype=numpy.float64), value)
+            matches &= numpy.frombuffer(missing, dtype=numpy.uint8) == 0
+            # packbits gives the bitmask itself, row 0 in the lowest bit
+            packed = numpy.packbits(matches, bitorder='little').tobytes()
+            result = cache[self.key] = IndexSet(len(values), int.from_bytes(packed, 'little'))
+            return result
+        if missing is not None:
+            mask = bytearray(not is_missing and op(x, value) for x, is_missing in zip(values, missing))
+        elif op in _ORDERING:
+            try:
+                # Without missing values (the common case) there is no per-row None check;
+                # ordering None against a number raises, which sends us to the checked loop
+                mask = bytearray(map(op, values, repeat(value)))
+            except TypeError:
+                mask = bytearray(x is not None and op(x, value) for x in values)
+        else:
+            mask = bytearray(x is not None and op(x, value) for x in values)
+        result = cache[self.key] = IndexSet.from_mask(mask)
+        return result
+
+    def row_test(self) -> Callable[[StudentRow], bool]:
+        get, op, value = self.term.row_value(), self.op, self.value
+
+        def test(row: StudentRow) -> bool:
+            x = get(row)
+            return x is not None and op(x, value)
+        return test
+
+
+class IsMissing(Predicate):
+    """The field has no value."""
+
+    def __init__(self, term: Field):
+        self.term = term
+        self.key = ('missing', term.key)
+
+    def _evaluate(self, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> IndexSet:
+        result = cache.get(self.key)
+        if result is None:
+            values, missing = _column(self.term, student_data, cache)
+            mask = bytes(missing) if missing is not None else bytearray(x is None for x in values)
+            result = cache[self.key] = IndexSet.from_mask(mask)
+        return result
+
+    def row_test(self) -> Callable[[StudentRow], bool]:
+        get = self.term.row_value()
+        return lambda row: get(row) is None
+
+
+class And(Predicate):
+    def __init__(self, left: Predicate, right: Predicate):
+        self.left, self.right = left, right
+
+    def _evaluate(self, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> IndexSet:
+        return self.left._evaluate(student_data, cache) & self.right._evaluate(student_data, cache)
+
+    def row_test(self) -> Callable[[StudentRow], bool]:
+        left, right = self.left.row_test(), self.right.row_test()
+        return lambda row: left(row) and right(row)
+
+
+class Or(Predicate):
+    def __init__(self, left: Predicate, right: Predicate):
+        self.left, self.right = left, right
+
+    def _evaluate(self, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> IndexSet:
+        return self.left._evaluate(student_data, cache) | self.right._evaluate(student_data, cache)
+
+    def row_test(self) -> Callable[[StudentRow], bool]:
+        left, right = self.left.row_test(), self.right.row_test()
+        return lambda row: left(row) or right(row)
+
+
+class Not(Predicate):
+    def __init__(self, inner: Predicate):
+        self.inner = inner
+
+    def _evaluate(self, student_data: StudentData | StudentTable, cache: Dict[Any, Any]) -> IndexSet:
+        return ~self.inner._evaluate(student_data, cache)
+
+    def row_test(self) -> Callable[[StudentRow], bool]:
+        inner = self.inner.row_test()
+        return lambda row: not inner(row)
+
+
+def evaluate_many(
+    rules: Dict[str, Predicate],
+    student_data: StudentData | StudentTable
+) -> Dict[str, IndexSet]:
+    """Every rule's IndexSet; a condition shared by several rules is evaluated once."""
+    cache: Dict[Any, Any] = {}
+    return {name: rule._evaluate(student_data, cache) for name, rule in rules.items()}
+
+
+def at_risk_rule(grade_threshold: float, attendance_threshold: float) -> Predicate:
+    """The at-risk definition of find_at_risk_students as a rule."""
+    return (field('final_grade') < grade_threshold) | (field('attendance_percent') < attendance_threshold)
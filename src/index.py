@@ -0,0 +1,184 @@
+from bisect import insort
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Tuple
+from .ranking import GradeRanking
+from .table import StudentTable
+
+# Type Aliases for clarity
+StudentRow = Dict[str, Any]
+StudentData = List[StudentRow]
+
+
+class StudentIndex:
+    """
+    Lookup structures built once over the processed student data.
+
+      * by id:      dict student_id -> row position               O(1) lookup
+      * by section: dict section -> row positions (in file order)  O(1) per section
+      * by grade:   GradeRanking of (final_grade, position)        O(log N + k) range query,
+                    O(log N) rank, percentile and grade update
+
+    The index stores positions, not copies, so it works the same for a list of
+    dicts and for a StudentTable. Changes made through update_student() /
+    add_student() patch the three indexes in place. If the data is changed some
+    other way, the next query rebuilds the index when it can tell the data is
+    stale: a StudentTable's version changed, the list length changed, or
+    touch() was called. A dict in a list has no version, so code that edits
+    list rows directly must call touch() afterwards (as StudentTable asks of
+    code that writes straight into its columns); the rows the queries return
+    for a list are read-only views, so they cannot be edited by mistake.
+    """
+
+    def __init__(self, student_data: StudentData | StudentTable):
+        self.data = student_data
+        self.version = 0
+        self.rebuild()
+
+    # --- building ---
+
+    def touch(self) -> None:
+        """Marks the data as changed outside the index; the next query rebuilds it."""
+        self.version += 1
+
+    def _stamp(self) -> Tuple[int, int, int]:
+        table_version = self.data.version if isinstance(self.data, StudentTable) else 0
+        return len(self.data), table_version, self.version
+
+    def _get(self, position: int, field: str) -> Any:
+        if isinstance(self.data, StudentTable):
+            return self.data.get_value(position, field) if self.data.has_field(field) else None
+        return self.data[position].get(field)
+
+    def rebuild(self) -> None:
+        """Builds all three indexes from scratch (one pass plus one sort)."""
+        self.by_id: Dict[int, int] = {}
+        self.by_section: Dict[str, List[int]] = {}
+
+        for position in range(len(self.data)):
+            # setdefault keeps the first row for a repeated id, like the old linear scan
+            self.by_id.setdefault(self._get(position, 'student_id'), position)
+            self.by_section.setdefault(self._get(position, 'section'), []).append(position)
+
+        self.by_grade = GradeRanking(self.data)
+        self._built_for = self._stamp()
+
+    def _ensure_fresh(self) -> None:
+        if self._stamp() != self._built_for:
+            self.rebuild()
+
+    def _row(self, position: int) -> Mapping[str, Any]:
+        # A StudentTable row is already a copy; a list's own dict is shown read-only
+        row = self.data[position]
+        return row if isinstance(self.data, StudentTable) else MappingProxyType(row)
+
+    def _first_position(self, student_id: int, skip: int) -> int | None:
+        """The first row other than 'skip' with this id (O(N), only used when an id changes)."""
+        for position in range(len(self.data)):
+            if position != skip and self._get(position, 'student_id') == student_id:
+                return position
+        return None
+
+    # --- queries ---
+
+    def get(self, student_id: int) -> Mapping[str, Any] | None:
+        """The student with this id, or None."""
+        self._ensure_fresh()
+        position = self.by_id.get(student_id)
+        return None if position is None else self._row(position)
+
+    def sections(self) -> List[str]:
+        self._ensure_fresh()
+        return list(self.by_section)
+
+    def in_section(self, section: str) -> List[Mapping[str, Any]]:
+        """All students of one section, in file order."""
+        self._ensure_fresh()
+        return [self._row(position) for position in self.by_section.get(section, [])]
+
+    def grade_range(self, low: float, high: float) -> List[Mapping[str, Any]]:
+        """All students with low <= final_grade <= high, lowest grade first."""
+        self._ensure_fresh()
+        return [self._row(position) for position in self.by_grade.between(low, high)]
+
+    def rank(self, student_id: int) -> int | None:
+        """Class rank by final_grade (1 = highest; ties share a rank), or None."""
+        self._ensure_fresh()
+        position = self.by_id.get(student_id)
+        return None if position is None else self.by_grade.rank(position)
+
+    def top(self, k: int) -> List[Mapping[str, Any]]:
+        """The k students with the highest final grades, highest first."""
+        self._ensure_fresh()
+        return [self._row(position) for position, _ in self.by_grade.top(k)]
+
+    def bottom(self, k: int) -> List[Mapping[str, Any]]:
+        """The k students with the lowest final grades, lowest first."""
+        self._ensure_fresh()
+        return [self._row(position) for position, _ in self.by_grade.bottom(k)]
+
+    def percentiles(self, percentiles: List[float]) -> Dict[float, float | None]:
+        """Final-grade percentiles, the same values as analyze.find_percentiles."""
+        self._ensure_fresh()
+        return self.by_grade.percentiles(percentiles)
+
+    def statistics(self) -> Dict[str, float | None]:
+        """analyze.calculate_statistics(data, 'final_grade'), kept current without a rescan."""
+        self._ensure_fresh()
+        return self.by_grade.statistics()
+
+    # --- patching ---
+
+    def update_student(self, student_id: int, changes: Dict[str, Any]) -> bool:
+        """
+        Changes some fields of one student and patches the indexes to match,
+        without a rebuild (a new final_grade is O(log N)). Returns False if
+        the id is unknown.
+        """
+        self._ensure_fresh()
+        position = self.by_id.get(student_id)
+        if position is None:
+            return False
+
+        old_section = self._get(position, 'section')
+
+        for field, value in changes.items():
+            if isinstance(self.data, StudentTable):
+                self.data.set_value(position, field, value)
+            else:
+                self.data[position][field] = value
+
+        if 'student_id' in changes and changes['student_id'] != student_id:
+            # A repeated id falls back to its next row, as a rebuild would find it
+            duplicate = self._first_position(student_id, position)
+            if duplicate is None:
+                del self.by_id[student_id]
+            else:
+                self.by_id[student_id] = duplicate
+            new_id = changes['student_id']
+            self.by_id[new_id] = min(self.by_id.get(new_id, position), position)
+
+        if 'section' in changes and changes['section'] != old_section:
+            self.by_section[old_section].remove(position)
+            if not self.by_section[old_section]:
+                del self.by_section[old_section]
+            insort(self.by_section.setdefault(changes['section'], []), position)
+
+        if 'final_grade' in changes:
+            self.by_grade.update(position, changes['final_grade'])
+
+        self._built_for = self._stamp()
+        return True
+
+    def add_student(self, row: StudentRow) -> None:
+        """Appends a new student to the data and to the indexes."""
+        self._ensure_fresh()
+        if isinstance(self.data, StudentTable):
+            self.data.append_row(row)
+        else:
+            self.data.append(row)
+
+        position = len(self.data) - 1
+        self.by_id.setdefault(row['student_id'], position)
+        self.by_section.setdefault(row.get('section'), []).append(position)
+        self.by_grade.update(position, row.get('final_grade'))
+        self._built_for = self._stamp()
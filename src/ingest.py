@@ -1,72 +1,438 @@
 import csv
-from typing import List, Dict, Any, Tuple
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple, Iterator, Callable
+from .compression import detect_compression, open_input
+from .table import StudentTable, score_fields
+from .progress import PipelineCancelled
 
 StudentRow = Dict[str, Any]
 CleanData = List[StudentRow]
 BadData = List[Tuple[int, str, List[str]]] 
 
+# Rows per batch when streaming (config: "ingest" -> "batch_size")
+DEFAULT_BATCH_SIZE = 10000
+
+# Parallel ingest never cuts the file into shards smaller than this
+MIN_SHARD_BYTES = 1 << 20
+# Shards per worker, so one slow shard does not leave the other workers idle
+SHARDS_PER_WORKER = 4
+
+# Error codes of rejected rows. A code about one column carries it after a
+# colon, e.g. "out_of_range:quiz2", so rows can be counted per code and column.
+MISSING_COLUMN = 'missing_column'   # the header has no such column
+SHORT_ROW = 'short_row'             # the row has fewer values than the header
+MISSING_ID = 'missing_id'           # blank student_id
+NON_NUMERIC = 'non_numeric'         # a value that is not a number (or id not an integer)
+OUT_OF_RANGE = 'out_of_range'       # a score outside 0-100 (or NaN), or an id that does not fit int64
+
+# StudentTable, the snapshot and the student store keep ids as signed 64-bit ints
+STUDENT_ID_MIN = -(1 << 63)
+STUDENT_ID_MAX = (1 << 63) - 1
+
+def split_error(error: str) -> Tuple[str, str | None]:
+    """'out_of_range:quiz2' -> ('out_of_range', 'quiz2'); 'missing_id' -> ('missing_id', None)."""
+    code, _, column = error.partition(':')
+    return code, column or None
+
+# quiz_count -> its score field names, built once instead of once per row
+_NUMERIC_FIELDS: Dict[int, Tuple[str, ...]] = {}
+
+def _numeric_fields(quiz_count: int) -> Tuple[str, ...]:
+    fields = _NUMERIC_FIELDS.get(quiz_count)
+    if fields is None:
+        fields = _NUMERIC_FIELDS[quiz_count] = tuple(score_fields(quiz_count))
+    return fields
+
 def validate_and_clean_row(
     row_num: int, 
     row: Dict[str, str], 
     quiz_count: int
 ) -> Tuple[StudentRow | None, str | None]:
+    """
+    Cleans one csv.DictReader row. Returns (clean_row, None), or (None, error
+    code) for a rejected row: one of the codes above, with the column it
+    concerns after a colon.
+    """
+    clean_row = {}
+    for field in ('student_id', 'last_name', 'first_name', 'section'):
+        if field not in row:
+            return None, f"{MISSING_COLUMN}:{field}"
+        if row[field] is None:
+            return None, SHORT_ROW
+        clean_row[field] = row[field].strip()
+
+    if not clean_row['student_id']:
+        return None, MISSING_ID
     try:
-        clean_row = {}
-        clean_row['student_id'] = int(row['student_id'].strip())
-        clean_row['last_name'] = row['last_name'].strip()
-        clean_row['first_name'] = row['first_name'].strip()
-        clean_row['section'] = row['section'].strip()
+        clean_row['student_id'] = int(clean_row['student_id'])
+    except ValueError:
+        return None, f"{NON_NUMERIC}:student_id"
+    if not STUDENT_ID_MIN <= clean_row['student_id'] <= STUDENT_ID_MAX:
+        return None, f"{OUT_OF_RANGE}:student_id"
+
+    for field in _numeric_fields(quiz_count):
+        value = row.get(field, '')
+        if value is None:
+            return None, SHORT_ROW
+        value = value.strip()
+
+        if not value:
+            clean_row[field] = None
+            continue
+
+        try:
+            score = float(value)
+        except ValueError:
+            return None, f"{NON_NUMERIC}:{field}"
+
+        if not (0 <= score <= 100):
+            return None, f"{OUT_OF_RANGE}:{field}"
+
+        clean_row[field] = score
 
-        numeric_fields = []
-        for i in range(1, quiz_count + 1):
-            numeric_fields.append(f'quiz{i}')
-        numeric_fields.extend(['midterm', 'final', 'attendance_percent'])
+    return clean_row, None 
 
-        for field in numeric_fields:
-            value = row.get(field, '').strip() 
+def clean_row_keys(quiz_count: int) -> List[str]:
+    """The keys of a cleaned row, in the order validate_and_clean_row adds them."""
+    return ['student_id', 'last_name', 'first_name', 'section'] + score_fields(quiz_count)
 
+def compile_row_validator(
+    header: List[str],
+    quiz_count: int
+) -> Callable[[List[str]], StudentRow | None]:
+    """
+    Builds a fast validator for one file, once, from its header.
+
+    Field names are resolved to column positions up front, so the returned
+    function works on the plain list csv.reader gives for each row: no
+    DictReader dict, no f-strings, no lookups by name. It returns the clean
+    row, or None if anything is wrong with the row. It does not build an error
+    message: callers re-check failed rows with validate_and_clean_row, which
+    gives the error code (only bad rows pay for that).
+    """
+    # Last occurrence wins, same as DictReader with a duplicated header name
+    positions = {name: i for i, name in enumerate(header)}
+    keys = clean_row_keys(quiz_count)
+    text_positions = [positions.get(name) for name in keys[:4]]
+    numeric_positions = [positions.get(name) for name in keys[4:]]
+    width = len(header)
+
+    if None in text_positions or None in numeric_positions:
+        # A column is missing from the header: leave every row to the slow path
+        return lambda values: None
+
+    id_pos, last_pos, first_pos, section_pos = text_positions
+    get_scores = itemgetter(*numeric_positions)
+
+    def validate_with_blanks(values: List[str]) -> List[float | None] | None:
+        """Per-field version, only used for rows that have empty scores."""
+        scores: List[float | None] = []
+        for pos in numeric_positions:
+            value = values[pos].strip()
             if not value:
-                clean_row[field] = None
+                scores.append(None)
                 continue
-
             score = float(value)
-
             if not (0 <= score <= 100):
-                raise ValueError(f"Score {score} out of range (0-100)")
+                return None
+            scores.append(score)
+        return scores
 
-            clean_row[field] = score
+    def validate(values: List[str]) -> StudentRow | None:
+        if len(values) != width:
+            return None  # short/long rows are handled by the slow path
+        try:
+            # float() and int() ignore surrounding whitespace, so no strip() needed
+            scores = list(map(float, get_scores(values)))
+            total = sum(scores)
+            # min/max do the range check in C; total != total catches NaN
+            if min(scores) < 0 or max(scores) > 100 or total != total:
+                return None
+            student_id = int(values[id_pos])
+        except ValueError:
+            try:
+                scores = validate_with_blanks(values)
+                student_id = int(values[id_pos])
+            except ValueError:
+                return None
+            if scores is None:
+                return None
+        if not STUDENT_ID_MIN <= student_id <= STUDENT_ID_MAX:
+            return None
+        return dict(zip(keys, [
+            student_id,
+            values[last_pos].strip(),
+            values[first_pos].strip(),
+            values[section_pos].strip(),
+            *scores
+        ]))
 
-        return clean_row, None 
+    return validate
 
-    except Exception as e:
-        return None, str(e)
+def _as_dict_row(header: List[str], values: List[str]) -> Dict[Any, Any]:
+    """Rebuilds the dict csv.DictReader would have produced for this row."""
+    row: Dict[Any, Any] = dict(zip(header, values))
+    if len(header) < len(values):
+        row[None] = values[len(header):]
+    else:
+        for name in header[len(values):]:
+            row[name] = None
+    return row
 
-def read_and_validate_csv(
-    csv_path: str, 
+def _validate_raw_rows(
+    raw_rows: List[List[str]],
+    first_row_num: int,
+    header: List[str],
+    validate: Callable[[List[str]], StudentRow | None],
     quiz_count: int
 ) -> Tuple[CleanData, BadData]:
+    """
+    Validates a list of csv.reader rows with the compiled validator.
+    Rows it rejects go through validate_and_clean_row to get the error code
+    and the raw row list, exactly as the DictReader-based loop reported them.
+    """
+    results = list(map(validate, raw_rows))
+
+    if None not in results:
+        # Common case: the whole batch is clean, no per-row Python loop needed
+        return results, []
+
     clean_records: CleanData = []
     bad_rows: BadData = []
+    for offset, clean_row in enumerate(results):
+        if clean_row is None:
+            row_num = first_row_num + offset
+            row = _as_dict_row(header, raw_rows[offset])
+            clean_row, error = validate_and_clean_row(row_num, row, quiz_count)
+            if error:
+                bad_rows.append((row_num, error, list(row.values())))
+                continue
+        clean_records.append(clean_row)
+
+    return clean_records, bad_rows
+
+def iter_validated_batches(
+    csv_path: str,
+    quiz_count: int,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple[CleanData, BadData]]:
+    """
+    Streams the input CSV in batches instead of loading the whole file.
+    Yields (clean_records, bad_rows) for every batch_size rows read, so memory
+    stays bounded by the batch size. Row numbers keep counting across batches.
+    A gzip/bz2/xz file is decoded as it is read (see src/compression.py).
+    Errors (e.g. FileNotFoundError) are raised to the caller.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    with open_input(csv_path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        validate = compile_row_validator(header, quiz_count)
+        rows = filter(None, reader)  # DictReader skips blank lines too
+        rows_read = 0
+        while True:
+            raw_rows = list(islice(rows, batch_size))
+            if not raw_rows:
+                break
+            yield _validate_raw_rows(raw_rows, rows_read + 2, header, validate, quiz_count)
+            rows_read += len(raw_rows)
+
+def _plan_shards(csv_path: str, shard_count: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Reads the header and splits the rest of the file into byte ranges.
+    Every range starts right after a newline, so no row is cut in half.
+    (Assumes no quoted field contains a newline, which registrar exports don't.)
+    """
+    with open(csv_path, mode='rb') as f:
+        header_line = f.readline()
+        data_start = f.tell()
+        file_size = os.fstat(f.fileno()).st_size
+
+        # Header is parsed the same way DictReader would parse it
+        header = next(csv.reader([header_line.decode('utf-8')]), [])
+
+        shard_count = max(1, min(shard_count, (file_size - data_start) // MIN_SHARD_BYTES))
+        step = (file_size - data_start) // shard_count
+
+        starts = [data_start]
+        for k in range(1, shard_count):
+            f.seek(max(data_start + k * step, starts[-1]))
+            f.readline()  # move to the start of the next full line
+            position = f.tell()
+            if position >= file_size:
+                break
+            if position > starts[-1]:
+                starts.append(position)
+
+    ends = starts[1:] + [file_size]
+    return header, list(zip(starts, ends))
+
+def _validate_text(
+    text: str,
+    header: List[str],
+    quiz_count: int
+) -> Tuple[CleanData, BadData, int]:
+    """
+    Worker function: parses and validates a run of whole CSV lines.
+    Clean rows come back as value tuples in clean_row_keys() order.
+    Bad rows carry their position inside the shard; the parent turns that into
+    the real row number once it knows how many rows came before the shard.
+    """
+    raw_rows = list(filter(None, csv.reader(io.StringIO(text, newline=''))))
+    validate = compile_row_validator(header, quiz_count)
+    clean_records, bad_rows = _validate_raw_rows(raw_rows, 0, header, validate, quiz_count)
+
+    # Plain tuples are much cheaper to send back to the parent than dicts
+    clean_values = [tuple(clean_row.values()) for clean_row in clean_records]
+    return clean_values, bad_rows, len(raw_rows)
+
+def _validate_shard(
+    csv_path: str,
+    header: List[str],
+    start: int,
+    end: int,
+    quiz_count: int
+) -> Tuple[CleanData, BadData, int]:
+    """Worker function: reads one byte range of the file and validates it."""
+    with open(csv_path, mode='rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    return _validate_text(text, header, quiz_count)
+
+def _merge_shard_results(futures: Iterator[Any], quiz_count: int) -> Iterator[Tuple[CleanData, BadData]]:
+    """Turns worker results (in file order) back into batches with real row numbers."""
+    keys = clean_row_keys(quiz_count)
+    rows_before = 0
+    for future in futures:
+        clean_values, local_bad_rows, row_count = future.result()
+        clean_records = [dict(zip(keys, values)) for values in clean_values]
+        bad_rows = [
+            (rows_before + i + 2, error, raw_row_list)
+            for i, error, raw_row_list in local_bad_rows
+        ]
+        rows_before += row_count
+        yield clean_records, bad_rows
+
+def _iter_parallel_compressed(
+    csv_path: str,
+    quiz_count: int,
+    workers: int
+) -> Iterator[Tuple[CleanData, BadData]]:
+    """
+    Parallel validation of a compressed file, which cannot be split into byte
+    ranges: this process decodes the stream and hands the workers runs of
+    whole lines (about MIN_SHARD_BYTES each), keeping at most two per worker
+    in flight so memory stays bounded.
+    """
+    with open_input(csv_path) as f:
+        header = next(csv.reader([f.readline()]), None)
+        if header is None:
+            return
+
+        def submitted() -> Iterator[Any]:
+            in_flight: deque = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                while True:
+                    lines = f.readlines(MIN_SHARD_BYTES)
+                    if lines:
+                        in_flight.append(pool.submit(_validate_text, ''.join(lines), header, quiz_count))
+                    if in_flight and (not lines or len(in_flight) >= 2 * workers):
+                        yield in_flight.popleft()
+                    elif not lines:
+                        return
+
+        yield from _merge_shard_results(submitted(), quiz_count)
+
+def iter_parallel_batches(
+    csv_path: str,
+    quiz_count: int,
+    workers: int
+) -> Iterator[Tuple[CleanData, BadData]]:
+    """
+    Parallel version of iter_validated_batches: the file is split into
+    newline-aligned byte ranges and each range is validated in a process pool.
+    Shards are yielded in file order with the same row numbers the serial
+    reader would give, so the merged output is identical.
+    Compressed files are decoded here and validated in chunks by the pool.
+    """
+    if detect_compression(csv_path):
+        yield from _iter_parallel_compressed(csv_path, quiz_count, workers)
+        return
+
+    header, shards = _plan_shards(csv_path, workers * SHARDS_PER_WORKER)
+    if len(shards) == 1:
+        # File too small to be worth a process pool
+        yield from iter_validated_batches(csv_path, quiz_count)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_validate_shard, csv_path, header, start, end, quiz_count)
+            for start, end in shards
+        ]
+        yield from _merge_shard_results(iter(futures), quiz_count)
+
+def read_and_validate_csv(
+    csv_path: str, 
+    quiz_count: int,
+    as_table: bool = False,
+    workers: int = 1,
+    on_batch: Callable[[int], None] | None = None,
+    on_bad: Callable[[BadData], None] | None = None
+) -> Tuple[CleanData | StudentTable, BadData]:
+    """
+    Reads the input CSV and validates every row.
+    With as_table=True the clean records are returned as a columnar
+    StudentTable instead of a list of dicts.
+    With workers > 1 the file is validated in parallel (see iter_parallel_batches).
+    on_batch(rows_in_batch) is called after every batch (progress reporting);
+    a PipelineCancelled it raises is passed on to the caller.
+    With on_bad, each batch's bad rows are handed to on_bad(bad_batch) (e.g.
+    Quarantine.add) instead of being collected, and the returned list is empty.
+    """
+    clean_records: CleanData | StudentTable = []
+    if as_table:
+        clean_records = StudentTable(quiz_count)
+    empty_records = StudentTable(quiz_count) if as_table else []
+    bad_rows: BadData = []
 
     try:
-        with open(csv_path, mode='r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-
-            for i, row in enumerate(reader):
-                row_num = i + 2 
-                raw_row_list = list(row.values())
-                clean_row, error = validate_and_clean_row(row_num, row, quiz_count)
+        if workers > 1:
+            batches = iter_parallel_batches(csv_path, quiz_count, workers)
+        else:
+            batches = iter_validated_batches(csv_path, quiz_count)
 
-                if error:
-                    bad_rows.append((row_num, error, raw_row_list))
-                else:
-                    clean_records.append(clean_row)
+        for clean_batch, bad_batch in batches:
+            if on_bad is not None:
+                if bad_batch:
+                    on_bad(bad_batch)
+            else:
+                bad_rows.extend(bad_batch)
+            if as_table:
+                for clean_row in clean_batch:
+                    clean_records.append_row(clean_row)
+            else:
+                clean_records.extend(clean_batch)
+            if on_batch is not None:
+                on_batch(len(clean_batch) + len(bad_batch))
 
+    except PipelineCancelled:
+        raise
     except FileNotFoundError:
         print(f"Error: Input file not found at {csv_path}")
-        return [], [] 
+        return empty_records, [] 
     except Exception as e:
         print(f"Error: General error reading CSV: {e}")
-        return [], []
+        return empty_records, []
 
     return clean_records, bad_rows
@@ -0,0 +1,340 @@
+"""
+Multi-source ingest: separate exports keyed by student_id (the roster, the
+scores, the attendance...) joined into the one wide CSV the pipeline reads.
+
+    "sources": {"files": ["data/roster.csv", "data/scores.csv", "data/attendance.csv"],
+                "presorted": false, "sort_memory_rows": 200000, "temp_dir": null}
+
+With sources.files set, every pipeline run (and python -m src join) first
+writes the joined rows to paths.input_csv; ingest then validates them
+exactly as it would a hand-made wide file. The first file is the roster:
+  - an id in another file but not in the roster is an orphan and is dropped;
+  - a roster id missing from another file gets blank cells for its columns
+    (missing scores, as in a wide file with empty cells);
+  - a repeated id within one file is a duplicate; its first row is used.
+All of these are counted per file and reported with a few sample ids.
+
+Every file is read once as a stream. Files already sorted by student_id
+("presorted": true) are merge-joined directly (an out-of-order id is an
+error). Otherwise each file is sorted first: in memory if it has at most
+sort_memory_rows rows, else as sorted runs of that many rows spilled to
+temp files and merged back with heapq.merge. Memory is therefore bounded by
+sort_memory_rows rows per file, not by the file sizes. Ids sort numerically ("007" and
+"7" are the same student, as int() sees them); joined rows come out in id
+order.
+"""
+import csv
+import heapq
+import os
+import tempfile
+from itertools import islice
+from operator import itemgetter
+from typing import List, Dict, Any, Callable, Iterator, Tuple
+from .compression import detect_compression, open_input, open_output
+
+ID_COLUMN = 'student_id'
+DEFAULT_SORT_MEMORY_ROWS = 200_000
+# Sample ids kept per file for each kind of problem in the report
+SAMPLE_LIMIT = 5
+
+JoinKey = Tuple[int, int, str]
+# (join key, row number in its file, the row's values)
+SourceRow = Tuple[JoinKey, int, List[str]]
+JoinReport = Dict[str, Any]
+
+_BLANK_ID: JoinKey = (1, 0, '')
+_join_key_of = itemgetter(0)
+
+
+def join_key(raw_id: str) -> JoinKey:
+    """Integer ids in numeric order, anything else after them as text."""
+    try:
+        return (0, int(raw_id), '')  # int() ignores surrounding whitespace itself
+    except ValueError:
+        return (1, 0, raw_id.strip())
+
+
+def _read_header(path: str) -> Tuple[List[str], int]:
+    """A source's header and the position of its student_id column (ValueError if it has none)."""
+    with open_input(path) as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise ValueError(f"{path} is empty")
+    header = [name.strip() for name in header]
+    if ID_COLUMN not in header:
+        raise ValueError(f"{path} has no {ID_COLUMN} column")
+    return header, header.index(ID_COLUMN)
+
+
+def _iter_source(path: str, id_position: int) -> Iterator[SourceRow]:
+    """Every data row of a source, in file order; blank lines are skipped like ingest does."""
+    with open_input(path) as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row_num, values in enumerate(filter(None, reader), start=2):
+            raw_id = values[id_position] if id_position < len(values) else ''
+            yield join_key(raw_id), row_num, values
+
+
+def _check_sorted(rows: Iterator[SourceRow], path: str) -> Iterator[SourceRow]:
+    previous = None
+    for row in rows:
+        if previous is not None and row[0] < previous:
+            raise ValueError(f"{path} is not sorted by {ID_COLUMN} (row {row[1]}); "
+                             f"set sources.presorted to false")
+        previous = row[0]
+        yield row
+
+
+def _write_run(rows: List[SourceRow], run_prefix: str, run_number: int) -> str:
+    path = f"{run_prefix}{run_number}.csv"
+    with open(path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for _, row_num, values in rows:
+            writer.writerow([row_num] + values)
+    return path
+
+
+def _read_run(path: str, id_position: int) -> Iterator[SourceRow]:
+    with open(path, mode='r', newline='', encoding='utf-8') as f:
+        for fields in csv.reader(f):
+            values = fields[1:]
+            raw_id = values[id_position] if id_position < len(values) else ''
+            yield join_key(raw_id), int(fields[0]), values
+
+
+def _sorted_source(
+    rows: Iterator[SourceRow],
+    id_position: int,
+    memory_rows: int,
+    run_prefix: str
+) -> Iterator[SourceRow]:
+    """
+    The rows in id order (file order within an id). A file of at most
+    memory_rows rows is sorted in memory; a bigger one is cut into sorted
+    runs of memory_rows rows, spilled to run_prefix<n>.csv files, and merged
+    back one row per run at a time.
+    """
+    # Sorting by the id alone is faster than by (id, row number), and stable
+    # sorts and merges keep a duplicate id's rows in file order anyway
+    chunk = list(islice(rows, memory_rows))
+    chunk.sort(key=_join_key_of)
+    next_chunk = list(islice(rows, memory_rows))
+    if not next_chunk:
+        yield from chunk
+        return
+
+    run_paths = [_write_run(chunk, run_prefix, 0)]
+    del chunk
+    while next_chunk:
+        next_chunk.sort(key=_join_key_of)
+        run_paths.append(_write_run(next_chunk, run_prefix, len(run_paths)))
+        next_chunk = list(islice(rows, memory_rows))
+    yield from heapq.merge(*(_read_run(path, id_position) for path in run_paths), key=_join_key_of)
+
+
+def _new_source_report(path: str) -> Dict[str, Any]:
+    return {
+        'path': path, 'rows': 0, 'duplicates': 0, 'orphans': 0, 'missing': 0, 'blank_ids': 0, 'short_rows': 0,
+        'samples': {'duplicates': [], 'orphans': [], 'missing': []},
+    }
+
+
+def _note(source_report: Dict[str, Any], problem: str, raw_id: str, count: int = 1) -> None:
+    source_report[problem] += count
+    samples = source_report['samples'][problem]
+    if len(samples) < SAMPLE_LIMIT:
+        samples.append(raw_id)
+
+
+def join_sources(
+    paths: List[str],
+    output_path: str,
+    presorted: bool = False,
+    memory_rows: int = DEFAULT_SORT_MEMORY_ROWS,
+    temp_dir: str | None = None
+) -> JoinReport:
+    """
+    Joins the sources on student_id (paths[0] is the roster) and writes the
+    wide CSV to output_path (compressed if its extension says so), via a temp
+    file renamed into place. Returns the report: joined row count, ignored
+    columns, and per file its row count and the duplicates, orphans, missing
+    ids, blank ids and short rows found (with sample ids).
+    Raises ValueError for a bad source (no student_id column, unsorted with
+    presorted=True) and FileNotFoundError for a missing one.
+    """
+    if not paths:
+        raise ValueError("no source files to join")
+    if memory_rows < 1:
+        raise ValueError("sort_memory_rows must be at least 1")
+    output_abspath = os.path.abspath(output_path)
+    if any(os.path.abspath(path) == output_abspath for path in paths):
+        raise ValueError(f"the joined file {output_path} cannot also be a source")
+
+    headers = [_read_header(path) for path in paths]
+    # Each column comes from the first file that has it
+    out_header = [ID_COLUMN]
+    taken: List[List[int]] = []
+    ignored: List[str] = []
+    for path, (header, id_position) in zip(paths, headers):
+        positions = []
+        for position, name in enumerate(header):
+            if position == id_position:
+                continue
+            if name in out_header:
+                ignored.append(f"{name} ({path})")
+                continue
+            out_header.append(name)
+            positions.append(position)
+        taken.append(positions)
+
+    report: JoinReport = {'rows': 0, 'ignored_columns': ignored,
+                          'sources': [_new_source_report(path) for path in paths]}
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Per-process temp name: parallel runs may join into the same output at once
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with tempfile.TemporaryDirectory(dir=temp_dir, prefix="join-") as spill_dir:
+        streams = []
+        for i, (path, (_, id_position)) in enumerate(zip(paths, headers)):
+            rows = _iter_source(path, id_position)
+            if presorted:
+                rows = _check_sorted(rows, path)
+            else:
+                rows = _sorted_source(rows, id_position, memory_rows, os.path.join(spill_dir, f"{i}-run-"))
+            streams.append(rows)
+
+        try:
+            with open_output(temp_path, detect_compression(output_path)) as f:
+                writer = csv.writer(f)
+                writer.writerow(out_header)
+                report['rows'] = _merge_join(streams, headers, taken, report['sources'], writer)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return report
+
+
+def _picker(positions: List[int]) -> Callable[[List[str]], Tuple[str, ...]]:
+    """The values at 'positions' of a row, as one C-level call for the usual several columns."""
+    if not positions:
+        return lambda values: ()
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda values: (values[position],)
+    return itemgetter(*positions)
+
+
+def _merge_join(
+    streams: List[Iterator[SourceRow]],
+    headers: List[Tuple[List[str], int]],
+    taken: List[List[int]],
+    source_reports: List[Dict[str, Any]],
+    writer: Any
+) -> int:
+    """The k-way merge: one step per distinct id, holding only that id's first rows."""
+    pickers = [_picker(positions) for positions in taken]
+    blanks = [('',) * len(positions) for positions in taken]
+    widths = [len(header) for header, _ in headers]
+    sources = range(len(streams))
+    heads = [next(stream, None) for stream in streams]
+    written = 0
+    while True:
+        key = min((head[0] for head in heads if head is not None), default=None)
+        if key is None:
+            return written
+        first_rows: List[List[str] | None] = []
+        counts = []
+        for i in sources:
+            head = heads[i]
+            if head is None or head[0] != key:
+                first_rows.append(None)
+                counts.append(0)
+                continue
+            first_rows.append(head[2])
+            count = 1
+            head = next(streams[i], None)
+            while head is not None and head[0] == key:
+                count += 1
+                head = next(streams[i], None)
+            heads[i] = head
+            counts.append(count)
+            source_reports[i]['rows'] += count
+
+        if key == _BLANK_ID:
+            for source_report, count in zip(source_reports, counts):
+                source_report['blank_ids'] += count
+            continue
+        first = next(i for i in sources if counts[i])
+        raw_id = first_rows[first][headers[first][1]].strip()
+        for source_report, count in zip(source_reports, counts):
+            if count > 1:
+                _note(source_report, 'duplicates', raw_id, count - 1)
+        if first_rows[0] is None:
+            for source_report, count in zip(source_reports, counts):
+                if count:
+                    _note(source_report, 'orphans', raw_id)
+            continue
+
+        out_row = [raw_id]
+        for i in sources:
+            values = first_rows[i]
+            if values is None:
+                _note(source_reports[i], 'missing', raw_id)
+                out_row.extend(blanks[i])
+                continue
+            if len(values) < widths[i]:
+                source_reports[i]['short_rows'] += 1
+                values = values + [''] * (widths[i] - len(values))
+            out_row.extend(pickers[i](values))
+        writer.writerow(out_row)
+        written += 1
+
+
+def source_files(config: Dict[str, Any]) -> List[str]:
+    """The files config["sources"] joins, or [] when the input is a single wide CSV."""
+    return list(config.get("sources", {}).get("files") or [])
+
+
+def print_join_report(report: JoinReport, output_path: str) -> None:
+    print(f"Joined {len(report['sources'])} sources: {report['rows']} students -> {output_path}")
+    for name in report['ignored_columns']:
+        print(f"  column {name} ignored: an earlier file has it")
+    for source_report in report['sources']:
+        problems = []
+        for problem in ('duplicates', 'orphans', 'missing'):
+            if source_report[problem]:
+                samples = ', '.join(source_report['samples'][problem])
+                problems.append(f"{source_report[problem]} {problem} (e.g. {samples})")
+        for problem in ('blank_ids', 'short_rows'):
+            if source_report[problem]:
+                problems.append(f"{source_report[problem]} {problem.replace('_', ' ')}")
+        print(f"  {source_report['path']}: {source_report['rows']} rows"
+              + (f"; {'; '.join(problems)}" if problems else ""))
+
+
+def run_join(config: Dict[str, Any]) -> JoinReport | None:
+    """
+    Joins config["sources"]["files"] into config["paths"]["input_csv"] and
+    prints the report. Returns None (after printing the error) if it fails.
+    """
+    settings = config.get("sources", {})
+    output_path = config["paths"]["input_csv"]
+    try:
+        report = join_sources(
+            source_files(config),
+            output_path,
+            presorted=settings.get("presorted", False),
+            memory_rows=settings.get("sort_memory_rows", DEFAULT_SORT_MEMORY_ROWS),
+            temp_dir=settings.get("temp_dir")
+        )
+    except FileNotFoundError as e:
+        print(f"Error: Source file not found: {e.filename}")
+        return None
+    except ValueError as e:
+        print(f"Error: Cannot join the sources: {e}")
+        return None
+    print_join_report(report, output_path)
+    return report
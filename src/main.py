@@ -1,10 +1,25 @@
 import json
 import os
+import time
 from . import ingest
 from . import transform
 from . import analyze
 from . import reports
-from typing import List, Dict, Any
+from . import cache as pipeline_cache
+from .cache import pipeline_stage_keys
+from . import snapshot as record_snapshot
+from . import metrics as pipeline_metrics
+from . import results as saved_results
+from . import store as student_store
+from . import scenarios as what_if
+from . import join as multi_source
+from .cohorts import at_risk_rule
+from .quarantine import Quarantine, quarantine_settings, read_header, print_bad_row_summary
+from .table import StudentTable
+from .index import StudentIndex
+from .background import BackgroundPipeline
+from .progress import PipelineProgress, PipelineCancelled
+from typing import List, Dict, Any, Tuple, Callable
 
 StudentData = List[Dict[str, Any]]
 
@@ -15,28 +30,230 @@ def load_config(config_path: str) -> Dict[str, Any]:
         config = json.load(f)
     return config
 
-def run_full_pipeline(config: Dict[str, Any]) -> StudentData:
+def run_full_pipeline(
+    config: Dict[str, Any],
+    metrics_callback: Callable[[Dict[str, Any]], None] | None = None,
+    progress: PipelineProgress | None = None
+) -> StudentData:
     """
     Runs the complete ETL (Extract, Transform, Load) pipeline.
     This is the main function we've already built.
+    If config["ingest"]["streaming"] is true, the file is processed batch by
+    batch instead (see run_streaming_pipeline).
+    With config["metrics"] enabled (or a metrics_callback), every stage
+    emits a record with its wall time, rows in/out and rows/sec.
+    A PipelineProgress is kept up to date with the current stage and row
+    count; after progress.cancel() the run stops with PipelineCancelled.
+    With config["results"] enabled the processed records are saved at the
+    end, for the CLI (src.cli) to read; with config["store"] enabled they
+    are also bulk-loaded into the SQLite student store.
+    With config["sources"]["files"] set, those exports are first joined on
+    student_id into paths.input_csv (see src/join.py).
     """
+    transform.set_backend(config.get("transform_backend", "auto"))
+    metrics = pipeline_metrics.open_metrics(config, metrics_callback, progress)
+    metrics.start()
+    student_records = None
+    try:
+        student_records = _pipeline_stages(config, metrics, progress)
+        # it returns processed data so that the menu will be able to hold it.
+        return student_records
+    finally:
+        # Also on failure or cancel: emits an ok=False record and stops tracemalloc
+        ok = student_records is not None
+        metrics.finish(rows_out=len(student_records) if ok else None, ok=ok)
+
+def _pipeline_stages(
+    config: Dict[str, Any],
+    metrics: pipeline_metrics.PipelineMetrics,
+    progress: PipelineProgress | None
+) -> StudentData:
+    if multi_source.source_files(config):
+        with metrics.stage('join') as stage:
+            print("--- 0. Joining sources ---")
+            report = multi_source.run_join(config)
+            stage.rows_out = report['rows'] if report else 0
+        if report is None:
+            return []
+        print()
+    if config.get("ingest", {}).get("streaming", False):
+        student_records = run_streaming_pipeline(config, metrics)
+        saved_results.save_results(config, student_records)
+        student_store.save_store(config, student_records)
+        return student_records
+
+    cache = pipeline_cache.open_cache(config)
+    needs_keys = cache or _snapshot_path(config) or saved_results.results_path(config) \
+        or student_store.store_path(config)
+    keys = pipeline_stage_keys(config) if needs_keys else {}
+
+    # A cached transform result means neither the input nor the grading config changed
+    student_records = cache.load('transform', keys['transform']) if cache else None
+    if student_records is not None:
+        with metrics.stage('transform') as stage:
+            print("--- 1. Ingestion + 2. Transformation (cached) ---")
+            print(f"\n loaded: {len(student_records)} processed records")
+            stage.rows_out = len(student_records)
+            stage.cached = True
+    else:
+        with metrics.stage('ingest') as stage:
+            student_records = _ingest_stage(config, cache, keys, stage, progress)
+            stage.rows_out = len(student_records)
+        if not student_records:
+            return []
+        with metrics.stage('transform', rows_in=len(student_records)) as stage:
+            student_records = _transform_stage(config, student_records)
+            if cache:
+                cache.store('transform', keys['transform'], student_records)
+            stage.rows_out = len(student_records)
+
+    # 3 + 4. analysis and reports
+    output_dir = config["paths"]["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    cached_reports = cache.load('reports', keys['reports']) if cache else None
+    if cached_reports is not None:
+        with metrics.stage('reports', rows_in=len(student_records)) as stage:
+            print("\n--- 3. Analysis + 4. Reporting (cached) ---")
+            print(f"\nStudents at risk: {cached_reports['at_risk_count']}")
+            restored = _restore_report_files(cached_reports['files'], output_dir)
+            print(f"Report files restored: {restored} of {len(cached_reports['files'])}")
+            stage.rows_out = len(student_records)
+            stage.cached = True
+    else:
+        at_risk_list, written_files = _analysis_and_report_stage(config, student_records, output_dir, metrics)
+        if cache:
+            files = {}
+            for name in written_files:
+                with open(os.path.join(output_dir, name), mode='rb') as f:
+                    files[name] = f.read()
+            cache.store('reports', keys['reports'], {'at_risk_count': len(at_risk_list), 'files': files})
+
+    saved_results.save_results(config, student_records, keys.get('transform'))
+    student_store.save_store(config, student_records, keys.get('transform'))
+    print("\n--- Pipeline Complete ---")
+    return student_records
+
+def _ingest_stage(
+    config: Dict[str, Any],
+    cache: pipeline_cache.PipelineCache | None,
+    keys: Dict[str, str],
+    stage: Any = None,
+    progress: PipelineProgress | None = None
+) -> StudentData:
     # 1. this is the start of the ingestion, reading and validating of data inside the (input.csv)
     print("--- 1. Ingestion ---")
-    student_records, bad_rows = ingest.read_and_validate_csv(
-        config["paths"]["input_csv"],
-        config["quiz_count"]
-    )
+    snapshot_path = _snapshot_path(config)
+    snapshot_records = _load_snapshot(snapshot_path, keys['ingest']) if snapshot_path else None
+    cached = cache.load('ingest', keys['ingest']) if cache and snapshot_records is None else None
+    quarantine_path, sample_limit = quarantine_settings(config)
+    bad_summary = None
+    if snapshot_records is not None:
+        student_records = snapshot_records
+        print(f"(from snapshot {snapshot_path}; bad rows were reported when it was built)")
+    elif cached is not None:
+        student_records, bad_summary = cached
+        print("(cached)")
+    else:
+        csv_path = config["paths"]["input_csv"]
+        # Bad rows go straight to the quarantine file; only counts and samples stay in memory
+        with Quarantine(quarantine_path, read_header(csv_path), sample_limit) as quarantine:
+            student_records, _ = ingest.read_and_validate_csv(
+                csv_path,
+                config["quiz_count"],
+                workers=config.get("ingest", {}).get("workers", 1),
+                on_batch=progress.add_rows if progress else None,
+                on_bad=quarantine.add
+            )
+        bad_summary = quarantine.summary()
+        if cache and student_records:
+            cache.store('ingest', keys['ingest'], (student_records, bad_summary))
+        if snapshot_path and student_records:
+            table = StudentTable.from_rows(student_records, config["quiz_count"])
+            size = record_snapshot.write_snapshot(table, snapshot_path, keys['ingest'])
+            print(f"Snapshot written: {snapshot_path} ({size} bytes)")
     
     print(f"\n ingested: {len(student_records)} records")
-    print(f"Skipped: {len(bad_rows)}")
-    if bad_rows:
-        print(f"Bad row log (first 5): {bad_rows[:5]}")
+    if bad_summary is not None:
+        print_bad_row_summary(bad_summary, quarantine_path)
+    if stage is not None:
+        stage.rows_in = len(student_records) + (bad_summary['total'] if bad_summary else 0)
+        stage.cached = snapshot_records is not None or cached is not None
 
     # If no records, return an empty list
     if not student_records:
         print("\nNo student record found. aborting pipeline.")
         return []
+    return student_records
+
+def _snapshot_path(config: Dict[str, Any]) -> str | None:
+    """Where the cleaned-records snapshot lives, or None when snapshots are disabled."""
+    settings = config.get("snapshot", {})
+    if not settings.get("enabled", False):
+        return None
+    return settings.get("path", "data/cleaned_records.snapshot")
+
+def _load_snapshot(path: str, ingest_key: str) -> StudentTable | None:
+    """The snapshot's records, or None if it is missing, corrupt or stale."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return record_snapshot.load_snapshot(path, ingest_key)
+    except record_snapshot.SnapshotError as e:
+        print(f"Snapshot not used: {e}")
+        return None
+
+def load_from_snapshot(config: Dict[str, Any]) -> StudentTable | None:
+    """
+    Startup shortcut for the menu: if a snapshot of the current input exists,
+    load it (no CSV parsing) and run the transform stage on it, so statistics
+    and lookups work right away. Returns None if there is no usable snapshot.
+    """
+    snapshot_path = _snapshot_path(config)
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return None
+    transform.set_backend(config.get("transform_backend", "auto"))
+    started = time.perf_counter()
+    student_records = _load_snapshot(snapshot_path, pipeline_stage_keys(config)['ingest'])
+    if student_records is None:
+        return None
+    print(f"Loaded {len(student_records)} records from {snapshot_path} "
+          f"in {time.perf_counter() - started:.3f}s")
+    return _transform_stage(config, student_records)
+
+def run_scenario_sweep(
+    config: Dict[str, Any],
+    grid: Dict[str, List[Dict[str, Any]]] | None = None
+) -> List[Dict[str, Any]]:
+    """
+    What-if comparison: ingests once (snapshot, cache or CSV), evaluates every
+    scenario of the grid (config["scenarios"]["grid"] by default), prints the
+    comparison table and writes it to scenario_comparison.csv.
+    """
+    transform.set_backend(config.get("transform_backend", "auto"))
+    settings = config.get("scenarios", {})
+    scenario_list = what_if.build_scenarios(config, settings.get("grid", {}) if grid is None else grid)
+
+    cache = pipeline_cache.open_cache(config)
+    keys = pipeline_stage_keys(config) if cache or _snapshot_path(config) else {}
+    student_records = _ingest_stage(config, cache, keys)
+    if not student_records:
+        return []
+
+    print(f"\n--- What-if: {len(scenario_list)} scenarios ---")
+    started = time.perf_counter()
+    rows = what_if.run_scenarios(
+        student_records, scenario_list, config["quiz_count"], workers=settings.get("workers", 4)
+    )
+    print(f"Evaluated in {time.perf_counter() - started:.3f}s\n")
+    what_if.print_comparison(rows)
+
+    output_dir = config["paths"]["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    headers, table = what_if.comparison_table(rows)
+    reports.export_scenario_comparison(headers, table, output_dir, reports.report_compression(config))
+    return rows
 
+def _transform_stage(config: Dict[str, Any], student_records: StudentData) -> StudentData:
     # 2. transformation of the data provided
     print("\n--- 2. Transformation ---")
     student_records = transform.compute_weighted_grade(
@@ -60,83 +277,375 @@ def run_full_pipeline(config: Dict[str, Any]) -> StudentData:
         config["grade_cutoffs"]
     )
     print("Letter grades assigned.")
+    return student_records
 
+def _analysis_and_report_stage(
+    config: Dict[str, Any],
+    student_records: StudentData,
+    output_dir: str,
+    metrics: pipeline_metrics.PipelineMetrics = pipeline_metrics.DISABLED
+) -> Tuple[StudentData, List[str]]:
+    """Runs analysis and writes the reports; returns (at-risk students, report file names)."""
     # 3. calculation/analyzation of the data
-    print("\n--- 3. Analysis ---")
-    grade_stats = analyze.calculate_statistics(student_records, 'final_grade')
-    print("\n final class grades (Final Grade):")
-    
-    at_risk_list, _ = analyze.find_at_risk_students(
-        student_records,
-        config["thresholds"]["at_risk_grade"],
-        config["thresholds"]["at_risk_attendance"]
-    )
-    print(f"\nStudents at risk: {len(at_risk_list)}")
+    with metrics.stage('analysis', rows_in=len(student_records)) as stage:
+        print("\n--- 3. Analysis ---")
+        grade_stats = analyze.calculate_statistics(student_records, 'final_grade')
+        print("\n final class grades (Final Grade):")
+        
+        at_risk_list = at_risk_rule(
+            config["thresholds"]["at_risk_grade"],
+            config["thresholds"]["at_risk_attendance"]
+        ).evaluate(student_records).select(student_records)
+        print(f"\nStudents at risk: {len(at_risk_list)}")
+
+        # One grouping by section, shared by the section statistics and the section reports
+        sections = reports.group_by_section(student_records)
+        stats_settings = config.get("section_statistics", {})
+        section_stats = analyze.grouped_statistics(
+            student_records,
+            by='section',
+            fields=stats_settings.get("fields", ["final_grade"]),
+            percentiles=stats_settings.get("percentiles", analyze.DEFAULT_GROUP_PERCENTILES),
+            groups=sections
+        )
+        print(f"Section statistics computed for {len(section_stats)} sections.")
+        stage.rows_out = len(at_risk_list)
 
     # 4. reporting of data
-    print("\n--- 4. Reporting ---")
+    with metrics.stage('reports', rows_in=len(student_records)) as stage:
+        print("\n--- 4. Reporting ---")
+        compression = reports.report_compression(config)
+        summary = reports.write_reports(
+            student_records,
+            at_risk_list,
+            output_dir,
+            workers=config.get("reports", {}).get("workers", 4),
+            sections=sections,
+            compression=compression
+        )
+        written_files = summary['files']
+        stats_file = reports.export_grouped_statistics(section_stats, output_dir, by='section', compression=compression)
+        if stats_file:
+            written_files.append(stats_file)
+        stage.rows_out = len(student_records)
+    return at_risk_list, written_files
+
+def _restore_report_files(files: Dict[str, bytes], output_dir: str) -> int:
+    """Writes cached report files back, skipping ones that are already identical."""
+    restored = 0
+    for name, content in files.items():
+        path = os.path.join(output_dir, name)
+        try:
+            with open(path, mode='rb') as f:
+                if f.read() == content:
+                    continue
+        except FileNotFoundError:
+            pass
+        with open(path, mode='wb') as f:
+            f.write(content)
+        restored += 1
+    return restored
+
+def run_streaming_pipeline(
+    config: Dict[str, Any],
+    metrics: pipeline_metrics.PipelineMetrics = pipeline_metrics.DISABLED
+) -> StudentData | StudentTable:
+    """
+    Same pipeline as run_full_pipeline, but the CSV is read in batches so
+    peak memory depends on the batch size, not on the file size.
+
+    The curve needs the class-wide max before any grade can be curved, so the
+    file is read twice:
+      pass 1: weighted grades only, to find the max grade
+      pass 2: weighted grade -> curve -> letter grade -> at-risk -> reports,
+              one batch at a time
+    Only the final grades are kept across batches (for the median), or, with
+    "approximate_stats": true, just one fixed-size QuantileSketch per section.
+    With "keep_records": true the processed rows are also kept, in a compact
+    StudentTable, so the menu can show statistics and look up students. It is
+    off by default: kept rows make memory grow with the file again.
+    """
+    ingest_settings = config.get("ingest", {})
+    batch_size = ingest_settings.get("batch_size", ingest.DEFAULT_BATCH_SIZE)
+    keep_records = ingest_settings.get("keep_records", False)
+    approximate_stats = ingest_settings.get("approximate_stats", False)
+    sketch_error = ingest_settings.get("sketch_error", 0.01)
+    csv_path = config["paths"]["input_csv"]
+    quiz_count = config["quiz_count"]
+    weights = config["weights"]
+
+    # 1. first pass: validate + weighted grade, keeping only the running max
+    print(f"--- 1. Ingestion (streaming, batches of {batch_size}) ---")
+    record_count = 0
+    quarantine_path, sample_limit = quarantine_settings(config)
+    max_grade = None
+    with metrics.stage('streaming_pass1') as stage, \
+            Quarantine(quarantine_path, read_header(csv_path), sample_limit) as quarantine:
+        try:
+            for clean_batch, bad_batch in ingest.iter_validated_batches(csv_path, quiz_count, batch_size):
+                record_count += len(clean_batch)
+                quarantine.add(bad_batch)
+
+                transform.compute_weighted_grade(clean_batch, weights, quiz_count)
+                for row in clean_batch:
+                    if max_grade is None or row['final_grade'] > max_grade:
+                        max_grade = row['final_grade']
+                if metrics.progress is not None:
+                    metrics.progress.add_rows(len(clean_batch) + len(bad_batch))
+        except PipelineCancelled:
+            raise
+        except FileNotFoundError:
+            print(f"Error: Input file not found at {csv_path}")
+            return []
+        except Exception as e:
+            print(f"Error: General error reading CSV: {e}")
+            return []
+        stage.rows_in = record_count + quarantine.total
+        stage.rows_out = record_count
+
+    print(f"\n ingested: {record_count} records")
+    print_bad_row_summary(quarantine.summary(), quarantine_path)
+
+    if not record_count:
+        print("\nNo student record found. aborting pipeline.")
+        return []
+
+    # 2. the curve amount can now be worked out from the class-wide max
+    print("\n--- 2. Transformation ---")
+    curve_settings = config.get("curve_settings", {})
+    curve_amount = 0.0
+    if curve_settings.get("apply_curve", False):
+        print("Applying grade curve...")
+        curve_amount = curve_settings["target_max_grade"] - max_grade
+        if curve_amount <= 0:
+            print(f"  No curve applied (max grade is already {max_grade}).")
+            curve_amount = 0.0
+        else:
+            print(f"  Applying a {curve_amount:.2f} point curve to all students.")
+    else:
+        print("Grade curve is disabled in config.")
+
+    # 3. second pass: transform, analyze and report one batch at a time
+    print("\n--- 3. Analysis + Reporting (streaming) ---")
     output_dir = config["paths"]["output_dir"]
     os.makedirs(output_dir, exist_ok=True)
-    reports.export_at_risk_csv(at_risk_list, output_dir)
-    reports.export_section_reports(student_records, output_dir)
-    
+    started_files: set = set()
+    compression = reports.report_compression(config)
+    final_grades = []
+    section_sketches: Dict[str, analyze.QuantileSketch] = {}
+    at_risk_count = 0
+    at_risk = at_risk_rule(config["thresholds"]["at_risk_grade"], config["thresholds"]["at_risk_attendance"])
+    kept_records = StudentTable(quiz_count)
+
+    with metrics.stage('streaming_pass2', rows_in=record_count) as stage:
+        for clean_batch, _ in ingest.iter_validated_batches(csv_path, quiz_count, batch_size):
+            transform.compute_weighted_grade(clean_batch, weights, quiz_count)
+            if curve_amount > 0:
+                transform.apply_curve_amount(clean_batch, curve_amount, curve_settings["curve_cap"])
+            transform.assign_letter_grade(clean_batch, config["grade_cutoffs"])
+
+            at_risk_batch = at_risk.evaluate(clean_batch).select(clean_batch)
+            at_risk_count += len(at_risk_batch)
+            reports.append_at_risk_csv(at_risk_batch, output_dir, started_files, compression)
+            reports.append_section_reports(clean_batch, output_dir, started_files, compression)
+
+            if approximate_stats:
+                for row in clean_batch:
+                    sketch = section_sketches.get(row['section'])
+                    if sketch is None:
+                        sketch = section_sketches[row['section']] = analyze.QuantileSketch.for_error(sketch_error)
+                    sketch.update(row['final_grade'])
+            else:
+                final_grades.extend(row['final_grade'] for row in clean_batch)
+            if keep_records:
+                for row in clean_batch:
+                    kept_records.append_row(row)
+            if metrics.progress is not None:
+                metrics.progress.add_rows(len(clean_batch))
+        stage.rows_out = record_count
+
+    if approximate_stats:
+        # Per-section sketches merge into one class-wide sketch
+        class_sketch = analyze.QuantileSketch.for_error(sketch_error)
+        for sketch in section_sketches.values():
+            class_sketch.merge(sketch)
+        grade_stats = class_sketch.summary()
+        print(f"\n final class grades (Final Grade, median within ~{class_sketch.rank_error:.1%} rank): {grade_stats}")
+        print(f" percentiles: {class_sketch.percentiles([10, 25, 75, 90])}")
+    else:
+        grade_stats = analyze.summarize_values(final_grades)
+        print(f"\n final class grades (Final Grade): {grade_stats}")
+    print(f"\nStudents at risk: {at_risk_count}")
+    print(f"Report files written: {len(started_files)}")
+
     print("\n--- Pipeline Complete ---")
-    
-    # it returns processed data so that the menu will be able to hold it.
-    return student_records
+    return kept_records if keep_records else []
+def _records_not_kept(config: Dict[str, Any]) -> bool:
+    """True when a streaming run hands the menu no rows (ingest.keep_records is off)."""
+    ingest_settings = config.get("ingest", {})
+    return ingest_settings.get("streaming", False) and not ingest_settings.get("keep_records", False)
+
+def _print_records_not_kept() -> None:
+    print("Note: streaming runs keep no rows unless ingest.keep_records is true in config;")
+    print("statistics [2], [5] and lookups [3], [4] need it switched on.")
+
 #  command  line menu 
-def show_menu():
+def show_menu(pipeline_job: BackgroundPipeline | None = None):
     """Prints the main menu options to the console."""
     print("\n" + "="*30)
     print("  PUPQC Academic Analytics  Menu")
     print("="*30)
+    if pipeline_job is not None and pipeline_job.state != 'idle':
+        print(pipeline_job.status())
+        print("-"*30)
     print("[1] Run Full Pipeline (Load, Transform, Report)")
     print("[2] Show Class Statistics")
     print("[3] Find Student by ID")
+    print("[4] Find Students by Grade Range")
+    print("[5] Show Section Statistics")
+    print("[6] Compare What-If Scenarios")
+    print("[7] Correct a Final Grade")
+    print("[C] Clear Pipeline Cache")
+    if pipeline_job is not None and pipeline_job.running:
+        print("[X] Cancel Running Pipeline   (Enter: refresh progress)")
     print("[Q] Quit")
     print("="*30)
 
-def find_student_by_id(student_data: StudentData):
+def print_student(student: Dict[str, Any]):
+    """Prints one student's record."""
+    print(f"  Name:    {student['first_name']} {student['last_name']}")
+    print(f"  Section: {student['section']}")
+    print(f"  Grade:   {student['final_grade']} ({student['letter_grade']})")
+    print(f"  Att.:    {student['attendance_percent']}%")
+
+def find_student_by_id(student_index: StudentIndex | None):
     """
     Asks the user for an ID and prints that student's record.
+    Uses the hash index on student_id (O(1)) instead of scanning every row.
     """
-    if not student_data:
+    if student_index is None:
         print("Error: no data processed. run the pipeline [1] first.")
         return
 
     try:
         search_id = int(input("Enter student_id to find: "))
         
-        # This is a 'select' or 'search' array operation
-        for student in student_data:
-            if student['student_id'] == search_id:
-                print("\n--- Student Found ---")
-                print(f"  Name:    {student['first_name']} {student['last_name']}")
-                print(f"  Section: {student['section']}")
-                print(f"  Grade:   {student['final_grade']} ({student['letter_grade']})")
-                print(f"  Att.:    {student['attendance_percent']}%")
-                return
+        student = student_index.get(search_id)
+        if student is not None:
+            print("\n--- Student Found ---")
+            print_student(student)
+            return
                 
         print(f"Error: Student with id {search_id} not found.")
 
     except ValueError:
         print("Error: Please enter a valid number for the ID.")
 
-def show_statistics(student_data: StudentData):
+def find_students_by_grade_range(student_index: StudentIndex | None):
+    """
+    Asks for a grade range (e.g. 60 to 70) and lists the students inside it,
+    using the sorted final_grade index.
+    """
+    if student_index is None:
+        print("Error: no data processed. run the pipeline [1] first.")
+        return
+
+    try:
+        low = float(input("Lowest final grade: "))
+        high = float(input("Highest final grade: "))
+    except ValueError:
+        print("Error: Please enter valid numbers for the grades.")
+        return
+
+    students = student_index.grade_range(low, high)
+    print(f"\n--- {len(students)} student(s) between {low} and {high} ---")
+    for student in students:
+        print(f"  {student['student_id']:>8}  {student['last_name']}, {student['first_name']}"
+              f"  {student['section']}  {student['final_grade']} ({student['letter_grade']})")
+
+def correct_final_grade(student_index: StudentIndex | None, config: Dict[str, Any]):
+    """
+    Asks for a student_id and a corrected final grade, and patches the loaded
+    data and its index in O(log N) instead of re-running the pipeline. Then
+    shows the student's new class rank and the class statistics, kept current
+    by the index. The correction lasts until the next pipeline run.
+    """
+    if student_index is None:
+        print("Error: no data processed. run the pipeline [1] first.")
+        return
+
+    try:
+        student_id = int(input("Enter student_id to correct: "))
+        grade = float(input("Corrected final grade: "))
+    except ValueError:
+        print("Error: Please enter valid numbers for the ID and the grade.")
+        return
+
+    letter = transform.assign_letter_grade([{'final_grade': grade}], config["grade_cutoffs"])[0]['letter_grade']
+    if not student_index.update_student(student_id, {'final_grade': grade, 'letter_grade': letter}):
+        print(f"Error: Student with id {student_id} not found.")
+        return
+
+    percentiles = config.get("section_statistics", {}).get("percentiles", analyze.DEFAULT_GROUP_PERCENTILES)
+    grade_stats = student_index.statistics()
+    print(f"\n--- Student {student_id}: {grade} ({letter}), "
+          f"rank {student_index.rank(student_id)} of {len(student_index.by_grade)} ---")
+    print(f"  Mean:   {grade_stats.get('mean')}")
+    print(f"  Median: {grade_stats.get('median')}")
+    print(f"  Min:    {grade_stats.get('min')}")
+    print(f"  Max:    {grade_stats.get('max')}")
+    for p, value in student_index.percentiles(percentiles).items():
+        print(f"  {analyze.percentile_label(p) + ':':<8}{value}")
+
+def show_statistics(student_data: StudentData, student_index: StudentIndex | None = None):
     """
     A new function to just print stats on demand.
+    With the menu's StudentIndex the numbers come from its grade ranking,
+    which stays current without a re-sort; a plain list is sorted every call.
     """
     if not student_data:
         print("Error: No data loaded. Run the pipeline [1] first.")
         return
         
     print("\n--- Class Statistics (Final Grade) ---")
-    grade_stats = analyze.calculate_statistics(student_data, 'final_grade')
+    if student_index is not None:
+        grade_stats = student_index.statistics()
+    else:
+        grade_stats = analyze.calculate_statistics(student_data, 'final_grade')
     print(f"  Mean:   {grade_stats.get('mean')}")
     print(f"  Median: {grade_stats.get('median')}")
     print(f"  Min:    {grade_stats.get('min')}")
     print(f"  Max:    {grade_stats.get('max')}")
 
+def show_section_statistics(student_data: StudentData, config: Dict[str, Any]):
+    """Prints count/mean/median/min/max (and percentiles) of the final grade per section."""
+    if not student_data:
+        print("Error: No data loaded. Run the pipeline [1] first.")
+        return
+
+    percentiles = config.get("section_statistics", {}).get("percentiles", analyze.DEFAULT_GROUP_PERCENTILES)
+    section_stats = analyze.grouped_statistics(
+        student_data, by='section', fields=['final_grade'], percentiles=percentiles
+    )
+    labels = [analyze.percentile_label(p) for p in percentiles]
+    print("\n--- Section Statistics (Final Grade) ---")
+    print(f"  {'Section':<10}{'Count':>7}{'Mean':>8}{'Median':>8}{'Min':>8}{'Max':>8}"
+          + "".join(f"{label:>8}" for label in labels))
+    for section, fields in section_stats.items():
+        stats = fields['final_grade']
+        print(f"  {section:<10}{stats['count']:>7}{stats['mean']!s:>8}{stats['median']!s:>8}"
+              f"{stats['min']!s:>8}{stats['max']!s:>8}"
+              + "".join(f"{stats[label]!s:>8}" for label in labels))
+
+def clear_pipeline_cache(config: Dict[str, Any]):
+    """Deletes every cached stage result, so the next run recomputes everything."""
+    cache = pipeline_cache.open_cache(config)
+    if cache is None:
+        print("The pipeline cache is disabled in config.")
+        return
+    removed = cache.invalidate()
+    print(f"Pipeline cache cleared ({removed} entries removed).")
+
 # --- This is our new main function ---
 def main(config_path: str = "config.json"):
     """
@@ -146,23 +655,87 @@ def main(config_path: str = "config.json"):
     
     # This variable will 'hold' our data after the pipeline runs
     all_student_data: StudentData = [] 
+    # Built once per pipeline run, used by the lookups
+    student_index: StudentIndex | None = None
+
+    # Start with the saved results (or else the student store, or else the
+    # cleaned-data snapshot) of the current input, if any
+    if config.get("snapshot", {}).get("load_on_start", False):
+        snapshot_data = saved_results.load_results(config) or student_store.load_store(config) \
+            or load_from_snapshot(config)
+        if snapshot_data:
+            all_student_data = snapshot_data
+            student_index = StudentIndex(all_student_data)
+    
+    # With "background_pipeline", [1] runs in a worker thread and the menu
+    # keeps serving the last completed dataset until the new one is ready
+    pipeline_job = BackgroundPipeline(config) if config.get("menu", {}).get("background_pipeline", False) else None
     
     while True:
-        show_menu()
+        if pipeline_job is not None:
+            finished = pipeline_job.take_result()
+            if finished is not None:
+                # data and index are replaced together, never one without the other
+                all_student_data, student_index = finished
+                print(f"\nPipeline finished: now serving {len(all_student_data)} processed records.")
+                if _records_not_kept(config):
+                    _print_records_not_kept()
+
+        show_menu(pipeline_job)
         choice = input("Enter your choice: ").strip().upper()
         
-        if choice == '1':
+        if choice == '1' and pipeline_job is not None:
+            if pipeline_job.start():
+                print("\nPipeline started in the background. The menu stays available;")
+                print(f"its output goes to {pipeline_job.log_path}.")
+            else:
+                print("\nA pipeline run is already in progress.")
+
+        elif choice == '1':
             print("\nRunning full pipeline...")
             #runs the pipleine and store the results of our variables
             all_student_data = run_full_pipeline(config)
+            student_index = StudentIndex(all_student_data) if all_student_data else None
+            if _records_not_kept(config):
+                _print_records_not_kept()
             
         elif choice == '2':
-            show_statistics(all_student_data)
+            show_statistics(all_student_data, student_index)
             
         elif choice == '3':
-            find_student_by_id(all_student_data)
+            find_student_by_id(student_index)
+
+        elif choice == '4':
+            find_students_by_grade_range(student_index)
+
+        elif choice == '5':
+            show_section_statistics(all_student_data, config)
+
+        elif choice == '6':
+            try:
+                run_scenario_sweep(config)
+            except ValueError as e:
+                print(f"Error: {e}")
+
+        elif choice == '7':
+            correct_final_grade(student_index, config)
+
+        elif choice == 'C':
+            clear_pipeline_cache(config)
+
+        elif choice == 'X' and pipeline_job is not None:
+            if pipeline_job.cancel():
+                print("Cancelling... the pipeline stops at its next stage or batch.")
+            else:
+                print("No pipeline is running.")
+
+        elif choice == '' and pipeline_job is not None:
+            continue  # just redraw the menu with fresh progress
 
         elif choice == 'Q':
+            if pipeline_job is not None and pipeline_job.cancel():
+                print("Cancelling the running pipeline...")
+                pipeline_job.wait()
             print("Exiting...")
             break # ends the while loop
             
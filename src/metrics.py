@@ -0,0 +1,180 @@
+import json
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List
+from .progress import PipelineProgress
+
+MetricsRecord = Dict[str, Any]
+
+
+class _NullStage:
+    """What a disabled PipelineMetrics hands out: one shared do-nothing context manager."""
+    __slots__ = ('rows_in', 'rows_out', 'cached')
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageTimer:
+    """
+    Times one stage. Use as a context manager and set rows_out (and cached)
+    before the block ends:
+
+        with metrics.stage('transform', rows_in=len(records)) as stage:
+            ...
+            stage.rows_out = len(records)
+    """
+    __slots__ = ('metrics', 'name', 'rows_in', 'rows_out', 'cached', '_start')
+
+    def __init__(self, metrics: 'PipelineMetrics', name: str, rows_in: int | None):
+        self.metrics = metrics
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.cached = False
+
+    def __enter__(self) -> 'StageTimer':
+        if self.metrics.trace_memory:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        seconds = time.perf_counter() - self._start
+        rows = self.rows_out if self.rows_out is not None else self.rows_in
+        record: MetricsRecord = {
+            'run_id': self.metrics.run_id,
+            'stage': self.name,
+            'seconds': round(seconds, 6),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rows_per_sec': round(rows / seconds) if rows and seconds > 0 else None,
+            'cached': self.cached,
+            'ok': exc_type is None,
+        }
+        if self.metrics.trace_memory:
+            record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        self.metrics.emit(record)
+        return False
+
+
+class PipelineMetrics:
+    """
+    Per-stage instrumentation for one pipeline run.
+
+    Each stage produces one record (wall time, rows in/out, rows/sec and,
+    with trace_memory, the peak traced memory during the stage). Records are
+    appended to a JSON lines file and/or passed to a callback. When disabled,
+    stage() returns a shared no-op object, so instrumented code costs one
+    attribute check per stage.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        path: str | None = None,
+        callback: Callable[[MetricsRecord], None] | None = None,
+        trace_memory: bool = False,
+        progress: PipelineProgress | None = None
+    ):
+        self.enabled = enabled
+        self.path = path
+        self.callback = callback
+        self.trace_memory = enabled and trace_memory
+        self.progress = progress
+        self.run_id = uuid.uuid4().hex[:12] if enabled else None
+        self.records: List[MetricsRecord] = []
+        self._started_tracing = False
+        self._run_start = 0.0
+
+    def stage(self, name: str, rows_in: int | None = None) -> StageTimer | _NullStage:
+        if not self.enabled:
+            return _NULL_STAGE
+        if self.progress is not None:
+            self.progress.enter_stage(name)  # raises PipelineCancelled after cancel()
+        return StageTimer(self, name, rows_in)
+
+    def start(self) -> None:
+        """Marks the start of the run (and starts tracemalloc if asked to)."""
+        if not self.enabled:
+            return
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._run_start = time.perf_counter()
+
+    def finish(self, rows_out: int | None = None, ok: bool = True) -> None:
+        """
+        Emits a 'pipeline' record covering the whole run and stops tracemalloc.
+        Call it even when the run failed (ok=False), so tracing never outlives the run.
+        """
+        if not self.enabled:
+            return
+        try:
+            self._emit_pipeline_record(rows_out, ok)
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def _emit_pipeline_record(self, rows_out: int | None, ok: bool) -> None:
+        seconds = time.perf_counter() - self._run_start
+        record: MetricsRecord = {
+            'run_id': self.run_id,
+            'stage': 'pipeline',
+            'seconds': round(seconds, 6),
+            'rows_in': None,
+            'rows_out': rows_out,
+            'rows_per_sec': round(rows_out / seconds) if rows_out and seconds > 0 else None,
+            'cached': all(r['cached'] for r in self.records) if self.records else False,
+            'ok': ok,
+        }
+        if self.trace_memory:
+            record['peak_bytes'] = max((r.get('peak_bytes', 0) for r in self.records), default=0)
+        self.emit(record)
+
+    def emit(self, record: MetricsRecord) -> None:
+        """Stamps the record and sends it to the JSON lines file and/or the callback."""
+        record['timestamp'] = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        self.records.append(record)
+        if self.progress is not None and record.get('rows_out') is not None:
+            self.progress.set_rows(record['rows_out'])
+        if self.path:
+            with open(self.path, mode='a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        if self.callback:
+            self.callback(record)
+
+
+DISABLED = PipelineMetrics(enabled=False)
+
+
+def open_metrics(
+    config: Dict[str, Any],
+    callback: Callable[[MetricsRecord], None] | None = None,
+    progress: PipelineProgress | None = None
+) -> PipelineMetrics:
+    """
+    The instrumentation described by config["metrics"]:
+        {"enabled": true, "path": "data/pipeline_metrics.jsonl", "trace_memory": false}
+    A callback or a progress watcher turns it on even without a config section.
+    """
+    settings = config.get("metrics", {})
+    enabled = settings.get("enabled", False)
+    if not enabled and callback is None and progress is None:
+        return DISABLED
+    return PipelineMetrics(
+        enabled=True,
+        path=settings.get("path") if enabled else None,
+        callback=callback,
+        trace_memory=enabled and settings.get("trace_memory", False),
+        progress=progress
+    )
@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+class PipelineCancelled(Exception):
+    """Raised inside a running pipeline once cancel() has been requested."""
+
+
+class PipelineProgress:
+    """
+    Shared between a running pipeline and whoever watches it (the menu).
+    The pipeline calls enter_stage() at every stage boundary and add_rows()
+    after every ingest batch; both raise PipelineCancelled once cancel()
+    was called, so a cancel takes effect at the next boundary or batch.
+    Plain attribute reads/writes are atomic in CPython, so no lock is needed.
+    """
+
+    def __init__(self):
+        self.stage = 'starting'
+        self.rows = 0
+        self.started = time.monotonic()
+        self._cancel = threading.Event()
+
+    def enter_stage(self, name: str) -> None:
+        """Starts a new stage; the row count restarts at 0."""
+        self.check()
+        self.stage = name
+        self.rows = 0
+
+    def add_rows(self, count: int) -> None:
+        self.rows += count
+        self.check()
+
+    def set_rows(self, count: int) -> None:
+        self.rows = count
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise PipelineCancelled(f"cancelled during {self.stage}")
+
+    def describe(self) -> str:
+        elapsed = time.monotonic() - self.started
+        return f"stage: {self.stage}, {self.rows:,} rows, {elapsed:.1f}s elapsed"
@@ -0,0 +1,118 @@
+"""
+Quarantine for rejected input rows: every bad row is written to a CSV as it
+is found, next to its error code, while memory only holds a count per code
+and the first few rows of each code as samples. A file where half the rows
+are bad costs a few counters, not a list of half the file.
+
+    "quarantine": {"enabled": true, "path": "data/quarantine.csv", "sample_limit": 5}
+
+Error codes come from ingest.validate_and_clean_row ("missing_id",
+"non_numeric:midterm", "out_of_range:quiz2", ...). The quarantine file has
+the columns row_num, error_code, column, then the row's raw values under the
+input's own header. A .gz/.bz2/.xz path is written compressed.
+"""
+import csv
+import os
+from collections import Counter
+from typing import List, Dict, Any, Tuple
+from .compression import detect_compression, open_input, open_output
+from .ingest import BadData, split_error
+
+DEFAULT_QUARANTINE_PATH = "data/quarantine.csv"
+DEFAULT_SAMPLE_LIMIT = 5
+
+# What the ingest cache keeps instead of the bad rows themselves:
+# {'total': n, 'counts': {code: n}, 'samples': {code: [(row_num, raw_row_list), ...]}}
+BadRowSummary = Dict[str, Any]
+
+
+def quarantine_settings(config: Dict[str, Any]) -> Tuple[str | None, int]:
+    """(quarantine file path or None when disabled, samples kept per error code)."""
+    settings = config.get("quarantine", {})
+    sample_limit = settings.get("sample_limit", DEFAULT_SAMPLE_LIMIT)
+    if not settings.get("enabled", False):
+        return None, sample_limit
+    return settings.get("path", DEFAULT_QUARANTINE_PATH), sample_limit
+
+
+def read_header(csv_path: str) -> List[str]:
+    """The input's header row ([] for an empty or missing file)."""
+    try:
+        with open_input(csv_path) as f:
+            return next(csv.reader(f), [])
+    except OSError:
+        return []
+
+
+def _raw_values(raw_row: List[Any]) -> List[str]:
+    """A raw row list as CSV fields: extra values (a list at the end) flattened, None left blank."""
+    values: List[str] = []
+    for value in raw_row:
+        if isinstance(value, list):
+            values.extend(value)
+        else:
+            values.append('' if value is None else value)
+    return values
+
+
+class Quarantine:
+    """
+    Collects bad row batches: add(bad_batch) streams them to 'path' (if any)
+    and updates the per-code counts and samples. Use as a context manager,
+    or call close().
+    """
+
+    def __init__(self, path: str | None = None, header: List[str] | None = None,
+                 sample_limit: int = DEFAULT_SAMPLE_LIMIT):
+        self.path = path
+        self.sample_limit = sample_limit
+        self.total = 0
+        self.counts: Counter = Counter()
+        self.samples: Dict[str, List[Tuple[int, List[str]]]] = {}
+        self._file = None
+        self._writer = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open_output(path, detect_compression(path))
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(['row_num', 'error_code', 'column'] + list(header or []))
+
+    def add(self, bad_rows: BadData) -> None:
+        """Takes one batch of (row_num, error code, raw row list) tuples."""
+        for row_num, error, raw_row in bad_rows:
+            code, column = split_error(error)
+            if self._writer is not None:
+                self._writer.writerow([row_num, code, column or ''] + _raw_values(raw_row))
+            self.counts[error] += 1
+            samples = self.samples.setdefault(error, [])
+            if len(samples) < self.sample_limit:
+                samples.append((row_num, raw_row))
+        self.total += len(bad_rows)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def __enter__(self) -> 'Quarantine':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def summary(self) -> BadRowSummary:
+        """The counts and samples, in a form that can be cached and printed later."""
+        return {'total': self.total, 'counts': dict(self.counts), 'samples': dict(self.samples)}
+
+
+def print_bad_row_summary(summary: BadRowSummary, path: str | None = None) -> None:
+    """Skipped-row count, then one line per error code (most frequent first) with a sample."""
+    where = f" (quarantined to {path})" if path and summary['total'] else ""
+    print(f"Skipped: {summary['total']}{where}")
+    for error, count in sorted(summary['counts'].items(), key=lambda item: (-item[1], item[0])):
+        samples = summary['samples'].get(error, [])
+        example = f"  e.g. row {samples[0][0]}: {samples[0][1]}" if samples else ""
+        print(f"  {error:<32} {count:>8}{example}")
@@ -0,0 +1,374 @@
+"""
+Order statistics that stay current while grades change one at a time.
+
+SortedColumn (analyze.py) answers everything from one sort, but a single
+corrected score means sorting again. RankedColumn keeps the values in a
+bucketed sorted list instead: buckets of at most 2 * BUCKET_LOAD values,
+the largest value of each bucket for a binary search, and a Fenwick tree
+over the bucket sizes for positions. Adding or removing a value is a
+binary search plus a small in-bucket insert; rank, the k-th value (and so
+any percentile), min and max are O(log N); top/bottom k are O(log N + k).
+The running count and an exact running sum keep the mean current without
+rescanning. summary() is the dict calculate_statistics returns for the
+same values: that rounds a float sum taken in sorted order, which can land
+on the other side of a .xx5 rounding boundary than the exact mean. The
+float sum's error is bounded, so the exact mean settles the rounding
+unless it lies within that bound of a boundary; only then is the sorted
+sum taken (once, until the next update).
+
+GradeRanking puts a RankedColumn of (final_grade, row position) pairs over
+every graded row of a dataset, so a repeated student_id counts once per
+row, exactly as in calculate_statistics. StudentIndex keeps one as its
+grade index: update_student() patches it, and the index answers a
+student's rank, the top and bottom k students, percentiles and statistics.
+"""
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple
+from .analyze import _nearest_rank
+from .table import StudentTable
+
+StudentData = List[Dict[str, Any]]
+
+# Buckets are split when they grow past twice this many values
+BUCKET_LOAD = 512
+
+
+class RankedColumn:
+    """
+    A sorted multiset with positions. Items are numbers, or any ordered
+    items with value(item) giving the number (e.g. (grade, student_id)
+    pairs with value=itemgetter(0)).
+    """
+
+    def __init__(self, items: Iterable[Any] = (), value: Callable[[Any], float] | None = None):
+        self._value = value
+        ordered = sorted(items)
+        self._buckets: List[List[Any]] = [ordered[i:i + BUCKET_LOAD] for i in range(0, len(ordered), BUCKET_LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        # The running sums are exact ints: every value times 2 ** _scale_bits,
+        # where 2 ** _scale_bits is the largest float denominator seen so far
+        self._scale_bits = 0
+        self._scaled_total = 0
+        self._scaled_abs_total = 0
+        for number in (ordered if value is None else map(value, ordered)):
+            scaled = self._scaled(number)
+            self._scaled_total += scaled
+            self._scaled_abs_total += abs(scaled)
+        self._sorted_sum: float | None = None
+        self._rebuild_index()
+
+    # --- bucket bookkeeping ---
+
+    def _rebuild_index(self) -> None:
+        """Fenwick tree over the bucket sizes (tree[i] covers buckets (i - lowbit(i), i])."""
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _resize(self, bucket: int, delta: int) -> None:
+        i = bucket + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _items_before(self, bucket: int) -> int:
+        total = 0
+        i = bucket
+        tree = self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, k: int) -> Tuple[int, int]:
+        """(bucket, offset) of the k-th smallest item (0-based), by descending the Fenwick tree."""
+        tree = self._tree
+        position = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            following = position + step
+            if following < len(tree) and tree[following] <= k:
+                position = following
+                k -= tree[following]
+            step >>= 1
+        return position, k
+
+    def _number(self, item: Any) -> float:
+        return item if self._value is None else self._value(item)
+
+    def _scaled(self, number: float) -> int:
+        """number * 2 ** _scale_bits as an exact int, raising the scale if number needs it."""
+        numerator, denominator = float(number).as_integer_ratio()
+        bits = denominator.bit_length() - 1  # the denominator is a power of two
+        if bits > self._scale_bits:
+            self._scaled_total <<= bits - self._scale_bits
+            self._scaled_abs_total <<= bits - self._scale_bits
+            self._scale_bits = bits
+        return numerator << (self._scale_bits - bits)
+
+    # --- updates ---
+
+    def add(self, item: Any) -> None:
+        buckets, maxes = self._buckets, self._maxes
+        scaled = self._scaled(self._number(item))
+        self._len += 1
+        self._scaled_total += scaled
+        self._scaled_abs_total += abs(scaled)
+        self._sorted_sum = None
+        if not buckets:
+            buckets.append([item])
+            maxes.append(item)
+            self._rebuild_index()
+            return
+        b = bisect_left(maxes, item)
+        if b == len(maxes):
+            b -= 1
+            buckets[b].append(item)
+            maxes[b] = item
+        else:
+            insort(buckets[b], item)
+        self._resize(b, 1)
+        bucket = buckets[b]
+        if len(bucket) > 2 * BUCKET_LOAD:
+            buckets.insert(b + 1, bucket[BUCKET_LOAD:])
+            del bucket[BUCKET_LOAD:]
+            maxes.insert(b, bucket[-1])
+            self._rebuild_index()
+
+    def remove(self, item: Any) -> bool:
+        """Removes one occurrence of item; False if it is not there."""
+        buckets, maxes = self._buckets, self._maxes
+        b = bisect_left(maxes, item)
+        if b == len(maxes):
+            return False
+        bucket = buckets[b]
+        i = bisect_left(bucket, item)
+        if bucket[i] != item:
+            return False
+        del bucket[i]
+        scaled = self._scaled(self._number(item))
+        self._len -= 1
+        self._scaled_total -= scaled
+        self._scaled_abs_total -= abs(scaled)
+        self._sorted_sum = None
+        if bucket:
+            maxes[b] = bucket[-1]
+            self._resize(b, -1)
+        else:
+            del buckets[b]
+            del maxes[b]
+            self._rebuild_index()
+        return True
+
+    # --- positions ---
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __contains__(self, item: Any) -> bool:
+        b = bisect_left(self._maxes, item)
+        if b == len(self._maxes):
+            return False
+        bucket = self._buckets[b]
+        return bucket[bisect_left(bucket, item)] == item
+
+    def __getitem__(self, k: int) -> Any:
+        """The k-th smallest item (negative k counts from the largest)."""
+        if k < 0:
+            k += self._len
+        if not 0 <= k < self._len:
+            raise IndexError("RankedColumn index out of range")
+        bucket, offset = self._locate(k)
+        return self._buckets[bucket][offset]
+
+    def count_below(self, item: Any) -> int:
+        """How many items are < item."""
+        b = bisect_left(self._maxes, item)
+        if b == len(self._maxes):
+            return self._len
+        return self._items_before(b) + bisect_left(self._buckets[b], item)
+
+    def count_above(self, item: Any) -> int:
+        """How many items are > item."""
+        b = bisect_right(self._maxes, item)
+        if b == len(self._maxes):
+            return 0
+        return self._len - self._items_before(b) - bisect_right(self._buckets[b], item)
+
+    def items(self, start: int, stop: int) -> List[Any]:
+        """The items ranked start to stop - 1 (0-based, smallest first): O(log N + stop - start)."""
+        start, stop = max(start, 0), min(stop, self._len)
+        if start >= stop:
+            return []
+        bucket, offset = self._locate(start)
+        result: List[Any] = []
+        while len(result) < stop - start:
+            result.extend(self._buckets[bucket][offset:offset + stop - start - len(result)])
+            bucket, offset = bucket + 1, 0
+        return result
+
+    def smallest(self, k: int) -> List[Any]:
+        """The k smallest items, smallest first."""
+        result: List[Any] = []
+        for bucket in self._buckets:
+            if len(result) >= k:
+                break
+            result.extend(bucket[:k - len(result)])
+        return result
+
+    def largest(self, k: int) -> List[Any]:
+        """The k largest items, largest first."""
+        result: List[Any] = []
+        for bucket in reversed(self._buckets):
+            if len(result) >= k:
+                break
+            result.extend(reversed(bucket[max(len(bucket) - (k - len(result)), 0):]))
+        return result
+
+    # --- statistics (the same answers as SortedColumn) ---
+
+    @property
+    def count(self) -> int:
+        return self._len
+
+    @property
+    def min(self) -> float | None:
+        return self._number(self._buckets[0][0]) if self._len else None
+
+    @property
+    def max(self) -> float | None:
+        return self._number(self._buckets[-1][-1]) if self._len else None
+
+    @property
+    def mean(self) -> float | None:
+        # int / int division rounds the exact quotient once
+        return self._scaled_total / (self._len << self._scale_bits) if self._len else None
+
+    @property
+    def median(self) -> float | None:
+        n = self._len
+        if not n:
+            return None
+        if n % 2 == 1:
+            return self._number(self[n // 2])
+        return (self._number(self[n // 2 - 1]) + self._number(self[n // 2])) / 2
+
+    def percentile(self, percentile: float) -> float | None:
+        """Nearest-rank percentile, same rule as find_percentile."""
+        if not self._len:
+            return None
+        return self._number(self[_nearest_rank(self._len, percentile)])
+
+    def percentiles(self, percentiles: List[float]) -> Dict[float, float | None]:
+        return {p: self.percentile(p) for p in percentiles}
+
+    def _rounded_mean(self) -> float:
+        """round(mean, 2) exactly as SortedColumn gets it from its sorted float sum."""
+        n = self._len
+        total, abs_total = self._scaled_total, self._scaled_abs_total
+        denominator = n << self._scale_bits  # the exact mean is total / denominator
+        # The float sum of n values is off by less than n * u * sum|v|, so its
+        # mean by less than u * sum|v|, and the division adds u * |mean|
+        # (u = 2 ** -53). With twice that as the margin, the exact mean rounds
+        # the same way unless it is this close to a .xx5 boundary, i.e. unless
+        # |mean * 100 - floor(mean * 100) - 1/2| / 100 <= 2 * u * (sum|v| + |mean|).
+        # Multiplied through by 200 * denominator * 2 ** 53, all in ints
+        # (% floors, so the remainder is the fractional hundredths for negative means too):
+        remainder = (100 * total) % denominator
+        if abs(2 * remainder - denominator) << 53 > 400 * (abs_total * n + abs(total)):
+            return round(total / denominator, 2)
+        if self._sorted_sum is None:
+            self._sorted_sum = sum(map(self._number, self))
+        return round(self._sorted_sum / n, 2)
+
+    def summary(self) -> Dict[str, float | None]:
+        """The dict calculate_statistics returns."""
+        if not self._len:
+            return {'mean': None, 'median': None, 'min': None, 'max': None}
+        return {
+            'mean': self._rounded_mean(),
+            'median': round(self.median, 2),
+            'min': round(self.min, 2),
+            'max': round(self.max, 2)
+        }
+
+
+def _graded_rows(student_data: StudentData | StudentTable, field: str) -> Dict[int, float]:
+    """Row position -> grade, for every row that has one."""
+    if isinstance(student_data, StudentTable):
+        if field not in student_data.numeric:
+            return {}
+        column, mask = student_data.numeric[field], student_data.missing[field]
+        return {position: value for position, (value, is_missing)
+                in enumerate(zip(column, mask)) if not is_missing}
+    return {position: row[field] for position, row in enumerate(student_data) if row.get(field) is not None}
+
+
+class GradeRanking:
+    """
+    Live ranking of one field (final_grade by default) over the rows of a
+    dataset, keyed by row position: a student_id that appears on several
+    rows is ranked once per row, and statistics() always equals
+    calculate_statistics on the same rows. Rank 1 is the highest grade;
+    tied rows share the better rank. StudentIndex maps student ids to rows.
+    """
+
+    def __init__(self, student_data: StudentData | StudentTable = (), field: str = 'final_grade'):
+        self.field = field
+        self.grades = _graded_rows(student_data, field)
+        self.column = RankedColumn(
+            ((grade, position) for position, grade in self.grades.items()), value=itemgetter(0)
+        )
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def update(self, position: int, grade: float | None) -> None:
+        """Sets (or with None, removes) one row's grade: O(log N)."""
+        old = self.grades.pop(position, None)
+        if old is not None:
+            self.column.remove((old, position))
+        if grade is not None:
+            self.grades[position] = grade
+            self.column.add((grade, position))
+
+    def rank(self, position: int) -> int | None:
+        """1 + the number of rows with a strictly higher grade (None if the row has no grade)."""
+        grade = self.grades.get(position)
+        if grade is None:
+            return None
+        return 1 + self.column.count_above((grade, float('inf')))
+
+    def between(self, low: float, high: float) -> List[int]:
+        """Positions of the rows with low <= grade <= high, lowest grade first."""
+        start = self.column.count_below((low, -1))
+        stop = len(self.column) - self.column.count_above((high, float('inf')))
+        return [position for _, position in self.column.items(start, stop)]
+
+    def top(self, k: int) -> List[Tuple[int, float]]:
+        """(position, grade) of the k highest grades, highest first (ties: later row first)."""
+        return [(position, grade) for grade, position in self.column.largest(k)]
+
+    def bottom(self, k: int) -> List[Tuple[int, float]]:
+        """(position, grade) of the k lowest grades, lowest first (ties: earlier row first)."""
+        return [(position, grade) for grade, position in self.column.smallest(k)]
+
+    def percentile(self, percentile: float) -> float | None:
+        return self.column.percentile(percentile)
+
+    def percentiles(self, percentiles: List[float]) -> Dict[float, float | None]:
+        return self.column.percentiles(percentiles)
+
+    def statistics(self) -> Dict[str, float | None]:
+        """calculate_statistics(rows, field), without rescanning the rows."""
+        return self.column.summary()
@@ -1,11 +1,37 @@
 import csv
+import io
 import os
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import List, Dict, Any, Iterable, Tuple
+from .compression import check_codec, compress_bytes, compressed_name, open_output
+from .table import StudentTable
 
 # Type Aliases for clarity
 StudentRow = Dict[str, Any]
 StudentData = List[StudentRow]
 
+AT_RISK_FILE = "at_risk_report.csv"
+AT_RISK_HEADERS = [
+    'student_id', 'last_name', 'first_name', 'section',
+    'final_grade', 'letter_grade', 'attendance_percent'
+]
+SCENARIO_FILE = "scenario_comparison.csv"
+# Each report is built in memory and written with one call through a buffer this big
+WRITE_BUFFER_BYTES = 1 << 20
+
+def section_file_name(section_name: str) -> str:
+    return f"section_{section_name}_report.csv"
+
+def report_compression(config: Dict[str, Any]) -> str | None:
+    """config["reports"]["compression"] checked: "gzip", "bz2", "xz", or None for plain CSV."""
+    try:
+        return check_codec(config.get("reports", {}).get("compression"))
+    except ValueError as e:
+        print(f"Error: {e}; writing plain CSV reports.")
+        return None
+
 def export_at_risk_csv(
     at_risk_data: StudentData, 
     output_dir: str
@@ -18,20 +44,22 @@ def export_at_risk_csv(
         return True # Not an error, just nothing to do
         
     # Define file path
-    file_path = os.path.join(output_dir, "at_risk_report.csv")
+    file_path = os.path.join(output_dir, AT_RISK_FILE)
     
-    # Define the headers (keys from the first student)
-    # We'll select a few key fields to make the report useful
-    headers = [
-        'student_id', 'last_name', 'first_name', 'section',
-        'final_grade', 'letter_grade', 'attendance_percent'
-    ]
+    # A few key fields, shared with the report engine and the streaming writer
+    headers = AT_RISK_HEADERS
     
     print(f"Report: Exporting {len(at_risk_data)} at-risk students to {file_path}...")
     
     try:
         with open(file_path, mode='w', newline='', encoding='utf-8') as f:
             # DictWriter maps our dictionaries to CSV rows
+            if isinstance(at_risk_data, StudentTable):
+                writer = csv.writer(f)
+                writer.writerow(headers)
+                _write_table_rows(writer, at_risk_data, headers, range(len(at_risk_data)))
+                return True
+
             writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
             
             writer.writeheader()
@@ -50,6 +78,8 @@ def export_section_reports(
     Splits the data by 'section' and exports one CSV for each.
     This is a classic "array operation" (grouping/partitioning).
     """
+    if isinstance(student_data, StudentTable):
+        return _export_section_reports_table(student_data, output_dir)
     
     # 1. Group data by section
     sections: Dict[str, StudentData] = {}
@@ -72,7 +102,7 @@ def export_section_reports(
     # 3. Write one file per section
     try:
         for section_name, section_data in sections.items():
-            file_path = os.path.join(output_dir, f"section_{section_name}_report.csv")
+            file_path = os.path.join(output_dir, section_file_name(section_name))
             print(f"Report: Exporting {len(section_data)} students for {section_name} to {file_path}...")
             
             with open(file_path, mode='w', newline='', encoding='utf-8') as f:
@@ -84,4 +114,316 @@ def export_section_reports(
     except IOError as e:
         print(f"Error writing section CSVs: {e}")
         return False
-    
\ No newline at end of file
+
+def _write_table_rows(writer: Any, table: StudentTable, headers: List[str], indices: Iterable[int]) -> None:
+    """Writes the selected table rows straight from the columns (no dict per row)."""
+    # Fields the table does not have are written as '' (same as DictWriter's restval)
+    present = [table.has_field(name) for name in headers]
+    for i in indices:
+        writer.writerow([
+            table.get_value(i, name) if has else ''
+            for name, has in zip(headers, present)
+        ])
+
+def _export_section_reports_table(table: StudentTable, output_dir: str) -> bool:
+    """
+    Column-wise version of export_section_reports.
+    Groups row positions (not row copies) by section, then writes each group.
+    """
+    sections: Dict[str, List[int]] = {}
+    for i, section in enumerate(table.text['section']):
+        sections.setdefault(section, []).append(i)
+
+    if not sections:
+        print("Report: No student data to export by section.")
+        return True
+
+    headers = table.field_names()
+
+    try:
+        for section_name, indices in sections.items():
+            file_path = os.path.join(output_dir, section_file_name(section_name))
+            print(f"Report: Exporting {len(indices)} students for {section_name} to {file_path}...")
+
+            with open(file_path, mode='w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(headers)
+                _write_table_rows(writer, table, headers, indices)
+
+        return True
+    except IOError as e:
+        print(f"Error writing section CSVs: {e}")
+        return False
+
+def group_by_section(student_data: StudentData | StudentTable) -> Dict[str, List[int]]:
+    """
+    One pass over the data: section -> row positions, in file order.
+    Positions work for both a list of dicts and a StudentTable.
+    """
+    sections: Dict[str, List[int]] = {}
+    if isinstance(student_data, StudentTable):
+        column = student_data.text['section'] if student_data.has_field('section') else []
+        for i, section in enumerate(column):
+            sections.setdefault(section, []).append(i)
+        return sections
+    for i, row in enumerate(student_data):
+        sections.setdefault(row.get('section', 'UNKNOWN'), []).append(i)
+    return sections
+
+def _render_csv(
+    student_data: StudentData | StudentTable,
+    headers: List[str],
+    indices: Iterable[int]
+) -> bytes:
+    """The selected rows as CSV bytes, exactly as csv.DictWriter would write them."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    if isinstance(student_data, StudentTable):
+        writer.writerows(zip(*_table_columns(student_data, headers, indices)))
+        return buffer.getvalue().encode('utf-8')
+
+    if len(headers) > 1:
+        # Fast path: every row has every header (normal for ingest output)
+        try:
+            writer.writerows(map(itemgetter(*headers), map(student_data.__getitem__, indices)))
+            return buffer.getvalue().encode('utf-8')
+        except KeyError:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(headers)
+    writer.writerows([student_data[i].get(name, '') for name in headers] for i in indices)
+    return buffer.getvalue().encode('utf-8')
+
+def _table_columns(table: StudentTable, headers: List[str], indices: Iterable[int]) -> List[List[Any]]:
+    """
+    The selected rows, one list per header (zipped back into rows by the caller).
+    Same values as _write_table_rows, but gathered a column at a time.
+    """
+    indices = list(indices)
+    columns = []
+    for name in headers:
+        if name == 'student_id':
+            column = table.student_id
+        elif name in table.numeric:
+            column, mask = table.numeric[name], table.missing[name]
+            if any(mask[i] for i in indices):
+                columns.append([None if mask[i] else column[i] for i in indices])
+                continue
+        elif name in table.text:
+            column = table.text[name]
+        else:
+            columns.append([''] * len(indices))
+            continue
+        columns.append([column[i] for i in indices])
+    return columns
+
+def _write_atomic(file_path: str, content: bytes) -> int:
+    """Writes to a temp file, then renames it over file_path, so readers never see half a report."""
+    # Per-process temp name: parallel runs may write the same report at once
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode='wb', buffering=WRITE_BUFFER_BYTES) as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return len(content)
+
+def _write_report(
+    output_dir: str,
+    file_name: str,
+    student_data: StudentData | StudentTable,
+    headers: List[str],
+    indices: Iterable[int],
+    compression: str | None = None
+) -> Tuple[str, int]:
+    content = compress_bytes(_render_csv(student_data, headers, indices), compression)
+    file_name = compressed_name(file_name, compression)
+    return file_name, _write_atomic(os.path.join(output_dir, file_name), content)
+
+def write_reports(
+    student_data: StudentData | StudentTable,
+    at_risk_data: StudentData | StudentTable,
+    output_dir: str,
+    workers: int = 4,
+    sections: Dict[str, List[int]] | None = None,
+    compression: str | None = None
+) -> Dict[str, Any]:
+    """
+    Report engine: the at-risk report plus one report per section, written
+    by a pool of 'workers' threads (1 = one after another).
+
+    The data is grouped by section once (or 'sections' from group_by_section
+    is reused), and every file is rendered in memory and written atomically.
+    The files are byte-for-byte what export_at_risk_csv and
+    export_section_reports write; with 'compression' ("gzip", "bz2", "xz")
+    they are compressed in the worker threads and named *.csv.gz etc.
+
+    Returns {'ok', 'files' (names written), 'bytes', 'seconds', 'bytes_per_sec'}.
+    """
+    start = time.perf_counter()
+    if sections is None:
+        sections = group_by_section(student_data)
+
+    jobs = []
+    if at_risk_data:
+        jobs.append((AT_RISK_FILE, at_risk_data, AT_RISK_HEADERS, range(len(at_risk_data))))
+    if sections:
+        if isinstance(student_data, StudentTable):
+            headers = student_data.field_names()
+        else:
+            headers = list(student_data[0].keys())
+        for section_name, indices in sections.items():
+            jobs.append((section_file_name(section_name), student_data, headers, indices))
+
+    summary: Dict[str, Any] = {'ok': True, 'files': [], 'bytes': 0}
+    try:
+        if workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda job: _write_report(output_dir, *job, compression), jobs))
+        else:
+            results = [_write_report(output_dir, *job, compression) for job in jobs]
+    except OSError as e:
+        print(f"Error writing report CSVs: {e}")
+        summary['ok'] = False
+        results = []
+
+    for file_name, size in results:
+        summary['files'].append(file_name)
+        summary['bytes'] += size
+    summary['seconds'] = time.perf_counter() - start
+    summary['bytes_per_sec'] = summary['bytes'] / summary['seconds'] if summary['seconds'] else 0.0
+    print(f"Report: {len(summary['files'])} files, {summary['bytes']:,} bytes "
+          f"in {summary['seconds']:.3f}s ({summary['bytes_per_sec'] / 1e6:.1f} MB/s)")
+    return summary
+
+def grouped_statistics_file_name(by: str) -> str:
+    return f"{by}_statistics.csv"
+
+def export_grouped_statistics(
+    grouped_stats: Dict[Any, Dict[str, Dict[str, float | None]]],
+    output_dir: str,
+    by: str = 'section',
+    compression: str | None = None
+) -> str | None:
+    """
+    Writes analyze.grouped_statistics output as one CSV, one line per
+    (group, field): section,field,count,mean,median,min,max,p10,...
+    Returns the file name, or None if nothing was written.
+    """
+    if not grouped_stats:
+        print("Report: No grouped statistics to export.")
+        return None
+
+    first_group = next(iter(grouped_stats.values()))
+    stat_names = list(next(iter(first_group.values())).keys()) if first_group else []
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([by, 'field'] + stat_names)
+    for key, fields in grouped_stats.items():
+        for field, stats in fields.items():
+            writer.writerow([key, field] + [stats.get(name) for name in stat_names])
+
+    file_name = compressed_name(grouped_statistics_file_name(by), compression)
+    try:
+        content = compress_bytes(buffer.getvalue().encode('utf-8'), compression)
+        size = _write_atomic(os.path.join(output_dir, file_name), content)
+    except OSError as e:
+        print(f"Error writing grouped statistics CSV: {e}")
+        return None
+    print(f"Report: Exported statistics for {len(grouped_stats)} groups to {file_name} ({size:,} bytes)")
+    return file_name
+
+def export_scenario_comparison(
+    headers: List[str],
+    rows: List[List[Any]],
+    output_dir: str,
+    compression: str | None = None
+) -> str | None:
+    """
+    Writes the what-if comparison (scenarios.comparison_table) as one CSV,
+    one line per scenario. Returns the file name, or None if nothing was written.
+    """
+    if not rows:
+        print("Report: No scenarios to export.")
+        return None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    writer.writerows(rows)
+    file_name = compressed_name(SCENARIO_FILE, compression)
+    try:
+        content = compress_bytes(buffer.getvalue().encode('utf-8'), compression)
+        size = _write_atomic(os.path.join(output_dir, file_name), content)
+    except OSError as e:
+        print(f"Error writing scenario comparison CSV: {e}")
+        return None
+    print(f"Report: Exported {len(rows)} scenarios to {file_name} ({size:,} bytes)")
+    return file_name
+
+def append_section_reports(
+    student_data: StudentData,
+    output_dir: str,
+    started: set,
+    compression: str | None = None
+) -> bool:
+    """
+    Streaming version of export_section_reports: writes one batch at a time.
+    The first batch that touches a section creates its file (with header);
+    later batches append to it. 'started' remembers which files were created.
+    A compressed file gets one compressed stream per batch.
+    """
+    if not student_data:
+        return True
+
+    sections: Dict[str, StudentData] = {}
+    for row in student_data:
+        sections.setdefault(row.get('section', 'UNKNOWN'), []).append(row)
+
+    headers = list(student_data[0].keys())
+
+    try:
+        for section_name, section_data in sections.items():
+            file_path = os.path.join(output_dir, compressed_name(section_file_name(section_name), compression))
+            is_new = file_path not in started
+            with open_output(file_path, compression, 'wt' if is_new else 'at') as f:
+                writer = csv.DictWriter(f, fieldnames=headers)
+                if is_new:
+                    writer.writeheader()
+                    started.add(file_path)
+                writer.writerows(section_data)
+        return True
+    except IOError as e:
+        print(f"Error writing section CSVs: {e}")
+        return False
+
+def append_at_risk_csv(
+    at_risk_data: StudentData,
+    output_dir: str,
+    started: set,
+    compression: str | None = None
+) -> bool:
+    """
+    Streaming version of export_at_risk_csv: appends one batch of at-risk students.
+    The file is only created once there is at least one at-risk student.
+    """
+    if not at_risk_data:
+        return True
+
+    file_path = os.path.join(output_dir, compressed_name(AT_RISK_FILE, compression))
+    headers = AT_RISK_HEADERS
+    is_new = file_path not in started
+
+    try:
+        with open_output(file_path, compression, 'wt' if is_new else 'at') as f:
+            writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
+            if is_new:
+                writer.writeheader()
+                started.add(file_path)
+            writer.writerows(at_risk_data)
+        return True
+    except IOError as e:
+        print(f"Error writing at-risk CSV: {e}")
+        return False
@@ -0,0 +1,70 @@
+"""
+Persisted pipeline results: the processed records (grades and letters
+included) saved as a snapshot after every run, so the CLI's stats, lookup
+and at-risk commands can answer without parsing or grading anything.
+
+The snapshot's source key is the transform stage key, so results are only
+used while input.csv, the weights, the curve and the cutoffs are unchanged.
+The input's size, mtime and digest are saved with them, so checking that
+is a stat() call; input.csv is only hashed again when those differ.
+This module is imported by the CLI at startup: keep its imports light.
+"""
+import os
+from typing import List, Dict, Any
+from . import snapshot as record_snapshot
+from .cache import file_stamp, pipeline_stage_keys
+from .table import StudentTable
+
+StudentData = List[Dict[str, Any]]
+
+DEFAULT_RESULTS_PATH = "data/results.snapshot"
+
+
+def results_path(config: Dict[str, Any]) -> str | None:
+    """Where the results are saved, or None when config["results"] disables them."""
+    settings = config.get("results", {})
+    if not settings.get("enabled", False):
+        return None
+    return settings.get("path", DEFAULT_RESULTS_PATH)
+
+
+def save_results(
+    config: Dict[str, Any],
+    student_records: StudentData | StudentTable,
+    transform_key: str | None = None
+) -> int | None:
+    """Saves the processed records; returns the file size (None if disabled or empty)."""
+    path = results_path(config)
+    if not path or not student_records:
+        return None
+    if transform_key is None:
+        transform_key = pipeline_stage_keys(config)['transform']
+    if isinstance(student_records, StudentTable):
+        table = student_records
+    else:
+        table = StudentTable.from_rows(student_records, config["quiz_count"])
+    input_csv = config["paths"]["input_csv"]
+    meta = {'input': file_stamp(input_csv)} if os.path.exists(input_csv) else {}
+    size = record_snapshot.write_snapshot(table, path, transform_key, meta)
+    print(f"Results saved: {path} ({size} bytes)")
+    return size
+
+
+def load_results(config: Dict[str, Any]) -> StudentTable | None:
+    """
+    The saved results, or None if there are none or they are out of date.
+    If input.csv itself is gone the saved results are still used (with a note).
+    """
+    path = results_path(config)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with record_snapshot.Snapshot(path) as snapshot:
+            if not os.path.exists(config["paths"]["input_csv"]):
+                print(f"Note: {config['paths']['input_csv']} not found; using saved results as they are.")
+            elif snapshot.source_key != pipeline_stage_keys(config, snapshot.meta.get('input'))['transform']:
+                raise record_snapshot.SnapshotError(f"{path} is stale (built from a different input/config)")
+            return snapshot.to_table()
+    except record_snapshot.SnapshotError as e:
+        print(f"Saved results not used: {e}")
+        return None
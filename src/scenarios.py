@@ -0,0 +1,245 @@
+"""
+What-if scenarios: how would the grade distribution and the at-risk count
+change with other weights, curve settings, cutoffs or thresholds?
+
+A grid lists alternatives for any of those config sections; every
+combination (the current config included) is one scenario:
+
+    "scenarios": {
+      "workers": 4,
+      "grid": {
+        "weights": [{"quizzes": 0.2, "midterm": 0.3, "final": 0.4, "attendance": 0.1}],
+        "thresholds": [{"at_risk_grade": 70}]
+      }
+    }
+
+gives 2 x 2 = 4 scenarios. Each alternative is merged over the config's own
+section, so it only needs the keys it changes.
+
+All scenarios run on one ingested dataset. Each student's component scores
+(quiz average, midterm, final, attendance) are worked out once; every
+scenario then only re-weights them. Work is shared along the way: one
+weighted-grade pass per distinct weights, one curve per distinct
+(weights, curve), and the weight groups run in a thread pool. The grades
+come from the normal transform functions, so each scenario gives exactly
+what a full pipeline run with that config would.
+"""
+import copy
+import itertools
+import json
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple
+from . import analyze
+from . import transform
+from .cohorts import at_risk_rule
+from .table import StudentTable, score_fields
+
+StudentData = List[Dict[str, Any]]
+Scenario = Dict[str, Any]
+
+# The config sections a grid may vary, in the order scenario names list them
+VARIED_SECTIONS = ['weights', 'curve_settings', 'grade_cutoffs', 'thresholds']
+
+
+def build_scenarios(config: Dict[str, Any], grid: Dict[str, List[Dict[str, Any]]]) -> List[Scenario]:
+    """
+    Every combination of the grid's alternatives, the current config first.
+    Returns [{'name', 'weights', 'curve_settings', 'grade_cutoffs', 'thresholds'}].
+    """
+    unknown = set(grid) - set(VARIED_SECTIONS)
+    if unknown:
+        raise ValueError(f"Scenario grid can only vary {VARIED_SECTIONS}, not {sorted(unknown)}")
+
+    options: List[List[Tuple[str, Dict[str, Any]]]] = []
+    for section in VARIED_SECTIONS:
+        base = config.get(section, {})
+        choices = [(None, base)]
+        for number, override in enumerate(grid.get(section, []), start=1):
+            choices.append((f"{section}#{number}", {**base, **override}))
+        options.append(choices)
+
+    scenarios = []
+    for combination in itertools.product(*options):
+        labels = [label for label, _ in combination if label]
+        scenario: Scenario = {'name': ' + '.join(labels) or 'current config'}
+        for section, (_, values) in zip(VARIED_SECTIONS, combination):
+            scenario[section] = copy.deepcopy(values)
+        scenarios.append(scenario)
+    return scenarios
+
+
+def component_table(student_data: StudentData | StudentTable, quiz_count: int) -> StudentTable:
+    """
+    The four graded components per student, computed once:
+    quiz1 holds the quiz average (quiz_count is 1), then midterm, final and
+    attendance_percent with their missing masks. compute_weighted_grade on
+    this table gives exactly the grades it gives on the full records, since
+    dividing the average by 1 changes nothing.
+    """
+    quiz_names = score_fields(quiz_count)[:quiz_count]
+    components = StudentTable(1)
+    components.text = {}
+    if isinstance(student_data, StudentTable):
+        components.student_id = array('q', student_data.student_id)
+        quiz_columns = [student_data.numeric[name] for name in quiz_names]
+        averages = array('d', bytes(8 * len(student_data)))
+        if quiz_count:
+            for i, scores in enumerate(zip(*quiz_columns)):
+                total = 0.0
+                for score in scores:
+                    total += score
+                averages[i] = total / quiz_count
+        components.numeric['quiz1'] = averages
+        for name in ('midterm', 'final', 'attendance_percent'):
+            components.numeric[name] = array('d', student_data.numeric[name])
+            components.missing[name] = bytearray(student_data.missing[name])
+    else:
+        components.student_id = array('q', [row['student_id'] for row in student_data])
+        components.numeric['quiz1'] = array('d', [
+            transform._calculate_quiz_average(row, quiz_count) for row in student_data
+        ])
+        for name in ('midterm', 'final', 'attendance_percent'):
+            values = [row.get(name) for row in student_data]
+            components.numeric[name] = array('d', [0.0 if value is None else value for value in values])
+            components.missing[name] = bytearray(value is None for value in values)
+    components.missing['quiz1'] = bytearray(len(components.student_id))
+    return components
+
+
+def _scenario_view(components: StudentTable) -> StudentTable:
+    """A table sharing the component columns, with room for its own grades and letters."""
+    view = StudentTable(1)
+    view.text = {}
+    view.student_id = components.student_id
+    view.numeric = dict(components.numeric)
+    view.missing = dict(components.missing)
+    return view
+
+
+def _curve_amount(grades: array, curve_settings: Dict[str, Any]) -> float:
+    """Same rule as apply_grade_curve: target - max, or 0 when that is not positive."""
+    if not curve_settings.get("apply_curve", False) or not grades:
+        return 0.0
+    return max(curve_settings["target_max_grade"] - max(grades), 0.0)
+
+
+def _count_at_risk(view: StudentTable, thresholds: Dict[str, float]) -> int:
+    """Same rule as find_at_risk_students, counting instead of collecting rows."""
+    return len(at_risk_rule(thresholds["at_risk_grade"], thresholds["at_risk_attendance"]).evaluate(view))
+
+
+def _run_weight_group(
+    components: StudentTable,
+    weights: Dict[str, float],
+    scenarios: List[Tuple[int, Scenario]],
+    baseline_letters: List[str] | None
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[str] | None]:
+    """
+    Every scenario that shares one set of weights: one weighting pass, one
+    curve per distinct curve setting. Letters are compared with
+    baseline_letters; without them, the first scenario's letters become the
+    baseline (and are returned).
+    """
+    view = _scenario_view(components)
+    transform.compute_weighted_grade(view, weights, 1)
+    weighted = array('d', view.numeric['final_grade'])
+
+    by_curve: Dict[str, List[Tuple[int, Scenario]]] = {}
+    for position, scenario in scenarios:
+        by_curve.setdefault(json.dumps(scenario['curve_settings'], sort_keys=True), []).append((position, scenario))
+
+    results = []
+    for curve_group in by_curve.values():
+        curve_settings = curve_group[0][1]['curve_settings']
+        view.numeric['final_grade'][:] = weighted
+        view.touch()
+        curve_amount = _curve_amount(weighted, curve_settings)
+        if curve_amount > 0:
+            transform.apply_curve_amount(view, curve_amount, curve_settings["curve_cap"])
+        grade_stats = analyze.calculate_statistics(view, 'final_grade')
+
+        for position, scenario in curve_group:
+            transform.assign_letter_grade(view, scenario['grade_cutoffs'])
+            letters = view.text['letter_grade']
+            if baseline_letters is None:
+                baseline_letters = list(letters)
+            results.append((position, {
+                'scenario': scenario['name'],
+                'curve': round(curve_amount, 2),
+                'mean': grade_stats['mean'],
+                'median': grade_stats['median'],
+                'letters': Counter(letters),
+                'at_risk': _count_at_risk(view, scenario['thresholds']),
+                'letters_changed': sum(1 for a, b in zip(letters, baseline_letters) if a != b),
+            }))
+    return results, baseline_letters
+
+
+def run_scenarios(
+    student_data: StudentData | StudentTable,
+    scenarios: List[Scenario],
+    quiz_count: int,
+    workers: int = 4
+) -> List[Dict[str, Any]]:
+    """
+    Evaluates every scenario on the same cleaned records (as ingested, before
+    any transform). Returns one row per scenario, in order:
+        {'scenario', 'curve', 'mean', 'median', 'letters' (Counter),
+         'at_risk', 'letters_changed' (students whose letter differs from the first scenario)}
+    """
+    if not scenarios or not student_data:
+        return []
+    components = component_table(student_data, quiz_count)
+
+    groups: Dict[str, List[Tuple[int, Scenario]]] = {}
+    for position, scenario in enumerate(scenarios):
+        groups.setdefault(json.dumps(scenario['weights'], sort_keys=True), []).append((position, scenario))
+    members = list(groups.values())
+
+    # The first group holds the first scenario, whose letters the others are compared with
+    first_results, baseline_letters = _run_weight_group(components, members[0][0][1]['weights'], members[0], None)
+    jobs = [(components, group[0][1]['weights'], group, baseline_letters) for group in members[1:]]
+    if workers > 1 and len(jobs) > 1:
+        # The NumPy backend releases the GIL inside its array operations
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(lambda job: _run_weight_group(*job), jobs))
+    else:
+        outcomes = [_run_weight_group(*job) for job in jobs]
+
+    rows: List[Dict[str, Any] | None] = [None] * len(scenarios)
+    for results in [first_results] + [results for results, _ in outcomes]:
+        for position, row in results:
+            rows[position] = row
+    return rows
+
+
+def letter_columns(rows: List[Dict[str, Any]]) -> List[str]:
+    """Every letter used by any scenario, best first, 'F' last."""
+    letters = set()
+    for row in rows:
+        letters.update(row['letters'])
+    return sorted(letters - {'F'}) + (['F'] if 'F' in letters else [])
+
+
+def comparison_table(rows: List[Dict[str, Any]]) -> Tuple[List[str], List[List[Any]]]:
+    """(headers, one list of values per scenario) for printing or CSV export."""
+    letters = letter_columns(rows)
+    headers = ['scenario', 'curve', 'mean', 'median'] + letters + ['at_risk', 'letters_changed']
+    table = [
+        [row['scenario'], row['curve'], row['mean'], row['median']]
+        + [row['letters'].get(letter, 0) for letter in letters]
+        + [row['at_risk'], row['letters_changed']]
+        for row in rows
+    ]
+    return headers, table
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    headers, table = comparison_table(rows)
+    width = max([len(headers[0])] + [len(values[0]) for values in table])
+    widths = [max(len(name), 7) + 2 for name in headers[1:]]
+    print(f"{headers[0]:<{width}}" + "".join(f"{name:>{w}}" for name, w in zip(headers[1:], widths)))
+    for values in table:
+        print(f"{values[0]:<{width}}" + "".join(f"{value!s:>{w}}" for value, w in zip(values[1:], widths)))
@@ -0,0 +1,271 @@
+"""
+Binary snapshot of cleaned student records.
+
+A snapshot is one file that can be memory-mapped and read back as columns
+without any CSV parsing:
+
+    header     magic, format version, row count, directory size,
+               the 32-byte source key it was built from, and a CRC-32 of
+               everything else (the header fields before it included)
+    directory  JSON object: the list of columns (name, kind, byte offset,
+               byte lengths) and a free-form "meta" object from the writer
+    columns    student_id      little-endian int64 per row
+               scores/grades   little-endian float64 per row, then a null
+                               bitmap (bit i set = row i missing)
+               text columns    string table (unique values joined by NUL)
+                               plus a uint32 code per row; a column with no
+                               repeats (names) is just its values in row order
+
+Every column starts on an 8-byte boundary, so it can be viewed in place
+(memoryview.cast) without copying.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import List, Dict, Any
+from .table import StudentTable
+
+MAGIC = b'PUPQSNAP'
+FORMAT_VERSION = 3
+# magic, version, directory length, row count, quiz count, source key, crc32
+_HEADER = struct.Struct('<8sIIQI32sI')
+# The CRC is the last header field; everything before it is checksummed too
+_CRC_OFFSET = _HEADER.size - 4
+
+# Bitmap byte -> the 8 mask bytes (0/1) it stands for, used to unpack null bitmaps
+_UNPACK_BITS = [bytes((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+
+
+class SnapshotError(Exception):
+    """The snapshot is missing, corrupt, from another format version or stale."""
+
+
+def _pad(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pack_bits(mask: bytearray) -> bytes:
+    """Packs a 0/1-per-row mask into a bitmap (row i -> bit i % 8 of byte i // 8)."""
+    bitmap = bytearray((len(mask) + 7) // 8)
+    if 1 not in mask:
+        return bytes(bitmap)
+    for i, is_missing in enumerate(mask):
+        if is_missing:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    return bytes(bitmap)
+
+
+def write_snapshot(
+    table: StudentTable,
+    path: str,
+    source_key: str,
+    meta: Dict[str, Any] | None = None
+) -> int:
+    """
+    Writes a StudentTable to 'path' and returns the file size.
+    source_key (a hex SHA-256, e.g. the ingest cache key) records what the
+    snapshot was built from, so load_snapshot can tell when it is stale.
+    meta (any JSON-able dict) is stored with it and comes back as Snapshot.meta.
+    Written to a temp file first, then renamed, so readers never see half a file.
+    """
+    n = len(table)
+    blocks: List[bytes] = []
+    directory: List[Dict[str, Any]] = []
+    offset = 0
+
+    def add(name: str, kind: str, parts: List[bytes]) -> None:
+        nonlocal offset
+        entry = {'name': name, 'kind': kind, 'offset': offset, 'lengths': []}
+        for part in parts:
+            entry['lengths'].append(len(part))
+            blocks.append(part)
+            blocks.append(bytes(_pad(len(part))))
+            offset += len(part) + _pad(len(part))
+        directory.append(entry)
+
+    add('student_id', 'int64', [_little_endian(table.student_id)])
+    for name, column in table.numeric.items():
+        add(name, 'float64', [_little_endian(column), _pack_bits(table.missing[name])])
+    for name, column in table.text.items():
+        codes: Dict[str, int] = {}
+        row_codes = array('I', [codes.setdefault(value, len(codes)) for value in column])
+        strings = '\x00'.join(codes).encode('utf-8')
+        if len(codes) == len(column):
+            # every value is distinct (names): the string table already is the column
+            add(name, 'text', [strings])
+        else:
+            add(name, 'text', [strings, _little_endian(row_codes)])
+
+    directory_bytes = json.dumps({'columns': directory, 'meta': meta or {}}).encode('utf-8')
+    directory_bytes += b' ' * _pad(_HEADER.size + len(directory_bytes))
+
+    header_fields = (
+        MAGIC, FORMAT_VERSION, len(directory_bytes), n,
+        table.quiz_count, bytes.fromhex(source_key)
+    )
+    crc = zlib.crc32(_HEADER.pack(*header_fields, 0)[:_CRC_OFFSET])
+    crc = zlib.crc32(directory_bytes, crc)
+    for block in blocks:
+        crc = zlib.crc32(block, crc)
+    header = _HEADER.pack(*header_fields, crc)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, mode='wb') as f:
+        f.write(header)
+        f.write(directory_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+class Snapshot:
+    """
+    An open (memory-mapped) snapshot file.
+    column() gives zero-copy views; to_table() builds a StudentTable, which
+    only needs memcpy-style copies for the numeric columns.
+    With verify, the CRC-32 is checked before the directory is parsed, so a
+    damaged file raises SnapshotError rather than whatever the JSON decoder
+    makes of the damage.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, mode='rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise SnapshotError(f"{path} is empty")
+        self._view = memoryview(self._map)
+
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise SnapshotError(f"{path} is too short to be a snapshot")
+        (magic, version, directory_length, self.row_count,
+         self.quiz_count, source_key, self._crc) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotError(f"{path} is not a snapshot file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise SnapshotError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+
+        self.source_key = source_key.hex()
+        if verify:
+            self.verify()
+        start = _HEADER.size
+        try:
+            directory = json.loads(bytes(self._view[start:start + directory_length]).decode('utf-8'))
+            self._columns = {entry['name']: entry for entry in directory['columns']}
+            self.meta: Dict[str, Any] = directory['meta']
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+            self.close()
+            raise SnapshotError(f"{path} has a corrupt column directory ({e.__class__.__name__})")
+        self._body_start = start + directory_length
+
+    def verify(self) -> None:
+        """
+        Recomputes the CRC-32 over the header fields and the whole file body
+        (O(file size)), so a damaged row count or directory size is caught too.
+        """
+        crc = zlib.crc32(self._view[:_CRC_OFFSET])
+        if zlib.crc32(self._view[_HEADER.size:], crc) != self._crc:
+            self.close()
+            raise SnapshotError(f"{self.path} failed its checksum")
+
+    def _parts(self, name: str) -> List[memoryview]:
+        entry = self._columns[name]
+        position = self._body_start + entry['offset']
+        parts = []
+        for length in entry['lengths']:
+            parts.append(self._view[position:position + length])
+            position += length + _pad(length)
+        return parts
+
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy view of a numeric column ('q' for student_id, 'd' for scores)."""
+        entry = self._columns[name]
+        if entry['kind'] == 'text':
+            raise SnapshotError(f"{name} is a text column")
+        data = self._parts(name)[0]
+        if sys.byteorder != 'little':
+            raise SnapshotError("zero-copy views need a little-endian machine; use to_table()")
+        return data.cast('q' if entry['kind'] == 'int64' else 'd')
+
+    def missing_mask(self, name: str) -> bytearray:
+        """The null bitmap of a score column, unpacked to one 0/1 byte per row."""
+        bitmap = self._parts(name)[1]
+        return bytearray(b''.join(map(_UNPACK_BITS.__getitem__, bitmap))[:self.row_count])
+
+    def text(self, name: str) -> List[str]:
+        strings_bytes, *codes_part = self._parts(name)
+        strings = bytes(strings_bytes).decode('utf-8').split('\x00') if self.row_count else []
+        if not codes_part:
+            return strings
+        codes_bytes = codes_part[0]
+        codes = _read_array('I', codes_bytes)
+        if name == 'section':
+            strings = [sys.intern(value) for value in strings]
+        return list(map(strings.__getitem__, codes))
+
+    def to_table(self) -> StudentTable:
+        """Builds a StudentTable from the snapshot (no CSV parsing involved)."""
+        table = StudentTable(self.quiz_count)
+        table.student_id = _read_array('q', self._parts('student_id')[0])
+        for name, entry in self._columns.items():
+            if entry['kind'] == 'float64':
+                table.numeric[name] = _read_array('d', self._parts(name)[0])
+                table.missing[name] = self.missing_mask(name)
+            elif entry['kind'] == 'text':
+                table.text[name] = self.text(name)
+        return table
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _read_array(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def load_snapshot(path: str, source_key: str | None = None, verify: bool = True) -> StudentTable:
+    """
+    Opens a snapshot and returns it as a StudentTable.
+    The columns are copied out of the mapping (to_table) rather than served as
+    column() views: the pipeline writes grades into the table and the menu
+    patches it, and the file is closed again here. column() is for read-only
+    callers that keep the Snapshot open.
+    Raises SnapshotError if the file is corrupt (checksum or directory), from
+    another format version, or was built from a different source than source_key.
+    """
+    if not os.path.exists(path):
+        raise SnapshotError(f"no snapshot at {path}")
+    with Snapshot(path, verify) as snapshot:
+        if source_key is not None and snapshot.source_key != source_key:
+            raise SnapshotError(f"{path} is stale (built from a different input/config)")
+        return snapshot.to_table()
@@ -0,0 +1,338 @@
+"""
+SQLite store of the processed records: after every run the graded records
+are bulk-loaded into one table (one transaction, executemany) with indexes
+on student_id, section and final_grade, so lookups, section statistics and
+at-risk queries run as indexed SQL instead of scans over the records.
+
+    "store": {"enabled": true, "path": "data/students.db"}
+
+Like the saved results (src/results.py), the store remembers the transform
+stage key it was built for and is only used while input.csv, the weights,
+the curve and the cutoffs are unchanged. The database is built in a temp
+file and renamed over the old one, so readers never see half a load.
+This module is imported by the CLI: keep its imports light.
+"""
+import json
+import os
+import sqlite3
+import sys
+from array import array
+from itertools import groupby
+from typing import List, Dict, Any, Iterable, Tuple
+from .analyze import SortedColumn, DEFAULT_GROUP_PERCENTILES, percentile_label
+from .cache import file_stamp, pipeline_stage_keys
+from .table import StudentTable
+
+StudentRow = Dict[str, Any]
+StudentData = List[StudentRow]
+
+DEFAULT_STORE_PATH = "data/students.db"
+SCHEMA_VERSION = 1
+
+# SQLite's default limit on '?' parameters is 999 in older builds
+_MAX_PARAMETERS = 900
+
+_INDEXES = {
+    'idx_student_id': ['student_id'],
+    # Also serves "WHERE section = ?" and hands each section's grades over already sorted
+    'idx_section_grade': ['section', 'final_grade'],
+    'idx_final_grade': ['final_grade'],
+    # With both sides of the OR indexed, the at-risk query needs no full scan
+    'idx_attendance': ['attendance_percent'],
+}
+
+
+def store_path(config: Dict[str, Any]) -> str | None:
+    """Where the store is kept, or None when config["store"] disables it."""
+    settings = config.get("store", {})
+    if not settings.get("enabled", False):
+        return None
+    return settings.get("path", DEFAULT_STORE_PATH)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_values(table: StudentTable, name: str) -> Iterable[Any]:
+    """One column with None for missing scores, ready for executemany."""
+    if name == 'student_id':
+        return table.student_id
+    if name in table.numeric:
+        column, mask = table.numeric[name], table.missing[name]
+        if not any(mask):
+            return column
+        return [None if is_missing else value for value, is_missing in zip(column, mask)]
+    return table.text[name]
+
+
+def write_store(
+    table: StudentTable,
+    path: str,
+    source_key: str | None,
+    input_stamp: Dict[str, Any] | None = None
+) -> int:
+    """
+    Replaces the database at 'path' with the records of 'table'.
+    input_stamp (cache.file_stamp of the input) lets open_store check for a
+    changed input with a stat() instead of hashing it.
+    Returns the number of rows written.
+    """
+    names = table.field_names()
+    column_types = []
+    for name in names:
+        if name == 'student_id':
+            column_types.append(f"{_quote(name)} INTEGER NOT NULL")
+        elif name in table.numeric:
+            column_types.append(f"{_quote(name)} REAL")
+        else:
+            column_types.append(f"{_quote(name)} TEXT")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        # The temp file is renamed into place only once complete, so no journal is needed
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        with connection:
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ('schema_version', str(SCHEMA_VERSION)),
+                ('source_key', source_key or ''),
+                ('quiz_count', str(table.quiz_count)),
+                ('input_stamp', json.dumps(input_stamp)),
+            ])
+            connection.execute(
+                f"CREATE TABLE students (position INTEGER PRIMARY KEY, {', '.join(column_types)})"
+            )
+            placeholders = ", ".join("?" * (len(names) + 1))
+            columns = [range(len(table))] + [_column_values(table, name) for name in names]
+            connection.executemany(f"INSERT INTO students VALUES ({placeholders})", zip(*columns))
+            # Built after the load: one sort per index instead of a B-tree update per row
+            for index_name, fields in _INDEXES.items():
+                if all(field in names for field in fields):
+                    connection.execute(
+                        f"CREATE INDEX {index_name} ON students ({', '.join(map(_quote, fields))})"
+                    )
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+    os.replace(temp_path, path)
+    return len(table)
+
+
+def save_store(
+    config: Dict[str, Any],
+    student_records: StudentData | StudentTable,
+    transform_key: str | None = None
+) -> int | None:
+    """Loads the processed records into the store; returns the row count (None if disabled or empty)."""
+    path = store_path(config)
+    if not path or not student_records:
+        return None
+    if transform_key is None:
+        transform_key = pipeline_stage_keys(config)['transform']
+    if isinstance(student_records, StudentTable):
+        table = student_records
+    else:
+        table = StudentTable.from_rows(student_records, config["quiz_count"])
+    input_csv = config["paths"]["input_csv"]
+    rows = write_store(table, path, transform_key, file_stamp(input_csv) if os.path.exists(input_csv) else None)
+    print(f"Student store saved: {path} ({rows} rows)")
+    return rows
+
+
+class StudentStore:
+    """Read-only queries over a store written by write_store."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if self.meta.get('schema_version') != str(SCHEMA_VERSION):
+            self.connection.close()
+            raise sqlite3.DatabaseError(f"unsupported store version {self.meta.get('schema_version')}")
+        self.quiz_count = int(self.meta['quiz_count'])
+        # (cid, name, type, ...) per column; the first one is the position
+        table_info = self.connection.execute("PRAGMA table_info(students)").fetchall()[1:]
+        self.columns = [row[1] for row in table_info]
+        self.numeric_columns = [row[1] for row in table_info if row[2] == 'REAL']
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'StudentStore':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def _select(
+        self,
+        where: str = "",
+        parameters: Tuple[Any, ...] = (),
+        order: str = "position",
+        limit: int | None = None
+    ) -> StudentData:
+        query = f"SELECT {', '.join(map(_quote, self.columns))} FROM students {where} ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters = parameters + (limit,)
+        cursor = self.connection.execute(query, parameters)
+        names = self.columns
+        return [dict(zip(names, row)) for row in cursor]
+
+    # --- queries ---
+
+    def lookup(self, student_ids: List[int]) -> StudentData:
+        """The students with any of these ids, in file order."""
+        wanted = list(dict.fromkeys(student_ids))
+        positions: List[int] = []
+        for start in range(0, len(wanted), _MAX_PARAMETERS):
+            chunk = wanted[start:start + _MAX_PARAMETERS]
+            positions.extend(row[0] for row in self.connection.execute(
+                f"SELECT position FROM students WHERE student_id IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+        positions.sort()
+        rows: StudentData = []
+        for start in range(0, len(positions), _MAX_PARAMETERS):
+            chunk = positions[start:start + _MAX_PARAMETERS]
+            rows.extend(self._select(f"WHERE position IN ({', '.join('?' * len(chunk))})", tuple(chunk)))
+        return rows
+
+    def in_section(self, section: str) -> StudentData:
+        """All students of one section, in file order."""
+        return self._select("WHERE section = ?", (section,))
+
+    def grade_range(self, low: float, high: float) -> StudentData:
+        """All students with low <= final_grade <= high, lowest grade first."""
+        return self._select("WHERE final_grade BETWEEN ? AND ?", (low, high), order="final_grade, position")
+
+    def at_risk(self, grade_threshold: float, attendance_threshold: float, limit: int | None = None) -> StudentData:
+        """
+        Same rule and order as find_at_risk_students (a missing value never
+        counts); with 'limit', only the first that many students.
+        """
+        return self._select(
+            "WHERE final_grade < ? OR attendance_percent < ?", (grade_threshold, attendance_threshold), limit=limit
+        )
+
+    def count_at_risk(self, grade_threshold: float, attendance_threshold: float) -> int:
+        """How many students at_risk() would return, answered from the indexes alone."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM students WHERE final_grade < ? OR attendance_percent < ?",
+            (grade_threshold, attendance_threshold)
+        ).fetchone()[0]
+
+    def _sorted_values(self, field: str, where: str = "", parameters: Tuple[Any, ...] = ()) -> List[float]:
+        if field not in self.numeric_columns:
+            return []
+        condition = f"{_quote(field)} IS NOT NULL" + (f" AND {where}" if where else "")
+        cursor = self.connection.execute(
+            f"SELECT {_quote(field)} FROM students WHERE {condition} ORDER BY {_quote(field)}", parameters
+        )
+        return [row[0] for row in cursor]
+
+    def statistics(self, field: str = 'final_grade') -> Dict[str, float | None]:
+        """calculate_statistics(records, field), from the values in index order."""
+        return SortedColumn(self._sorted_values(field)).summary()
+
+    def sections(self) -> List[str]:
+        """Section names in order of first appearance, like group_positions."""
+        cursor = self.connection.execute(
+            "SELECT section FROM students GROUP BY section ORDER BY MIN(position)"
+        )
+        return [row[0] for row in cursor]
+
+    def section_statistics(
+        self,
+        fields: List[str] | None = None,
+        percentiles: List[float] | None = None
+    ) -> Dict[str, Dict[str, Dict[str, float | None]]]:
+        """
+        grouped_statistics(records, 'section', fields, percentiles): one query
+        per field, which walks the (section, field) index when there is one.
+        """
+        if fields is None:
+            fields = ['final_grade']
+        if percentiles is None:
+            percentiles = DEFAULT_GROUP_PERCENTILES
+        result: Dict[str, Dict[str, Dict[str, float | None]]] = {section: {} for section in self.sections()}
+        for field in fields:
+            by_section: Dict[str, List[float]] = {}
+            if field in self.numeric_columns:
+                cursor = self.connection.execute(
+                    f"SELECT section, {_quote(field)} FROM students WHERE {_quote(field)} IS NOT NULL "
+                    f"ORDER BY section, {_quote(field)}"
+                )
+                for section, rows in groupby(cursor, key=lambda row: row[0]):
+                    by_section[section] = [row[1] for row in rows]
+            for section, stats_by_field in result.items():
+                column = SortedColumn(by_section.get(section, []))
+                stats: Dict[str, float | None] = {'count': column.count}
+                stats.update(column.summary())
+                for p, value in column.percentiles(percentiles).items():
+                    stats[percentile_label(p)] = value
+                stats_by_field[field] = stats
+        return result
+
+    def to_table(self) -> StudentTable:
+        """Every record, in file order, as a StudentTable."""
+        table = StudentTable(self.quiz_count)
+        rows = self.connection.execute(
+            f"SELECT {', '.join(map(_quote, self.columns))} FROM students ORDER BY position"
+        ).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * len(self.columns)
+        numeric = set(self.numeric_columns)
+        for name, values in zip(self.columns, columns):
+            if name == 'student_id':
+                table.student_id = array('q', values)
+            elif name in numeric:
+                table.numeric[name] = array('d', [0.0 if value is None else value for value in values])
+                table.missing[name] = bytearray(value is None for value in values)
+            elif name == 'section':
+                table.text[name] = [sys.intern(value) for value in values]
+            else:
+                table.text[name] = list(values)
+        return table
+
+
+def open_store(config: Dict[str, Any]) -> StudentStore | None:
+    """
+    The store, or None if there is none or it is out of date.
+    If input.csv itself is gone the store is still used (with a note).
+    """
+    path = store_path(config)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        store = StudentStore(path)
+    except sqlite3.DatabaseError as e:
+        print(f"Student store not used: {e}")
+        return None
+    if not os.path.exists(config["paths"]["input_csv"]):
+        print(f"Note: {config['paths']['input_csv']} not found; using the student store as it is.")
+        return store
+    input_stamp = json.loads(store.meta.get('input_stamp') or 'null')
+    if store.meta.get('source_key') != pipeline_stage_keys(config, input_stamp)['transform']:
+        store.close()
+        return None
+    return store
+
+
+def load_store(config: Dict[str, Any]) -> StudentTable | None:
+    """Every record of an up-to-date store, or None."""
+    store = open_store(config)
+    if store is None:
+        return None
+    with store:
+        return store.to_table()
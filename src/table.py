@@ -0,0 +1,249 @@
+import sys
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Sequence
+
+# Type Aliases for clarity
+StudentRow = Dict[str, Any]
+StudentData = List[StudentRow]
+
+# Text columns every student has (student_id is stored separately as an int column)
+TEXT_FIELDS = ['last_name', 'first_name', 'section']
+
+
+def score_fields(quiz_count: int) -> List[str]:
+    """
+    Returns the numeric score columns for a given quiz count,
+    in the same order the ingestor produces them.
+    """
+    fields = [f'quiz{i}' for i in range(1, quiz_count + 1)]
+    fields.extend(['midterm', 'final', 'attendance_percent'])
+    return fields
+
+
+class StudentTable:
+    """
+    A columnar (array-backed) alternative to a list of student dictionaries.
+
+    Every field is stored as one compact column instead of one dict per row:
+      * student_id      -> array('q')
+      * names           -> plain lists of str
+      * section         -> list of interned str (one shared object per section)
+      * scores/grades   -> array('d') plus a bytearray null mask (1 = missing)
+      * letter_grade    -> list of str
+
+    Iterating the table (or indexing it with an int) gives dict rows, so code
+    written for StudentData keeps working. Those dicts are copies: write
+    through set_value() if you need to change the table.
+
+    'version' goes up on every change, so caches (e.g. analyze's sorted
+    columns, kept in derived()) can tell when they are stale. Code that
+    writes straight into the column arrays must call touch() afterwards.
+    """
+
+    def __init__(self, quiz_count: int):
+        self.quiz_count = quiz_count
+        self.version = 0
+        self._derived: Dict[Any, Any] = {}
+        self._derived_version = 0
+        self.student_id = array('q')
+        self.text: Dict[str, List[str]] = {name: [] for name in TEXT_FIELDS}
+        self.numeric: Dict[str, array] = {}
+        self.missing: Dict[str, bytearray] = {}
+        for name in score_fields(quiz_count):
+            self._add_numeric_column(name)
+
+    # --- building the table ---
+
+    def touch(self) -> None:
+        """Marks the table as changed."""
+        self.version += 1
+
+    def derived(self) -> Dict[Any, Any]:
+        """
+        Cache for values computed from this table (analyze keeps its sorted
+        columns here). It is emptied as soon as the version moves on, and it
+        goes away with the table.
+        """
+        if self._derived_version != self.version:
+            self._derived = {}
+            self._derived_version = self.version
+        return self._derived
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled tables (pipeline cache, worker processes) leave the derived values behind
+        state = self.__dict__.copy()
+        state['_derived'] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        state.setdefault('_derived', {})
+        state.setdefault('_derived_version', state.get('version', 0))
+        self.__dict__.update(state)
+
+    def _add_numeric_column(self, name: str) -> None:
+        """Adds an all-missing numeric column (used for computed fields too)."""
+        n = len(self.student_id)
+        self.numeric[name] = array('d', bytes(8 * n))
+        self.missing[name] = bytearray(b'\x01' * n)
+
+    def _add_text_column(self, name: str) -> None:
+        self.text[name] = [''] * len(self.student_id)
+
+    def append_row(self, row: StudentRow) -> None:
+        """
+        Appends one student row (as produced by the ingestor or the transforms).
+        Keys the table has not seen yet (e.g. final_grade) become new columns.
+        """
+        for name, value in row.items():
+            if name != 'student_id' and not self.has_field(name):
+                if value is None or isinstance(value, (int, float)):
+                    self._add_numeric_column(name)
+                else:
+                    self._add_text_column(name)
+
+        self.version += 1
+        self.student_id.append(row['student_id'])
+        for name, column in self.text.items():
+            value = row.get(name) or ''
+            if name == 'section':
+                value = sys.intern(value)
+            column.append(value)
+        for name, column in self.numeric.items():
+            value = row.get(name)
+            if value is None:
+                column.append(0.0)
+                self.missing[name].append(1)
+            else:
+                column.append(value)
+                self.missing[name].append(0)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[StudentRow], quiz_count: int) -> 'StudentTable':
+        """Builds a table from any iterable of dict rows."""
+        table = cls(quiz_count)
+        for row in rows:
+            table.append_row(row)
+        return table
+
+    def take(self, indices: Sequence[int]) -> 'StudentTable':
+        """Returns a new table holding only the rows at the given positions."""
+        subset = StudentTable(self.quiz_count)
+        subset.student_id = array('q', [self.student_id[i] for i in indices])
+        for name, column in self.text.items():
+            subset.text[name] = [column[i] for i in indices]
+        for name, column in self.numeric.items():
+            mask = self.missing[name]
+            subset.numeric[name] = array('d', [column[i] for i in indices])
+            subset.missing[name] = bytearray(mask[i] for i in indices)
+        return subset
+
+    # --- reading and writing single values ---
+
+    def has_field(self, field: str) -> bool:
+        return field == 'student_id' or field in self.numeric or field in self.text
+
+    def get_value(self, i: int, field: str) -> Any:
+        """Returns one value, with None for missing scores."""
+        if field == 'student_id':
+            return self.student_id[i]
+        if field in self.numeric:
+            if self.missing[field][i]:
+                return None
+            return self.numeric[field][i]
+        if field in self.text:
+            return self.text[field][i]
+        raise KeyError(field)
+
+    def set_value(self, i: int, field: str, value: Any) -> None:
+        """
+        Writes one value. Unknown fields become new columns: numeric if the
+        value is a number or None, text otherwise.
+        """
+        self.version += 1
+        if field == 'student_id':
+            self.student_id[i] = value
+            return
+        if field not in self.numeric and field not in self.text:
+            if value is None or isinstance(value, (int, float)):
+                self._add_numeric_column(field)
+            else:
+                self._add_text_column(field)
+
+        if field in self.numeric:
+            if value is None:
+                self.numeric[field][i] = 0.0
+                self.missing[field][i] = 1
+            else:
+                self.numeric[field][i] = value
+                self.missing[field][i] = 0
+        else:
+            if field == 'section':
+                value = sys.intern(value)
+            self.text[field][i] = value
+
+    # --- whole-column access ---
+
+    def ensure_numeric(self, field: str) -> None:
+        """Creates an empty (all-missing) numeric column if it does not exist."""
+        if field not in self.numeric:
+            self._add_numeric_column(field)
+            self.version += 1
+
+    def ensure_text(self, field: str, default: str = '') -> None:
+        """Creates a text column filled with a default if it does not exist."""
+        if field not in self.text:
+            self.text[field] = [default] * len(self.student_id)
+            self.version += 1
+
+    def values(self, field: str) -> List[float]:
+        """
+        Projects a numeric column to a list, skipping missing values.
+        This is the columnar version of
+        [row[field] for row in data if row.get(field) is not None].
+        """
+        if field == 'student_id':
+            return list(self.student_id)
+        if field not in self.numeric:
+            return []
+        column = self.numeric[field]
+        mask = self.missing[field]
+        if not any(mask):
+            return column.tolist()
+        return [value for value, is_missing in zip(column, mask) if not is_missing]
+
+    def field_names(self) -> List[str]:
+        """Field names in the same order a dict row from the ingestor would have."""
+        names = ['student_id'] + TEXT_FIELDS + score_fields(self.quiz_count)
+        extra = [
+            name for name in list(self.numeric) + list(self.text)
+            if name not in names
+        ]
+        return names + extra
+
+    # --- dict-row compatibility view ---
+
+    def row(self, i: int) -> StudentRow:
+        """Returns row i as a (copied) dict, like one entry of StudentData."""
+        return {name: self.get_value(i, name) for name in self.field_names()}
+
+    def to_rows(self) -> StudentData:
+        """Converts the whole table back to the list-of-dicts representation."""
+        return [self.row(i) for i in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.student_id)
+
+    def __iter__(self) -> Iterator[StudentRow]:
+        names = self.field_names()
+        for i in range(len(self)):
+            yield {name: self.get_value(i, name) for name in names}
+
+    def __getitem__(self, i: int) -> StudentRow:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("StudentTable index out of range")
+        return self.row(i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
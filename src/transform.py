@@ -1,9 +1,33 @@
 from typing import List, Dict, Any
+from .table import StudentTable, score_fields
+
+try:
+    from . import transform_numpy
+except ImportError:  # NumPy is optional
+    transform_numpy = None
 
 # Type Aliases for clarity
 StudentRow = Dict[str, Any]
 StudentData = List[StudentRow]
 
+# Which implementation the transform functions use: "numpy" or "python".
+# NumPy is picked automatically when it can be imported.
+BACKEND = 'numpy' if transform_numpy is not None else 'python'
+
+def set_backend(name: str) -> None:
+    """
+    Chooses the transform backend: "auto", "numpy" or "python".
+    Raises ValueError for "numpy" when NumPy is not installed.
+    """
+    global BACKEND
+    if name == 'auto':
+        name = 'numpy' if transform_numpy is not None else 'python'
+    if name not in ('numpy', 'python'):
+        raise ValueError(f"Unknown transform backend: {name}")
+    if name == 'numpy' and transform_numpy is None:
+        raise ValueError("The numpy transform backend needs NumPy installed")
+    BACKEND = name
+
 def _calculate_quiz_average(row: StudentRow, quiz_count: int) -> float:
     """
     Calculates the average quiz score, handling missing quizzes (None).
@@ -33,6 +57,10 @@ def compute_weighted_grade(
     Computes the final weighted grade for each student and adds it to their row.
     Handles missing data (None) by treating it as 0.
     """
+    if BACKEND == 'numpy':
+        return transform_numpy.compute_weighted_grade(student_data, weights, quiz_count)
+    if isinstance(student_data, StudentTable):
+        return _compute_weighted_grade_table(student_data, weights, quiz_count)
     
     # This is an "array operation" - we are iterating over the list
     for row in student_data:
@@ -57,6 +85,43 @@ def compute_weighted_grade(
 
     return student_data
 
+def _compute_weighted_grade_table(
+    table: StudentTable,
+    weights: Dict[str, float],
+    quiz_count: int
+) -> StudentTable:
+    """
+    Column-wise version of compute_weighted_grade.
+    Missing scores are stored as 0.0 in the columns, so they count as 0
+    without any per-row None checks.
+    """
+    table.ensure_numeric('final_grade')
+    quiz_columns = [table.numeric[name] for name in score_fields(quiz_count)[:quiz_count]]
+    midterm = table.numeric['midterm']
+    final = table.numeric['final']
+    attendance = table.numeric['attendance_percent']
+    grades = table.numeric['final_grade']
+    grade_missing = table.missing['final_grade']
+
+    for i in range(len(table)):
+        # Same summation order as _calculate_quiz_average, so rounding matches
+        quiz_score_total = 0.0
+        for column in quiz_columns:
+            quiz_score_total += column[i]
+        avg_quiz = quiz_score_total / quiz_count if quiz_count else 0.0
+
+        weighted_grade = (
+            (avg_quiz * weights['quizzes']) +
+            (midterm[i] * weights['midterm']) +
+            (final[i] * weights['final']) +
+            (attendance[i] * weights['attendance'])
+        )
+        grades[i] = round(weighted_grade, 2)
+        grade_missing[i] = 0
+
+    table.touch()
+    return table
+
 def apply_grade_curve(
     student_data: StudentData, 
     curve_settings: Dict[str, Any]
@@ -64,13 +129,19 @@ def apply_grade_curve(
     """
     Applies a "scale-to-max" grade curve to all students.
     """
+    if BACKEND == 'numpy':
+        return transform_numpy.apply_grade_curve(student_data, curve_settings)
     print("Applying grade curve...")
+    is_table = isinstance(student_data, StudentTable)
     
     # 1. Find the max grade
-    grades = [
-        row['final_grade'] for row in student_data 
-        if row.get('final_grade') is not None
-    ]
+    if is_table:
+        grades = student_data.values('final_grade')
+    else:
+        grades = [
+            row['final_grade'] for row in student_data 
+            if row.get('final_grade') is not None
+        ]
     if not grades:
         print("  No grades found to curve.")
         return student_data
@@ -89,6 +160,29 @@ def apply_grade_curve(
     print(f"  Applying a {curve_amount:.2f} point curve to all students.")
 
     # 3. Apply the curve
+    return apply_curve_amount(student_data, curve_amount, cap)
+
+def apply_curve_amount(
+    student_data: StudentData,
+    curve_amount: float,
+    cap: float
+) -> StudentData:
+    """
+    Adds an already-known curve amount to every final_grade (then caps and rounds).
+    The streaming pipeline uses this to curve one batch at a time once the
+    class-wide max is known.
+    """
+    if BACKEND == 'numpy':
+        return transform_numpy.apply_curve_amount(student_data, curve_amount, cap)
+    if isinstance(student_data, StudentTable):
+        column = student_data.numeric['final_grade']
+        mask = student_data.missing['final_grade']
+        for i in range(len(student_data)):
+            if not mask[i]:
+                column[i] = round(min(column[i] + curve_amount, cap), 2)
+        student_data.touch()
+        return student_data
+
     for row in student_data:
         if row.get('final_grade') is not None:
             new_grade = row['final_grade'] + curve_amount
@@ -105,8 +199,28 @@ def assign_letter_grade(
     """
     Assigns a letter grade to each student based on their final_grade.
     """
+    if BACKEND == 'numpy':
+        return transform_numpy.assign_letter_grade(student_data, cutoffs)
     # Sort cutoffs from highest to lowest score
     sorted_cutoffs = sorted(cutoffs.items(), key=lambda item: item[1], reverse=True)
+
+    if isinstance(student_data, StudentTable):
+        student_data.ensure_text('letter_grade', 'F')
+        letters = student_data.text['letter_grade']
+        if 'final_grade' not in student_data.numeric:
+            return student_data
+        grades = student_data.numeric['final_grade']
+        mask = student_data.missing['final_grade']
+        for i in range(len(student_data)):
+            letter = 'F'
+            if not mask[i]:
+                for grade, min_score in sorted_cutoffs:
+                    if grades[i] >= min_score:
+                        letter = grade
+                        break
+            letters[i] = letter
+        student_data.touch()
+        return student_data
     
     for row in student_data:
         # Default to 'F'
@@ -0,0 +1,190 @@
+"""
+NumPy backend for the transform stage.
+
+transform.py imports this module only if NumPy is installed and then routes
+compute_weighted_grade / apply_grade_curve / assign_letter_grade here.
+Results are exactly the same as the pure-Python loops:
+  * missing scores (None) count as 0
+  * additions happen in the same order, so the float sums are bit-for-bit equal
+  * grades are rounded to 2 decimals with the same result as Python's round()
+"""
+from typing import List, Dict, Any, Tuple
+import numpy as np
+from .table import StudentTable, score_fields
+
+# Type Aliases for clarity
+StudentRow = Dict[str, Any]
+StudentData = List[StudentRow]
+
+# How close x * 100 must be to a .5 boundary before we let Python's round() decide
+_HALF_TOLERANCE = 1e-6
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized round(x, 2).
+    np.round works on x * 100, which can land on the other side of a .5
+    boundary than the exact decimal value does. Those few near-half values are
+    re-rounded one by one with Python's round(); everything else is identical.
+    """
+    scaled = values * 100
+    rounded = np.rint(scaled) / 100
+    near_half = np.nonzero(np.abs(scaled - np.floor(scaled) - 0.5) < _HALF_TOLERANCE)[0]
+    for i in near_half:
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def _score_matrix(student_data: StudentData | StudentTable, fields: List[str]) -> List[np.ndarray]:
+    """
+    One float64 array per field, with missing scores as 0.0.
+    A StudentTable already stores missing scores as 0.0, so its columns are
+    wrapped without copying.
+    """
+    if isinstance(student_data, StudentTable):
+        return [np.frombuffer(student_data.numeric[name], dtype=np.float64) for name in fields]
+
+    matrix = np.array(
+        [[row.get(name) for name in fields] for row in student_data],
+        dtype=np.float64
+    ).reshape(len(student_data), len(fields))
+    np.nan_to_num(matrix, copy=False, nan=0.0)  # None became NaN
+    return [matrix[:, j] for j in range(len(fields))]
+
+
+def compute_weighted_grade(
+    student_data: StudentData | StudentTable,
+    weights: Dict[str, float],
+    quiz_count: int
+) -> StudentData | StudentTable:
+    """
+    Weighted grade as a product of the [quizzes, midterm, final, attendance]
+    component matrix with the weight vector.
+    The product is written out column by column (instead of matrix @ vector)
+    because BLAS may reorder the additions, which can move a grade across a
+    rounding boundary.
+    """
+    fields = score_fields(quiz_count)
+    columns = _score_matrix(student_data, fields)
+    n = len(student_data)
+
+    quiz_total = np.zeros(n)
+    for column in columns[:quiz_count]:
+        quiz_total += column
+    avg_quiz = quiz_total / quiz_count if quiz_count else np.zeros(n)
+
+    midterm, final, attendance = columns[quiz_count:]
+    weighted = (
+        (avg_quiz * weights['quizzes']) +
+        (midterm * weights['midterm']) +
+        (final * weights['final']) +
+        (attendance * weights['attendance'])
+    )
+    grades = round2(weighted)
+
+    if isinstance(student_data, StudentTable):
+        student_data.ensure_numeric('final_grade')
+        np.frombuffer(student_data.numeric['final_grade'], dtype=np.float64)[:] = grades
+        student_data.missing['final_grade'][:] = bytes(n)
+        student_data.touch()
+        return student_data
+
+    for row, grade in zip(student_data, grades.tolist()):
+        row['final_grade'] = grade
+    return student_data
+
+
+def _grade_column(student_data: StudentData | StudentTable) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (grades, present) where present marks rows with a final_grade."""
+    if isinstance(student_data, StudentTable):
+        student_data.ensure_numeric('final_grade')
+        grades = np.frombuffer(student_data.numeric['final_grade'], dtype=np.float64)
+        present = np.frombuffer(student_data.missing['final_grade'], dtype=np.uint8) == 0
+        return grades, present
+
+    grades = np.array([row.get('final_grade') for row in student_data], dtype=np.float64)
+    return grades, ~np.isnan(grades)
+
+
+def apply_grade_curve(
+    student_data: StudentData | StudentTable,
+    curve_settings: Dict[str, Any]
+) -> StudentData | StudentTable:
+    """Scale-to-max curve as one vectorized add-and-clip."""
+    print("Applying grade curve...")
+    grades, present = _grade_column(student_data)
+    if not present.any():
+        print("  No grades found to curve.")
+        return student_data
+
+    max_grade = float(grades[present].max())
+    target_max = curve_settings["target_max_grade"]
+    cap = curve_settings["curve_cap"]
+
+    curve_amount = target_max - max_grade
+    if curve_amount <= 0:
+        print(f"  No curve applied (max grade is already {max_grade}).")
+        return student_data
+
+    print(f"  Applying a {curve_amount:.2f} point curve to all students.")
+    return apply_curve_amount(student_data, curve_amount, cap)
+
+
+def apply_curve_amount(
+    student_data: StudentData | StudentTable,
+    curve_amount: float,
+    cap: float
+) -> StudentData | StudentTable:
+    """Adds a known curve amount, caps and rounds, for every present grade."""
+    grades, present = _grade_column(student_data)
+    raised = grades + curve_amount
+    capped = raised > cap
+    curved = round2(np.minimum(raised, cap))
+
+    if isinstance(student_data, StudentTable):
+        grades[present] = curved[present]
+        student_data.touch()
+        return student_data
+
+    # min(new_grade, cap) hands back the cap object itself, so keep its type
+    capped_value = round(cap, 2)
+    for row, value, is_present, is_capped in zip(
+        student_data, curved.tolist(), present.tolist(), capped.tolist()
+    ):
+        if is_present:
+            row['final_grade'] = capped_value if is_capped else value
+    return student_data
+
+
+def assign_letter_grade(
+    student_data: StudentData | StudentTable,
+    cutoffs: Dict[str, float]
+) -> StudentData | StudentTable:
+    """
+    Letter grades with one searchsorted over the cutoffs.
+    With the cutoffs sorted low to high, the number of cutoffs <= grade picks
+    the letter; 0 means 'F'. Equal cutoffs resolve the same way as the loop.
+    """
+    sorted_cutoffs = sorted(cutoffs.items(), key=lambda item: item[1], reverse=True)
+    ascending = sorted_cutoffs[::-1]
+    bounds = np.array([min_score for _, min_score in ascending], dtype=np.float64)
+    letters = np.array(['F'] + [grade for grade, _ in ascending], dtype=object)
+
+    if isinstance(student_data, StudentTable):
+        student_data.ensure_text('letter_grade', 'F')
+        if 'final_grade' not in student_data.numeric:
+            return student_data
+
+    grades, present = _grade_column(student_data)
+    positions = np.searchsorted(bounds, grades, side='right')
+    positions[~present] = 0
+    result = letters[positions].tolist()
+
+    if isinstance(student_data, StudentTable):
+        student_data.text['letter_grade'] = result
+        student_data.touch()
+        return student_data
+
+    for row, letter in zip(student_data, result):
+        row['letter_grade'] = letter if 'final_grade' in row else 'F'
+    return student_data
@@ -0,0 +1,423 @@
+"""
+Watch mode: keeps the reports in step with input.csv as it changes.
+
+    python -m src.watch [--config config.json] [--interval SECONDS] [--once]
+
+The input file is polled (size + mtime). When it changed, every row is
+hashed and compared with the hash it had last time, keyed by student_id
+(plus an occurrence number for repeated ids). Only new or changed rows are
+validated and transformed again, and only the section reports (and section
+statistics rows) those rows belong to are rewritten. The at-risk report is
+rewritten only when its contents changed. If rows that were already there
+come in a different order, every report is rewritten (the reports follow
+file order), and the report of a section that no longer has any rows (after
+an edit or a new header) is deleted.
+
+The curve is the exception: it depends on the class-wide max weighted
+grade. The max is tracked incrementally; when it moves (a new top scorer,
+or the top scorer's row changed or disappeared) every grade is curved
+again and every report is rewritten, exactly as a full run would.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import List, Dict, Any, Tuple
+from . import analyze
+from . import reports
+from . import transform
+from .cohorts import at_risk_rule
+from .ranking import RankedColumn
+from .compression import compressed_name, open_input
+from .ingest import compile_row_validator, validate_and_clean_row, _as_dict_row
+
+StudentRow = Dict[str, Any]
+StudentData = List[StudentRow]
+# (student_id as written in the file, how many earlier rows had that id)
+RowKey = Tuple[str, int]
+
+DEFAULT_INTERVAL_SECONDS = 2.0
+
+
+class _Entry:
+    """What is remembered about one input row between polls."""
+    __slots__ = ('row_hash', 'row', 'base_grade', 'error', 'raw')
+
+    def __init__(self, row_hash: int, row: StudentRow | None, error: str | None = None, raw: List[Any] | None = None):
+        self.row_hash = row_hash
+        self.row = row            # the processed record, or None for a bad row
+        self.base_grade = None    # weighted grade before the curve
+        self.error = error        # bad rows only: the error and the raw row list
+        self.raw = raw
+
+
+class IncrementalPipeline:
+    """
+    The full pipeline's results for one input file, kept up to date by
+    re-processing only the rows that changed since the previous refresh().
+    The first refresh() processes every row and writes every report; the
+    output files always match what run_full_pipeline writes for the file.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.csv_path = config["paths"]["input_csv"]
+        self.output_dir = config["paths"]["output_dir"]
+        self.quiz_count = config["quiz_count"]
+        curve = config.get("curve_settings", {})
+        self.curve_enabled = curve.get("apply_curve", False)
+        self.target_max = curve.get("target_max_grade", 100)
+        self.curve_cap = curve.get("curve_cap", 100)
+        stats_settings = config.get("section_statistics", {})
+        self.stats_fields = stats_settings.get("fields", ["final_grade"])
+        self.stats_percentiles = stats_settings.get("percentiles", analyze.DEFAULT_GROUP_PERCENTILES)
+        self.compression = reports.report_compression(config)
+        thresholds = config["thresholds"]
+        self._is_at_risk = at_risk_rule(thresholds["at_risk_grade"], thresholds["at_risk_attendance"]).row_test()
+        transform.set_backend(config.get("transform_backend", "auto"))
+
+        self.header: List[str] | None = None
+        self.entries: Dict[RowKey, _Entry] = {}
+        self.order: List[RowKey] = []
+        self.bad_rows: List[Tuple[int, str, List[Any]]] = []
+        self.curve_amount = 0.0
+        self.section_stats: Dict[str, Dict[str, Dict[str, float | None]]] = {}
+        self._signature: Tuple[int, int] | None = None
+        self._validate = None
+        self._id_pos: int | None = None
+        self._base_counts: Counter = Counter()
+        self._base_max: float | None = None
+        self._final_grades = RankedColumn()
+        self._at_risk: set = set()
+        # Sections whose report file the last refresh left on disk
+        self._report_sections: set = set()
+
+    # --- change detection ---
+
+    def poll(self) -> Dict[str, Any] | None:
+        """Runs refresh() if the file changed since the last call; None otherwise."""
+        try:
+            stat = os.stat(self.csv_path)
+        except OSError as e:
+            print(f"Watch: cannot read {self.csv_path}: {e}")
+            return None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        return self.refresh()
+
+    def _reset(self, header: List[str]) -> None:
+        """A new header invalidates everything remembered about the rows."""
+        self.header = header
+        self._validate = compile_row_validator(header, self.quiz_count)
+        self._id_pos = {name: i for i, name in enumerate(header)}.get('student_id')
+        self.entries = {}
+        self.order = []
+        self._base_counts = Counter()
+        self._base_max = None
+        self._final_grades = RankedColumn()
+        self._at_risk = set()
+
+    def _scan(self) -> Tuple[List[RowKey], List[Tuple[int, RowKey, List[str], int]]]:
+        """
+        Reads the file once: the row keys in file order, and the rows whose
+        hash differs from last time as (row number, key, values, hash).
+        """
+        order: List[RowKey] = []
+        changed = []
+        occurrences: Dict[str, int] = {}
+        with open_input(self.csv_path) as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if header != self.header:
+                self._reset(header)
+            id_pos = self._id_pos
+            entries = self.entries
+            for values in filter(None, reader):  # DictReader skips blank lines too
+                student_id = values[id_pos].strip() if id_pos is not None and id_pos < len(values) else ''
+                seen = occurrences.get(student_id, 0)
+                occurrences[student_id] = seen + 1
+                key = (student_id, seen)
+                row_hash = hash(tuple(values))
+                entry = entries.get(key)
+                if entry is None or entry.row_hash != row_hash:
+                    changed.append((len(order) + 2, key, values, row_hash))
+                order.append(key)
+        return order, changed
+
+    # --- the class-wide max behind the curve ---
+
+    def _add_base_grade(self, grade: float) -> None:
+        self._base_counts[grade] += 1
+        if self._base_max is None or grade > self._base_max:
+            self._base_max = grade
+
+    def _remove_base_grade(self, grade: float) -> None:
+        self._base_counts[grade] -= 1
+        if not self._base_counts[grade]:
+            del self._base_counts[grade]
+            if grade == self._base_max:
+                self._base_max = max(self._base_counts) if self._base_counts else None
+
+    def _current_curve_amount(self) -> float:
+        """Same rule as apply_grade_curve: target - max, or no curve if that is <= 0."""
+        if not self.curve_enabled or self._base_max is None:
+            return 0.0
+        return max(self.target_max - self._base_max, 0.0)
+
+    # --- refresh ---
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Re-reads the file and patches every result with the rows that changed.
+        Returns a summary: rows changed/removed, whether the curve moved, and
+        which report files were written or deleted.
+        """
+        start = time.perf_counter()
+        order, changed = self._scan()
+        first_run = not self.order
+        new_keys = set(order) if len(order) != len(self.order) or changed else None
+        removed = [key for key in self.entries if key not in new_keys] if new_keys is not None else []
+
+        affected_sections = set()
+        at_risk_changed = first_run
+
+        # 1. Take out what the removed and changed rows contributed
+        for key in removed + [key for _, key, _, _ in changed if key in self.entries]:
+            entry = self.entries.pop(key)
+            if entry.row is None:
+                continue
+            self._remove_base_grade(entry.base_grade)
+            self._final_grades.remove(entry.row['final_grade'])
+            affected_sections.add(entry.row['section'])
+            if key in self._at_risk:
+                self._at_risk.discard(key)
+                at_risk_changed = True
+
+        # 2. Validate and weight the new versions of the changed rows
+        new_rows: StudentData = []
+        new_entries = []
+        for row_num, key, values, row_hash in changed:
+            row = self._validate(values)
+            if row is None:
+                raw = _as_dict_row(self.header, values)
+                row, error = validate_and_clean_row(row_num, raw, self.quiz_count)
+                if error:
+                    self.entries[key] = _Entry(row_hash, None, error, list(raw.values()))
+                    continue
+            entry = _Entry(row_hash, row)
+            self.entries[key] = entry
+            new_rows.append(row)
+            new_entries.append((key, entry))
+        if new_rows:
+            transform.compute_weighted_grade(new_rows, self.config["weights"], self.quiz_count)
+        for key, entry in new_entries:
+            entry.base_grade = entry.row['final_grade']
+            self._add_base_grade(entry.base_grade)
+
+        # 3. Curve: if the class max moved, every row is affected
+        curve_amount = self._current_curve_amount()
+        curve_changed = curve_amount != self.curve_amount
+        self.curve_amount = curve_amount
+        if curve_changed:
+            targets = [(key, entry) for key, entry in self.entries.items() if entry.row is not None]
+            self._final_grades = RankedColumn()
+        else:
+            targets = new_entries
+        rows = [entry.row for _, entry in targets]
+        for row, (_, entry) in zip(rows, targets):
+            row['final_grade'] = entry.base_grade
+        if rows and curve_amount > 0:
+            transform.apply_curve_amount(rows, curve_amount, self.curve_cap)
+        if rows:
+            transform.assign_letter_grade(rows, self.config["grade_cutoffs"])
+
+        # 4. Patch the sorted grades and the at-risk set for the affected rows
+        if curve_changed:
+            self._final_grades = RankedColumn(row['final_grade'] for row in rows)
+            at_risk_changed = at_risk_changed or bool(self._at_risk)
+        for key, entry in targets:
+            row = entry.row
+            if not curve_changed:
+                self._final_grades.add(row['final_grade'])
+            affected_sections.add(row['section'])
+            if self._is_at_risk(row):
+                self._at_risk.add(key)
+                at_risk_changed = True
+            elif key in self._at_risk:
+                self._at_risk.discard(key)
+                at_risk_changed = True
+
+        # 5. Rows that moved change the order inside the reports: rewrite them all
+        if not first_run and self._reordered(order):
+            affected_sections.update(entry.row['section'] for entry in self.entries.values() if entry.row is not None)
+            at_risk_changed = True
+
+        self.order = order
+        self.bad_rows = self._current_bad_rows()
+
+        summary = self._write_outputs(affected_sections, at_risk_changed)
+        summary.update({
+            'rows': len(order),
+            'rows_changed': len(changed),
+            'rows_removed': len(removed),
+            'bad_rows': len(self.bad_rows),
+            'curve_changed': curve_changed,
+            'curve_amount': curve_amount,
+            'seconds': time.perf_counter() - start,
+        })
+        print(f"Watch: {summary['rows_changed']} rows changed, {summary['rows_removed']} removed, "
+              f"{len(summary['files_written'])} files written "
+              f"({'curve moved to ' + format(curve_amount, '.2f') if curve_changed else 'curve unchanged'}) "
+              f"in {summary['seconds']:.3f}s")
+        return summary
+
+    def _reordered(self, order: List[RowKey]) -> bool:
+        """True if rows that were there last time and still are now come in a different order."""
+        if order == self.order:
+            return False
+        old_keys = set(self.order)
+        new_keys = set(order)
+        return [key for key in self.order if key in new_keys] != [key for key in order if key in old_keys]
+
+    def _current_bad_rows(self) -> List[Tuple[int, str, List[Any]]]:
+        """Bad rows with their current row numbers (rows above them may have come or gone)."""
+        bad_rows = []
+        for i, key in enumerate(self.order):
+            entry = self.entries[key]
+            if entry.row is None:
+                bad_rows.append((i + 2, entry.error, entry.raw))
+        return bad_rows
+
+    # --- outputs ---
+
+    def _write_outputs(self, affected_sections: set, at_risk_changed: bool) -> Dict[str, Any]:
+        """Rewrites the affected section reports, the section statistics and (if changed) the at-risk report."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        section_order: Dict[str, None] = {}
+        affected_rows: StudentData = []
+        positions: Dict[str, List[int]] = {name: [] for name in affected_sections}
+        at_risk_rows: StudentData = []
+        for key in self.order:
+            row = self.entries[key].row
+            if row is None:
+                continue
+            section = row['section']
+            section_order[section] = None
+            if section in positions:
+                positions[section].append(len(affected_rows))
+                affected_rows.append(row)
+            if at_risk_changed and key in self._at_risk:
+                at_risk_rows.append(row)
+
+        # Sections with no rows left, including ones only the previous header's rows had
+        gone = sorted((affected_sections | self._report_sections) - section_order.keys())
+        files_deleted = []
+        for section in gone:
+            positions.pop(section, None)
+            self.section_stats.pop(section, None)
+            files_deleted.append(compressed_name(reports.section_file_name(section), self.compression))
+        self._report_sections = set(section_order)
+        if at_risk_changed and not at_risk_rows:
+            files_deleted.append(compressed_name(reports.AT_RISK_FILE, self.compression))
+        for name in files_deleted:
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+            except FileNotFoundError:
+                pass
+
+        files_written: List[str] = []
+        if positions or at_risk_rows:
+            written = reports.write_reports(
+                affected_rows,
+                at_risk_rows,
+                self.output_dir,
+                workers=self.config.get("reports", {}).get("workers", 4),
+                sections={name: positions[name] for name in section_order if name in positions},
+                compression=self.compression
+            )
+            files_written.extend(written['files'])
+
+        if positions:
+            self.section_stats.update(analyze.grouped_statistics(
+                affected_rows,
+                by='section',
+                fields=self.stats_fields,
+                percentiles=self.stats_percentiles,
+                groups=positions
+            ))
+        if affected_sections or gone:
+            ordered_stats = {name: self.section_stats[name] for name in section_order}
+            stats_file = reports.export_grouped_statistics(
+                ordered_stats, self.output_dir, by='section', compression=self.compression
+            )
+            if stats_file:
+                files_written.append(stats_file)
+            elif not ordered_stats:
+                stats_name = compressed_name(reports.grouped_statistics_file_name('section'), self.compression)
+                stats_path = os.path.join(self.output_dir, stats_name)
+                if os.path.exists(stats_path):
+                    os.remove(stats_path)
+                    files_deleted.append(stats_name)
+
+        return {'files_written': files_written, 'files_deleted': files_deleted}
+
+    # --- results ---
+
+    @property
+    def records(self) -> StudentData:
+        """The processed records in file order, as run_full_pipeline returns them."""
+        return [self.entries[key].row for key in self.order if self.entries[key].row is not None]
+
+    @property
+    def at_risk(self) -> StudentData:
+        return [self.entries[key].row for key in self.order if key in self._at_risk]
+
+    def statistics(self) -> Dict[str, float | None]:
+        """calculate_statistics(records, 'final_grade'), kept current by the RankedColumn (no rescan)."""
+        return self._final_grades.summary()
+
+
+def watch(config: Dict[str, Any], interval: float, once: bool = False) -> None:
+    """Polls the input file every 'interval' seconds until interrupted (or once)."""
+    pipeline = IncrementalPipeline(config)
+    print(f"Watching {pipeline.csv_path} every {interval:g}s (Ctrl+C to stop)")
+    try:
+        while True:
+            summary = pipeline.poll()
+            if summary is not None:
+                stats = pipeline.statistics()
+                print(f"  {summary['rows'] - summary['bad_rows']} records, "
+                      f"{len(pipeline.at_risk)} at risk, mean {stats['mean']}, max {stats['max']}")
+            if once:
+                return
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.watch",
+        description="Keep the reports up to date as the input CSV changes."
+    )
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--interval", type=float, default=None, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="process the file once and exit")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    interval = args.interval
+    if interval is None:
+        interval = config.get("watch", {}).get("interval_seconds", DEFAULT_INTERVAL_SECONDS)
+    watch(config, interval, args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
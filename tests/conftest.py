@@ -0,0 +1,19 @@
+import json
+import pytest
+
+@pytest.fixture
+def pipeline_config(tmp_path):
+    """
+    Builds test configs from config.json (every opt-in feature off, as shipped)
+    with the output directory under tmp_path: make(name, input_csv, **sections),
+    where each keyword replaces a whole section, e.g. store={'enabled': True, 'path': ...}.
+    """
+    def make(name='', input_csv=None, **sections):
+        with open('config.json') as f:
+            config = json.load(f)
+        if input_csv is not None:
+            config['paths']['input_csv'] = str(input_csv)
+        config['paths']['output_dir'] = str(tmp_path / name)
+        config.update(sections)
+        return config
+    return make
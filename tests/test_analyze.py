@@ -72,4 +72,104 @@ def test_find_at_risk_students():
     assert at_risk[1]['id'] == 3
     assert at_risk[2]['id'] == 4
     assert safe[0]['id'] == 1
-    
\ No newline at end of file
+    
+# --- Test 3: Sorted-column cache, quickselect and batch percentiles ---
+def test_percentiles_and_median_match_sorting():
+    # 1. Arrange: repeated values on purpose (quickselect must handle ties)
+    import random
+    from src.analyze import find_percentile, find_percentiles, find_median
+    rng = random.Random(3)
+    sample_data = [{'final_grade': float(rng.randint(50, 100))} for _ in range(501)]
+    sample_data.append({'final_grade': None})
+    values = sorted(row['final_grade'] for row in sample_data if row['final_grade'] is not None)
+
+    # 2. Act: quickselect path (lists are never cached), then the sorted batch path
+    single = {p: find_percentile(sample_data, 'final_grade', p) for p in (0, 10, 25, 50, 75, 90, 100)}
+    median = find_median(sample_data, 'final_grade')
+    batch = find_percentiles(sample_data, 'final_grade', [0, 10, 25, 50, 75, 90, 100])
+
+    # 3. Assert
+    for p, value in single.items():
+        assert value == values[int(round((p / 100) * (len(values) - 1)))]
+    assert batch == single
+    assert median == values[len(values) // 2]
+
+def test_statistics_cache_sees_changes():
+    # 1. Arrange
+    from src.analyze import sorted_column
+    from src.table import StudentTable
+    sample_data = [{'final_grade': 10}, {'final_grade': 20}, {'final_grade': 30}]
+    table = StudentTable.from_rows(
+        [{'student_id': i, 'final_grade': float(g)} for i, g in enumerate([10, 20, 30])], 0
+    )
+    assert calculate_statistics(sample_data, 'final_grade')['max'] == 30
+    assert calculate_statistics(table, 'final_grade')['max'] == 30.0
+    cached = sorted_column(table, 'final_grade')
+    assert sorted_column(table, 'final_grade') is cached  # kept on the table until it changes
+
+    # 2. Act: change the data after the columns were cached
+    sample_data[0]['final_grade'] = 90
+    table.set_value(0, 'final_grade', 90.0)
+
+    # 3. Assert
+    assert calculate_statistics(sample_data, 'final_grade')['max'] == 90
+    assert calculate_statistics(table, 'final_grade')['max'] == 90.0
+    assert sorted_column(table, 'final_grade') is not cached
+
+# --- Test 4: Quantile sketch stays within its error bound ---
+def test_quantile_sketch_matches_exact_percentiles():
+    # 1. Arrange: 4 "sections" sketched separately, then merged
+    import bisect
+    import random
+    from src.analyze import QuantileSketch, find_percentile
+    rng = random.Random(7)
+    sample_data = [{'final_grade': round(rng.gauss(72, 12), 2)} for _ in range(20000)]
+    sketches = [QuantileSketch.for_error(0.01, seed=i) for i in range(4)]
+
+    # 2. Act
+    for i, row in enumerate(sample_data):
+        sketches[i % 4].update(row['final_grade'])
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    # 3. Assert: the estimate's rank is within the error bound of the exact one
+    values = sorted(row['final_grade'] for row in sample_data)
+    assert merged.count == len(values)
+    assert merged.min == values[0] and merged.max == values[-1]
+    for p in (5, 10, 25, 50, 75, 90, 95):
+        exact = find_percentile(sample_data, 'final_grade', p)
+        estimate = merged.percentile(p)
+        rank_gap = abs(bisect.bisect_left(values, estimate) - bisect.bisect_left(values, exact))
+        assert rank_gap / len(values) <= merged.rank_error
+    # Fixed memory: far fewer values kept than were added
+    assert sum(len(level) for level in merged._levels) < 4 * merged.k
+
+# --- Test 5: Grouped statistics equal per-section calculate_statistics ---
+def test_grouped_statistics_matches_filtered_sections():
+    # 1. Arrange
+    from src.analyze import grouped_statistics, find_percentiles
+    from src.table import StudentTable
+    sample_data = [
+        {'student_id': i, 'section': f'S{i % 3}',
+         'final_grade': None if i % 7 == 0 else float(50 + (i * 37) % 50),
+         'attendance_percent': float(70 + i % 30)}
+        for i in range(60)
+    ]
+    table = StudentTable.from_rows(sample_data, 0)
+
+    # 2. Act
+    by_section = grouped_statistics(sample_data, by='section',
+                                    fields=['final_grade', 'attendance_percent'], percentiles=[10, 90])
+    by_section_table = grouped_statistics(table, by='section',
+                                          fields=['final_grade', 'attendance_percent'], percentiles=[10, 90])
+
+    # 3. Assert
+    assert list(by_section) == ['S0', 'S1', 'S2']
+    for section, fields in by_section.items():
+        subset = [row for row in sample_data if row['section'] == section]
+        for field, stats in fields.items():
+            assert {k: stats[k] for k in ('mean', 'median', 'min', 'max')} == calculate_statistics(subset, field)
+            assert stats['count'] == sum(row[field] is not None for row in subset)
+            assert [stats['p10'], stats['p90']] == list(find_percentiles(subset, field, [10, 90]).values())
+    assert by_section_table == by_section
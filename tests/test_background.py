@@ -0,0 +1,34 @@
+import pytest
+from src.background import BackgroundPipeline
+from src.main import run_full_pipeline
+from src.progress import PipelineProgress, PipelineCancelled
+
+# --- Test 1: A background run publishes data and index together, once ---
+def test_background_pipeline_publishes_complete_dataset(tmp_path, pipeline_config):
+    # 1. Arrange
+    job = BackgroundPipeline(pipeline_config())
+
+    # 2. Act
+    assert job.start()
+    job.wait(timeout=30)
+    dataset = job.take_result()
+
+    # 3. Assert
+    assert job.state == 'done'
+    records, index = dataset
+    assert len(records) == 5
+    assert index.get(1)['student_id'] == 1
+    assert job.take_result() is None  # handed out only once
+    assert 'Pipeline Complete' in (tmp_path / 'pipeline.log').read_text()
+
+# --- Test 2: Cancelling stops the pipeline at the next stage boundary ---
+def test_cancelled_progress_stops_pipeline(tmp_path, pipeline_config):
+    # 1. Arrange
+    progress = PipelineProgress()
+    progress.cancel()
+
+    # 2. Act / 3. Assert
+    with pytest.raises(PipelineCancelled):
+        run_full_pipeline(pipeline_config(), progress=progress)
+    assert progress.stage == 'starting'
+    assert not (tmp_path / 'at_risk_report.csv').exists()
@@ -0,0 +1,61 @@
+import json
+import shutil
+from src import batch
+
+def base_config(tmp_path):
+    with open('config.json') as f:
+        config = json.load(f)
+    config['cache'] = {'enabled': True, 'dir': str(tmp_path / 'cache'), 'max_mb': 16}
+    return config
+
+# --- Test 1: One output directory per input, exit code reflects failures ---
+def test_run_batch_reports_per_input_results(tmp_path):
+    # 1. Arrange: two good term files, one with no valid rows, one missing
+    for name in ('term1', 'term2'):
+        shutil.copy('data/input.csv', tmp_path / f'{name}.csv')
+    (tmp_path / 'broken.csv').write_text('student_id,x\n1,2\n')
+    inputs = batch.expand_inputs([str(tmp_path / '*.csv'), str(tmp_path / 'missing.csv')])
+
+    # 2. Act
+    results, code = batch.run_batch(inputs, base_config(tmp_path), str(tmp_path / 'out'), workers=2)
+
+    # 3. Assert
+    assert [r['ok'] for r in results] == [False, True, True, False]
+    assert results[1]['records'] == 5
+    assert code == batch.EXIT_SOME_FAILED
+    assert (tmp_path / 'out' / 'term1' / 'section_S01_report.csv').exists()
+    assert (tmp_path / 'out' / 'term2' / 'at_risk_report.csv').exists()
+    assert 'Error' in (tmp_path / 'out' / 'missing' / batch.LOG_FILE).read_text()
+
+# --- Test 2: Exit codes for cron ---
+def test_batch_exit_codes(tmp_path):
+    # 1. Arrange
+    shutil.copy('data/input.csv', tmp_path / 'term.csv')
+    config_path = tmp_path / 'base.json'
+    config_path.write_text(json.dumps(base_config(tmp_path)))
+    common = ['--config', str(config_path), '--output-root', str(tmp_path / 'out'), '--workers', '1']
+
+    # 2. Act / 3. Assert
+    assert batch.main(common + [str(tmp_path / 'term.csv')]) == batch.EXIT_OK
+    assert batch.main(common + [str(tmp_path / 'missing.csv')]) == batch.EXIT_ALL_FAILED
+    assert batch.main(common + [str(tmp_path / 'none*.csv')]) == batch.EXIT_NO_INPUT
+    summary = json.loads((tmp_path / 'out' / batch.SUMMARY_FILE).read_text())
+    assert summary['exit_code'] == batch.EXIT_ALL_FAILED
+
+# --- Test 3: Parallel jobs share one cache dir that evicts on every store ---
+def test_parallel_jobs_share_a_small_cache(tmp_path):
+    # 1. Arrange: different inputs (different keys) and a cache too small to keep any entry
+    text = open('data/input.csv', encoding='utf-8').read().rstrip('\n')
+    for i in range(8):
+        (tmp_path / f'term{i}.csv').write_text(text + f"\n{100 + i},New,Student,S01,80,80,80,80,80,80,80,90\n")
+    config = base_config(tmp_path)
+    config['cache']['max_mb'] = 0.001
+
+    # 2. Act
+    results, code = batch.run_batch(
+        batch.expand_inputs([str(tmp_path / 'term*.csv')]), config, str(tmp_path / 'out'), workers=4
+    )
+
+    # 3. Assert: no job died on an entry another job evicted
+    assert code == batch.EXIT_OK
+    assert [r['records'] for r in results] == [6] * 8
@@ -0,0 +1,42 @@
+from benchmarks import datagen
+from benchmarks.suite import compare_results
+from benchmarks.bench_startup import LIGHT_MODULES, import_profile, forbidden_imports, project_import_us
+from src.ingest import read_and_validate_csv
+
+# --- Test 1: The generator is deterministic and honours its rates ---
+def test_datagen_is_deterministic(tmp_path):
+    # 1. Arrange
+    first, second = tmp_path / 'a.csv', tmp_path / 'b.csv'
+
+    # 2. Act
+    datagen.write_csv(str(first), 2000, quiz_count=3, bad_rate=0.1, sections=7, seed=5)
+    datagen.write_csv(str(second), 2000, quiz_count=3, bad_rate=0.1, sections=7, seed=5)
+    clean, bad = read_and_validate_csv(str(first), 3)
+
+    # 3. Assert
+    assert first.read_bytes() == second.read_bytes()
+    assert len(clean) + len(bad) == 2000
+    assert 100 < len(bad) < 300  # about 10% out-of-range rows
+    assert len({row['section'] for row in clean}) == 7
+
+# --- Test 2: Only slowdowns past the threshold (and above timer noise) count ---
+def test_compare_results_flags_regressions():
+    # 1. Arrange
+    baseline = {'results': {'1000': {'ingest': {'seconds': 0.100}, 'stats': {'seconds': 0.001}}}}
+    current = {'results': {'1000': {'ingest': {'seconds': 0.150}, 'stats': {'seconds': 0.002}},
+                           '5000': {'ingest': {'seconds': 0.9}}}}
+
+    # 2. Act
+    rows = compare_results(baseline, current, threshold=0.25)
+
+    # 3. Assert: ingest is 50% slower; stats doubled but only by 1 ms; 5000 has no baseline
+    assert [(stage, regressed) for _, stage, _, _, regressed in rows] == [('ingest', True), ('stats', False)]
+
+# --- Test 3: The CLI's lightweight commands never import the heavy modules ---
+def test_cli_startup_path_stays_light():
+    # 1. Arrange / 2. Act
+    entries = import_profile(LIGHT_MODULES)
+
+    # 3. Assert
+    assert forbidden_imports(entries) == []
+    assert project_import_us(entries) > 0
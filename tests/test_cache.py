@@ -0,0 +1,53 @@
+import os
+import time
+from src.cache import PipelineCache, stage_key
+
+# --- Test 1: Store/load, size-based eviction and invalidation ---
+def test_pipeline_cache_evicts_and_invalidates(tmp_path):
+    # 1. Arrange: room for about two 1 KB entries
+    cache = PipelineCache(str(tmp_path / "cache"), max_bytes=2500)
+    key_a, key_b, key_c = (stage_key('ingest', name) for name in 'abc')
+
+    # 2. Act
+    cache.store('ingest', key_a, b'a' * 1000)
+    cache.store('ingest', key_b, b'b' * 1000)
+    # Reading 'a' makes it the most recently used entry
+    os.utime(cache._path('ingest', key_b), (time.time() - 60, time.time() - 60))
+    assert cache.load('ingest', key_a) == b'a' * 1000
+    cache.store('transform', key_c, b'c' * 1000)
+
+    # 3. Assert: 'b' (least recently used) was evicted
+    assert cache.load('ingest', key_b) is None
+    assert cache.load('ingest', key_a) is not None
+    assert cache.size_bytes() <= 2500
+    assert cache.invalidate('transform') == 1
+    assert cache.load('transform', key_c) is None
+    assert cache.invalidate() == 1
+
+# --- Test 2: Entries deleted by another process are skipped, not fatal ---
+def test_pipeline_cache_tolerates_vanished_entries(tmp_path, monkeypatch):
+    # 1. Arrange: list the entries, then let "another process" delete them
+    cache = PipelineCache(str(tmp_path / "cache"), max_bytes=1 << 20)
+    key_a, key_b = (stage_key('ingest', name) for name in 'ab')
+    cache.store('ingest', key_a, b'a' * 1000)
+    cache.store('ingest', key_b, b'b' * 1000)
+    stale = cache._entries()
+    assert cache.invalidate() == 2
+
+    # 2. Act
+    monkeypatch.setattr(cache, '_entries', lambda: stale)
+    cache.max_bytes = 0
+    evicted = cache.evict()
+    invalidated = cache.invalidate()
+    monkeypatch.undo()
+    cache.max_bytes = 1 << 20
+    cache.store('ingest', key_a, b'a')
+    def evicted_before_utime(path, *args):
+        os.remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, 'utime', evicted_before_utime)
+    loaded = cache.load('ingest', key_a)
+
+    # 3. Assert
+    assert (evicted, invalidated) == (0, 0)
+    assert loaded == b'a'  # the value was read before the entry went away
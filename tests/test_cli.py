@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+import time
+from src import cache, cli, main
+from src.results import load_results
+
+def write_config(tmp_path, pipeline_config):
+    config = pipeline_config(results={'enabled': True, 'path': str(tmp_path / 'results.snapshot')})
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config))
+    return str(config_path), config
+
+# --- Test 1: run saves the results; lookup/stats read them without re-running ---
+def test_commands_read_saved_results(tmp_path, pipeline_config, capsys, monkeypatch):
+    # 1. Arrange
+    config_path, config = write_config(tmp_path, pipeline_config)
+    assert cli.main(['--config', config_path, 'run']) == cli.EXIT_OK
+    saved = load_results(config)
+    capsys.readouterr()
+
+    def no_pipeline(*args, **kwargs):
+        raise AssertionError("the pipeline should not run")
+    monkeypatch.setattr(main, 'run_full_pipeline', no_pipeline)
+
+    # 2. Act
+    lookup_code = cli.main(['--config', config_path, 'lookup', '3', '999'])
+    lookup_output = capsys.readouterr().out
+    stats_code = cli.main(['--config', config_path, 'stats'])
+    stats_output = capsys.readouterr().out
+
+    # 3. Assert
+    assert len(saved) == 5
+    assert lookup_code == cli.EXIT_NOT_FOUND  # 999 does not exist
+    assert "Hugo General" in lookup_output
+    assert "id 999 not found" in lookup_output
+    assert stats_code == cli.EXIT_OK
+    assert "Count:  5" in stats_output
+
+# --- Test 2: Without saved results the commands fall back to a pipeline run ---
+def test_at_risk_runs_pipeline_when_results_are_missing(tmp_path, pipeline_config, capsys):
+    # 1. Arrange
+    config_path, config = write_config(tmp_path, pipeline_config)
+
+    # 2. Act
+    code = cli.main(['--config', config_path, 'at-risk'])
+    captured = capsys.readouterr()
+
+    # 3. Assert
+    assert code == cli.EXIT_OK
+    assert "1 student(s) at risk" in captured.out
+    assert "Pipeline Complete" in captured.err  # the pipeline's output stays off stdout
+    assert load_results(config) is not None
+
+# --- Test 3: Up-to-date checks hash the input only when its size or mtime changed ---
+def test_saved_results_check_skips_hashing_unchanged_input(tmp_path, pipeline_config, monkeypatch):
+    # 1. Arrange
+    input_csv = tmp_path / 'input.csv'
+    shutil.copy('data/input.csv', input_csv)
+    config = pipeline_config(input_csv=input_csv, results={'enabled': True, 'path': str(tmp_path / 'results.snapshot')})
+    main.run_full_pipeline(config)
+    monkeypatch.setattr(cache, '_DIGESTS', {})  # as in a new CLI process
+    hashed = []
+    def counting_open(path, *args, **kwargs):
+        hashed.append(path)
+        return open(path, *args, **kwargs)
+    monkeypatch.setattr(cache, 'open', counting_open, raising=False)
+
+    # 2. Act
+    unchanged = load_results(config)
+    reads_unchanged = len(hashed)
+    os.utime(input_csv, ns=(time.time_ns(), time.time_ns() + 10**9))  # touched, same bytes
+    touched = load_results(config)
+    reads_touched = len(hashed)
+    with open(input_csv, 'a') as f:
+        f.write("7,New,Student,S01,80,80,80,80,80,80,80,90\n")
+    edited = load_results(config)
+
+    # 3. Assert
+    assert reads_unchanged == 0
+    assert touched is not None and reads_touched == 1
+    assert edited is None and len(hashed) == 2
@@ -0,0 +1,97 @@
+import pytest
+from benchmarks import datagen
+from src import analyze, cohorts, transform
+from src.cohorts import IndexSet, at_risk_rule, evaluate_many, field, missing_count
+from src.ingest import read_and_validate_csv
+from src.table import StudentTable
+
+QUIZZES = ['quiz1', 'quiz2', 'quiz3', 'quiz4']
+
+def graded_records(tmp_path, rows=2000):
+    csv_path = str(tmp_path / 'input.csv')
+    datagen.write_csv(csv_path, rows, quiz_count=4, missing_rate=0.2, sections=4, seed=11)
+    records, _ = read_and_validate_csv(csv_path, 4)
+    transform.compute_weighted_grade(records, {"quizzes": 0.3, "midterm": 0.3, "final": 0.3, "attendance": 0.1}, 4)
+    return records
+
+# --- Test 1: The at-risk rule selects what find_at_risk_students selects ---
+@pytest.mark.parametrize("as_table", [False, True])
+def test_at_risk_rule_matches_find_at_risk_students(tmp_path, as_table):
+    # 1. Arrange
+    records = graded_records(tmp_path)
+    records[0]['attendance_percent'] = None
+    data = StudentTable.from_rows(records, 4) if as_table else records
+    expected, _ = analyze.find_at_risk_students(records, 65, 80)
+
+    # 2. Act
+    selected = at_risk_rule(65, 80).evaluate(data).select(data)
+
+    # 3. Assert
+    rows = selected.to_rows() if as_table else selected
+    assert [row['student_id'] for row in rows] == [row['student_id'] for row in expected]
+    assert all(at_risk_rule(65, 80).row_test()(row) for row in expected)
+
+# --- Test 2: &, | and ~ on rules and on IndexSets agree with a row-by-row check ---
+def test_combined_rules_match_row_by_row(tmp_path):
+    # 1. Arrange
+    records = graded_records(tmp_path)
+    struggling = (missing_count(QUIZZES) >= 2) & (field('midterm') < 60)
+    rules = {
+        'struggling': struggling,
+        'not_struggling': ~struggling,
+        'no_final_or_low_grade': field('final').is_missing() | (field('final_grade') < 50),
+    }
+
+    # 2. Act
+    sets = evaluate_many(rules, records)
+
+    # 3. Assert
+    def missing_quizzes(row):
+        return sum(row.get(name) is None for name in QUIZZES)
+    expected = [i for i, row in enumerate(records)
+                if missing_quizzes(row) >= 2 and row['midterm'] is not None and row['midterm'] < 60]
+    assert sets['struggling'].positions() == expected
+    assert [i for i in range(len(records)) if i in sets['struggling']] == expected
+    assert sets['struggling'].bits.bit_length() <= len(records)  # one bit per row
+    assert len(sets['struggling']) + len(sets['not_struggling']) == len(records)
+    assert not (sets['struggling'] & sets['not_struggling'])
+    assert [i for i, row in enumerate(records) if rules['no_final_or_low_grade'].row_test()(row)] == \
+        sets['no_final_or_low_grade'].positions()
+    both = sets['struggling'] | sets['no_final_or_low_grade']
+    assert (both - sets['struggling']) == (sets['no_final_or_low_grade'] - sets['struggling'])
+
+# --- Test 3: Shared columns are projected once across several threshold sets ---
+def test_evaluate_many_shares_columns(tmp_path, monkeypatch):
+    # 1. Arrange
+    records = graded_records(tmp_path, rows=300)
+    rules = {f"grade<{grade}": at_risk_rule(grade, 80) for grade in (60, 65, 70)}
+    calls = []
+    original = cohorts.Field.column
+    monkeypatch.setattr(cohorts.Field, 'column', lambda self, data: calls.append(self.name) or original(self, data))
+
+    # 2. Act
+    sets = evaluate_many(rules, records)
+
+    # 3. Assert
+    assert sorted(calls) == ['attendance_percent', 'final_grade']
+    assert len(sets['grade<60']) <= len(sets['grade<65']) <= len(sets['grade<70'])
+    for name, rule in rules.items():
+        assert sets[name] == rule.evaluate(records)
+
+# --- Test 4: The NumPy path gives the same sets as the pure-Python one ---
+def test_numpy_path_matches_python(tmp_path, monkeypatch):
+    # 1. Arrange
+    if not cohorts._load_numpy():
+        pytest.skip("NumPy is not installed")
+    table = StudentTable.from_rows(graded_records(tmp_path), 4)
+    rule = (field('midterm') >= 70) & ~(field('attendance_percent') < 85) | (field('section') != 'S1')
+
+    # 2. Act
+    monkeypatch.setattr(cohorts, 'NUMPY_MIN_ROWS', 10 ** 9)
+    python_set = rule.evaluate(table)
+    monkeypatch.setattr(cohorts, 'NUMPY_MIN_ROWS', 0)
+    numpy_set = rule.evaluate(table)
+
+    # 3. Assert
+    assert python_set == numpy_set
+    assert IndexSet.from_positions(len(table), python_set.positions()) == python_set
@@ -0,0 +1,82 @@
+import bz2
+import gzip
+import lzma
+import os
+import pytest
+import src.ingest as ingest
+from benchmarks import datagen
+from src.compression import detect_compression
+from src.ingest import read_and_validate_csv
+from src.main import run_full_pipeline
+
+COMPRESSORS = {'gzip': gzip.compress, 'bz2': bz2.compress, 'xz': lzma.compress}
+EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+
+def decompressed_files(directory):
+    """File name without the compression extension -> decompressed bytes."""
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            content = f.read()
+        codec = detect_compression(os.path.join(directory, name))
+        if codec:
+            content = {'gzip': gzip.decompress, 'bz2': bz2.decompress, 'xz': lzma.decompress}[codec](content)
+            name = name[:-len(EXTENSIONS[codec])]
+        files[name] = content
+    return files
+
+# --- Test 1: Compressed inputs read exactly like the plain file, serial and parallel ---
+@pytest.mark.parametrize("codec", ["gzip", "bz2", "xz"])
+def test_compressed_input_matches_plain(tmp_path, monkeypatch, codec):
+    # 1. Arrange
+    plain = tmp_path / 'input.csv'
+    datagen.write_csv(str(plain), 2000, quiz_count=4, missing_rate=0.05, bad_rate=0.02, seed=5)
+    packed = tmp_path / ('input.csv' + EXTENSIONS[codec])
+    packed.write_bytes(COMPRESSORS[codec](plain.read_bytes()))
+    no_extension = tmp_path / 'export.dat'  # recognised by its magic bytes
+    no_extension.write_bytes(packed.read_bytes())
+    monkeypatch.setattr(ingest, 'MIN_SHARD_BYTES', 8192)  # several chunks for the pool
+
+    # 2. Act
+    expected = read_and_validate_csv(str(plain), 4)
+    serial = read_and_validate_csv(str(packed), 4)
+    by_magic = read_and_validate_csv(str(no_extension), 4)
+    parallel = read_and_validate_csv(str(packed), 4, workers=2)
+
+    # 3. Assert
+    assert detect_compression(str(no_extension)) == codec
+    assert detect_compression(str(plain)) is None
+    assert len(expected[1]) > 0  # bad rows (and their row numbers) are covered too
+    assert serial == expected
+    assert by_magic == expected
+    assert parallel == expected
+
+# --- Test 2: Compressed reports decompress to the plain reports (normal and streaming runs) ---
+@pytest.mark.parametrize("streaming", [False, True])
+def test_compressed_reports_match_plain(tmp_path, pipeline_config, streaming):
+    # 1. Arrange
+    plain = tmp_path / 'input.csv'
+    datagen.write_csv(str(plain), 3000, quiz_count=4, missing_rate=0.02, sections=4, seed=9)
+    packed = tmp_path / 'input.csv.gz'
+    packed.write_bytes(gzip.compress(plain.read_bytes()))
+    configs = [
+        pipeline_config('plain', plain, quiz_count=4),
+        pipeline_config('gzip', packed, quiz_count=4),
+        pipeline_config('xz', packed, quiz_count=4),
+    ]
+    configs[1]['reports']['compression'] = 'gzip'
+    configs[2]['reports']['compression'] = 'xz'
+    for config in configs:
+        config['ingest']['streaming'] = streaming
+        config['ingest']['batch_size'] = 500  # several appended streams per report
+
+    # 2. Act
+    for config in configs:
+        run_full_pipeline(config)
+
+    # 3. Assert
+    plain_files = decompressed_files(tmp_path / 'plain')
+    assert all(name.endswith('.csv.gz') for name in os.listdir(tmp_path / 'gzip'))
+    assert all(name.endswith('.csv.xz') for name in os.listdir(tmp_path / 'xz'))
+    assert decompressed_files(tmp_path / 'gzip') == plain_files
+    assert decompressed_files(tmp_path / 'xz') == plain_files
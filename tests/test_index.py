@@ -0,0 +1,61 @@
+import pytest
+from src.index import StudentIndex
+from src.table import StudentTable
+
+def _sample_rows():
+    return [
+        {'student_id': 10, 'section': 'S01', 'final_grade': 72.5},
+        {'student_id': 11, 'section': 'S02', 'final_grade': 58.0},
+        {'student_id': 12, 'section': 'S01', 'final_grade': 64.0},
+        {'student_id': 13, 'section': 'S02', 'final_grade': 91.0},
+    ]
+
+# --- Test 1: Lookups by id, section and grade range ---
+def test_index_queries():
+    # 1. Arrange
+    for data in (_sample_rows(), StudentTable.from_rows(_sample_rows(), 0)):
+        # 2. Act
+        index = StudentIndex(data)
+
+        # 3. Assert
+        assert index.get(12)['final_grade'] == 64.0
+        assert index.get(99) is None
+        assert [row['student_id'] for row in index.in_section('S01')] == [10, 12]
+        assert [row['student_id'] for row in index.grade_range(60, 73)] == [12, 10]
+
+# --- Test 2: Patching and automatic rebuilds keep the index correct ---
+def test_index_updates():
+    # 1. Arrange
+    rows = _sample_rows()
+    index = StudentIndex(rows)
+
+    # 2. Act: one patched update, one change the index only sees via its length
+    index.update_student(11, {'final_grade': 66.0, 'section': 'S01'})
+    rows.append({'student_id': 14, 'section': 'S03', 'final_grade': 61.0})
+
+    # 3. Assert
+    assert [row['student_id'] for row in index.grade_range(60, 70)] == [14, 12, 11]
+    assert [row['student_id'] for row in index.in_section('S01')] == [10, 11, 12]
+    assert index.in_section('S02') == [rows[3]]
+    assert index.get(14)['section'] == 'S03'
+
+# --- Test 3: In-place edits need touch(); a changed duplicate id falls back to the next row ---
+def test_index_touch_and_duplicate_ids():
+    # 1. Arrange
+    rows = _sample_rows() + [{'student_id': 10, 'section': 'S03', 'final_grade': 80.0}]
+    index = StudentIndex(rows)
+
+    # 2. Act
+    rows[1]['final_grade'] = 99.0  # edited outside the index...
+    index.touch()                   # ...and reported
+    index.update_student(10, {'student_id': 20})
+
+    # 3. Assert
+    assert [row['student_id'] for row in index.grade_range(95, 100)] == [11]
+    assert index.get(10) == rows[4]  # the remaining row with id 10
+    assert index.get(20) == rows[0]
+    with pytest.raises(TypeError):
+        index.get(20)['final_grade'] = 0.0  # query results are read-only
+    rebuilt = StudentIndex(rows)
+    assert (rebuilt.by_id, rebuilt.by_section) == (index.by_id, index.by_section)
+    assert rebuilt.grade_range(0, 100) == index.grade_range(0, 100)
@@ -0,0 +1,60 @@
+from src.ingest import read_and_validate_csv, iter_validated_batches
+from src.main import run_full_pipeline
+
+CSV_TEXT = (
+    "student_id,last_name,first_name,section,quiz1,quiz2,midterm,final,attendance_percent\n"
+    "1,Eman,Nuel,S01,88,92,85,91,95\n"
+    "2,Jara,Amor,S02, 95, 90, 92, 96, 88\n"
+    "3,Gen,Hugo,S01,75,,80,85,92\n"
+    "4,Dew,Arpa,S02,105,99,95,94,100\n"
+    "x,Bad,Id,S01,1,2,3,4,5\n"
+)
+
+# --- Test 1: Streaming batches give the same result as the full read ---
+def test_batches_match_full_read(tmp_path):
+    # 1. Arrange
+    csv_path = tmp_path / "input.csv"
+    csv_path.write_text(CSV_TEXT, encoding='utf-8')
+
+    # 2. Act
+    clean, bad = read_and_validate_csv(str(csv_path), 2)
+    batches = list(iter_validated_batches(str(csv_path), 2, batch_size=2))
+
+    # 3. Assert
+    assert [len(c) + len(b) for c, b in batches] == [2, 2, 1]
+    assert [row for c, _ in batches for row in c] == clean
+    # Row numbers keep counting across batch boundaries
+    assert [b for _, bad_batch in batches for b in bad_batch] == bad
+    assert [row_num for row_num, _, _ in bad] == [5, 6]
+
+# --- Test 2: Parallel ingest gives exactly the serial output ---
+def test_parallel_matches_serial(tmp_path, monkeypatch):
+    # 1. Arrange: a file big enough for several shards
+    import src.ingest as ingest
+    monkeypatch.setattr(ingest, 'MIN_SHARD_BYTES', 64)
+    header, *rows = CSV_TEXT.splitlines(keepends=True)
+    csv_path = tmp_path / "input.csv"
+    csv_path.write_text(header + ''.join(rows * 20), encoding='utf-8')
+
+    # 2. Act
+    serial = read_and_validate_csv(str(csv_path), 2)
+    parallel = read_and_validate_csv(str(csv_path), 2, workers=2)
+
+    # 3. Assert
+    assert len(ingest._plan_shards(str(csv_path), 8)[1]) > 1
+    assert parallel == serial
+
+# --- Test 3: Streaming runs keep no rows unless keep_records is switched on ---
+def test_streaming_keep_records(tmp_path, pipeline_config):
+    # 1. Arrange
+    configs = [pipeline_config(name) for name in ('default', 'kept')]
+    for config in configs:
+        config['ingest']['streaming'] = True
+    configs[1]['ingest']['keep_records'] = True
+
+    # 2. Act
+    dropped, kept = (run_full_pipeline(config) for config in configs)
+
+    # 3. Assert
+    assert list(dropped) == []
+    assert len(kept) == len(run_full_pipeline(pipeline_config('full'))) == 5
@@ -0,0 +1,120 @@
+import csv
+import json
+import random
+import pytest
+from benchmarks import datagen
+from src import cli
+from src.ingest import read_and_validate_csv
+from src.join import join_sources
+from src.main import run_full_pipeline
+
+ROSTER = "student_id,last_name,first_name,section\n3,Gen,Hugo,S01\n1,Eman,Nuel,S01\n2,Jara,Amor,S02\n2,Jara,Again,S02\n"
+SCORES = "student_id,quiz1,quiz2,midterm,final\n1,88,92,85,91\n3,75,,80,85\n9,1,2,3,4\n,5,5,5,5\n"
+ATTENDANCE = "attendance_percent,student_id\n95,001\n88,2\n"
+
+def write_sources(tmp_path, **files):
+    paths = []
+    for name, text in files.items():
+        path = tmp_path / f"{name}.csv"
+        path.write_text(text, encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+def split_wide_csv(tmp_path, wide_path, seed=1):
+    """The wide file as three shuffled exports: roster, scores, attendance."""
+    with open(wide_path, newline='', encoding='utf-8') as f:
+        header, *rows = list(csv.reader(f))
+    random.Random(seed).shuffle(rows)
+    id_pos = header.index('student_id')
+    groups = {
+        'roster': ['last_name', 'first_name', 'section'],
+        'scores': [name for name in header if name.startswith('quiz') or name in ('midterm', 'final')],
+        'attendance': ['attendance_percent'],
+    }
+    paths = []
+    for name, columns in groups.items():
+        positions = [header.index(column) for column in columns]
+        path = tmp_path / f"{name}.csv"
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['student_id'] + columns)
+            writer.writerows([row[id_pos]] + [row[p] for p in positions] for row in rows)
+        paths.append(str(path))
+    return paths
+
+# --- Test 1: Joined rows, plus duplicates, orphans, missing and blank ids in the report ---
+def test_join_reports_problems(tmp_path):
+    # 1. Arrange
+    paths = write_sources(tmp_path, roster=ROSTER, scores=SCORES, attendance=ATTENDANCE)
+    output = tmp_path / 'joined.csv'
+
+    # 2. Act
+    report = join_sources(paths, str(output))
+    clean, bad = read_and_validate_csv(str(output), 2)
+
+    # 3. Assert
+    assert output.read_text(encoding='utf-8').splitlines() == [
+        "student_id,last_name,first_name,section,quiz1,quiz2,midterm,final,attendance_percent",
+        "1,Eman,Nuel,S01,88,92,85,91,95",
+        "2,Jara,Amor,S02,,,,,88",
+        "3,Gen,Hugo,S01,75,,80,85,",
+    ]
+    roster, scores, attendance = report['sources']
+    assert report['rows'] == 3
+    assert (roster['duplicates'], roster['samples']['duplicates']) == (1, ['2'])
+    assert (scores['orphans'], scores['samples']['orphans']) == (1, ['9'])
+    assert (scores['missing'], scores['blank_ids']) == (1, 1)
+    assert (attendance['missing'], attendance['samples']['missing']) == (1, ['3'])
+    assert [row['student_id'] for row in clean] == [1, 2, 3] and bad == []
+
+# --- Test 2: External sort (spilled runs) and presorted merge give the in-memory join ---
+def test_external_sort_and_presorted_match(tmp_path):
+    # 1. Arrange
+    wide = tmp_path / 'wide.csv'
+    datagen.write_csv(str(wide), 3000, quiz_count=3, missing_rate=0.05, bad_rate=0.02, seed=4)
+    paths = split_wide_csv(tmp_path, wide)
+    sorted_dir = tmp_path / 'sorted'
+    sorted_dir.mkdir()
+    join_sources(paths, str(tmp_path / 'in_memory.csv'))
+
+    # 2. Act
+    report = join_sources(paths, str(tmp_path / 'spilled.csv'), memory_rows=250, temp_dir=str(tmp_path))
+    sorted_paths = []
+    for path in paths:  # each source joined with itself alone comes out sorted
+        sorted_paths.append(str(sorted_dir / path.rsplit('/', 1)[1]))
+        join_sources([path], sorted_paths[-1])
+    presorted = join_sources(sorted_paths, str(tmp_path / 'presorted.csv'), presorted=True)
+
+    # 3. Assert
+    expected = (tmp_path / 'in_memory.csv').read_bytes()
+    assert (tmp_path / 'spilled.csv').read_bytes() == expected
+    assert (tmp_path / 'presorted.csv').read_bytes() == expected
+    assert report['rows'] == presorted['rows'] == 3000
+    assert not any(p.name.startswith('join-') for p in tmp_path.iterdir())  # spilled runs removed
+    # The same students come out of ingest as from the original wide file
+    joined = read_and_validate_csv(str(tmp_path / 'spilled.csv'), 3)[0]
+    original = read_and_validate_csv(str(wide), 3)[0]
+    assert sorted(joined, key=lambda row: row['student_id']) == sorted(original, key=lambda row: row['student_id'])
+    with pytest.raises(ValueError):
+        join_sources(paths, str(tmp_path / 'unsorted.csv'), presorted=True)
+
+# --- Test 3: The pipeline joins config sources first; the join subcommand does it alone ---
+def test_pipeline_and_cli_join(tmp_path, pipeline_config, capsys):
+    # 1. Arrange
+    paths = write_sources(tmp_path, roster=ROSTER, scores=SCORES, attendance=ATTENDANCE)
+    config = pipeline_config('out', tmp_path / 'input.csv', sources={'files': paths}, quiz_count=2)
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config))
+
+    # 2. Act
+    records = run_full_pipeline(config)
+    output = capsys.readouterr().out
+    code = cli.main(['--config', str(config_path), 'join', '--output', str(tmp_path / 'cli.csv')])
+    missing_code = cli.main(['--config', str(config_path), 'join', str(tmp_path / 'nope.csv')])
+
+    # 3. Assert
+    assert [row['student_id'] for row in records] == [1, 2, 3]
+    assert "Joined 3 sources: 3 students" in output
+    assert code == cli.EXIT_OK
+    assert (tmp_path / 'cli.csv').read_bytes() == (tmp_path / 'input.csv').read_bytes()
+    assert missing_code == cli.EXIT_NOT_FOUND
@@ -0,0 +1,60 @@
+import json
+import tracemalloc
+import pytest
+from src import metrics
+from src.main import run_full_pipeline
+from src.progress import PipelineProgress, PipelineCancelled
+
+# --- Test 1: One record per stage, to the callback and the JSON lines file ---
+def test_run_full_pipeline_emits_stage_metrics(tmp_path, pipeline_config):
+    # 1. Arrange
+    path = tmp_path / 'metrics.jsonl'
+    config = pipeline_config(metrics={'enabled': True, 'path': str(path), 'trace_memory': True})
+    received = []
+
+    # 2. Act
+    records = run_full_pipeline(config, metrics_callback=received.append)
+
+    # 3. Assert
+    assert [r['stage'] for r in received] == ['ingest', 'transform', 'analysis', 'reports', 'pipeline']
+    by_stage = {r['stage']: r for r in received}
+    assert by_stage['ingest']['rows_in'] == 6 and by_stage['ingest']['rows_out'] == len(records) == 5
+    assert by_stage['analysis']['rows_out'] == 1  # one at-risk student
+    assert all(r['ok'] and r['seconds'] >= 0 and r['peak_bytes'] > 0 for r in received)
+    assert len({r['run_id'] for r in received}) == 1
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == received
+
+# --- Test 2: Disabled instrumentation is a shared no-op ---
+def test_disabled_metrics_record_nothing(pipeline_config):
+    # 1. Arrange
+    disabled = metrics.open_metrics(pipeline_config())
+
+    # 2. Act
+    with disabled.stage('ingest', rows_in=10) as stage:
+        stage.rows_out = 10
+    disabled.finish(rows_out=10)
+
+    # 3. Assert
+    assert disabled is metrics.DISABLED
+    assert disabled.stage('transform') is disabled.stage('reports')
+    assert disabled.records == []
+
+# --- Test 3: A cancelled traced run still stops tracemalloc and reports ok=False ---
+def test_cancelled_run_stops_tracing(tmp_path, pipeline_config):
+    # 1. Arrange
+    config = pipeline_config(metrics={'enabled': True, 'path': str(tmp_path / 'metrics.jsonl'), 'trace_memory': True})
+    progress = PipelineProgress()
+    received = []
+    # cancel as soon as the first stage record is emitted
+    def cancel_after_first_stage(record):
+        received.append(record)
+        progress.cancel()
+
+    # 2. Act
+    with pytest.raises(PipelineCancelled):
+        run_full_pipeline(config, metrics_callback=cancel_after_first_stage, progress=progress)
+
+    # 3. Assert
+    assert not tracemalloc.is_tracing()
+    assert [(r['stage'], r['ok']) for r in received] == [('ingest', True), ('pipeline', False)]
@@ -0,0 +1,92 @@
+import csv
+import gzip
+from benchmarks import datagen
+from src.ingest import read_and_validate_csv
+from src.main import run_full_pipeline
+from src.quarantine import Quarantine
+
+CSV_TEXT = (
+    "student_id,last_name,first_name,section,quiz1,quiz2,midterm,final,attendance_percent\n"
+    "1,Eman,Nuel,S01,88,92,85,91,95\n"
+    ",No,Id,S01,80,80,80,80,80\n"
+    "x,Bad,Id,S01,1,2,3,4,5\n"
+    "4,Dew,Arpa,S02,105,99,95,94,100\n"
+    "5,Ten,Ten,S02,70,abc,95,94,100\n"
+    "6,Short,Row,S01,70\n"
+    "7,Dew,Arpa,S02,100,99,95,94,101\n"
+    "8,Dew,Arpa,S02,100,99,95,94,nan\n"
+    "9223372036854775807,Max,Id,S01,1,2,3,4,5\n"
+    "9223372036854775808,Big,Id,S01,1,2,3,4,5\n"
+)
+
+def quarantine_config(tmp_path, pipeline_config, name, streaming=False):
+    quarantine = {'enabled': True, 'path': str(tmp_path / f'{name}-quarantine.csv'), 'sample_limit': 2}
+    config = pipeline_config(name, tmp_path / 'input.csv', quiz_count=4, quarantine=quarantine)
+    config['ingest']['streaming'] = streaming
+    config['ingest']['batch_size'] = 100
+    return config
+
+# --- Test 1: Every kind of bad row gets its own code (and column) ---
+def test_error_codes(tmp_path):
+    # 1. Arrange
+    csv_path = tmp_path / "input.csv"
+    csv_path.write_text(CSV_TEXT, encoding='utf-8')
+
+    # 2. Act
+    clean, bad = read_and_validate_csv(str(csv_path), 2)
+
+    # 3. Assert
+    assert [row['student_id'] for row in clean] == [1, 2 ** 63 - 1]  # the largest int64 id
+    assert [(row_num, error) for row_num, error, _ in bad] == [
+        (3, 'missing_id'),
+        (4, 'non_numeric:student_id'),
+        (5, 'out_of_range:quiz1'),
+        (6, 'non_numeric:quiz2'),
+        (7, 'short_row'),
+        (8, 'out_of_range:attendance_percent'),
+        (9, 'out_of_range:attendance_percent'),
+        (11, 'out_of_range:student_id'),  # would overflow the int64 id column
+    ]
+
+# --- Test 2: Bad rows stream to the file; memory keeps counts and capped samples ---
+def test_quarantine_streams_and_caps_samples(tmp_path):
+    # 1. Arrange
+    csv_path = tmp_path / "input.csv"
+    csv_path.write_text(CSV_TEXT, encoding='utf-8')
+    header = CSV_TEXT.splitlines()[0].split(',')
+    _, bad = read_and_validate_csv(str(csv_path), 2)
+    path = tmp_path / 'quarantine.csv.gz'
+
+    # 2. Act
+    with Quarantine(str(path), header, sample_limit=1) as quarantine:
+        clean, returned_bad = read_and_validate_csv(str(csv_path), 2, on_bad=quarantine.add)
+    rows = list(csv.reader(gzip.decompress(path.read_bytes()).decode('utf-8').splitlines()))
+
+    # 3. Assert
+    assert returned_bad == []  # handed to the quarantine instead
+    assert quarantine.total == 8
+    assert quarantine.counts['out_of_range:attendance_percent'] == 2
+    assert quarantine.samples['out_of_range:attendance_percent'] == [(8, bad[5][2])]
+    assert rows[0] == ['row_num', 'error_code', 'column'] + header
+    assert rows[3] == ['5', 'out_of_range', 'quiz1', '4', 'Dew', 'Arpa', 'S02', '105', '99', '95', '94', '100']
+    assert rows[5] == ['7', 'short_row', '', '6', 'Short', 'Row', 'S01', '70', '', '', '', '']
+    assert [int(row[0]) for row in rows[1:]] == [row_num for row_num, _, _ in bad]
+
+# --- Test 3: Normal and streaming runs quarantine the same rows and print per-code counts ---
+def test_pipeline_quarantine(tmp_path, pipeline_config, capsys):
+    # 1. Arrange
+    csv_path = tmp_path / 'input.csv'
+    datagen.write_csv(str(csv_path), 1000, quiz_count=4, bad_rate=0.05, seed=3)
+    _, bad = read_and_validate_csv(str(csv_path), 4)
+
+    # 2. Act
+    run_full_pipeline(quarantine_config(tmp_path, pipeline_config, 'normal'))
+    output = capsys.readouterr().out
+    run_full_pipeline(quarantine_config(tmp_path, pipeline_config, 'streaming', streaming=True))
+
+    # 3. Assert
+    normal = (tmp_path / 'normal-quarantine.csv').read_text(encoding='utf-8')
+    assert (tmp_path / 'streaming-quarantine.csv').read_text(encoding='utf-8') == normal
+    assert bad and len(normal.splitlines()) == len(bad) + 1
+    assert f"Skipped: {len(bad)} (quarantined to" in output
+    assert "Bad row log" not in output
@@ -0,0 +1,112 @@
+import bisect
+import random
+import src.ranking as ranking
+from src.analyze import calculate_statistics, find_percentiles
+from src.index import StudentIndex
+from src.main import correct_final_grade, show_statistics
+from src.ranking import RankedColumn
+from src.table import StudentTable
+
+def make_records(n, seed=1):
+    rng = random.Random(seed)
+    return [{'student_id': i, 'section': 'S01', 'final_grade': round(rng.uniform(40, 100), 2)}
+            for i in range(1, n + 1)]
+
+# --- Test 1: Random adds/removes keep every answer equal to a fresh sort ---
+def test_ranked_column_matches_sorted_list(monkeypatch):
+    # 1. Arrange: tiny buckets, so splits and emptied buckets happen often
+    monkeypatch.setattr(ranking, 'BUCKET_LOAD', 4)
+    rng = random.Random(7)
+    values = [round(rng.uniform(0, 100), 2) for _ in range(40)]
+    column = RankedColumn(values)
+
+    # 2. Act + 3. Assert after every step
+    for _ in range(2000):
+        if values and rng.random() < 0.5:
+            value = rng.choice(values)
+            values.remove(value)
+            assert column.remove(value)
+        else:
+            value = rng.choice([round(rng.uniform(0, 100), 2), rng.uniform(0, 100), 50.0])
+            values.append(value)
+            column.add(value)
+        expected = sorted(values)
+        assert list(column) == expected
+        assert column.summary() == calculate_statistics([{'g': v} for v in values], 'g')
+        if expected:
+            k = rng.randrange(len(expected))
+            assert column[k] == expected[k]
+            assert column.count_below(expected[k]) == bisect.bisect_left(expected, expected[k])
+            assert column.count_above(expected[k]) == len(expected) - bisect.bisect_right(expected, expected[k])
+            assert column.largest(3) == expected[::-1][:3]
+            assert column.items(k, k + 5) == expected[k:k + 5]
+    assert not column.remove(-1.0)
+
+# --- Test 2: The mean rounds like calculate_statistics even on a .xx5 boundary ---
+def test_mean_on_rounding_boundary():
+    # 1. Arrange: the exact mean is 57.185; the sorted float sum decides which way it rounds
+    rows = [{'final_grade': 57.18}, {'final_grade': 57.19}]
+    rng = random.Random(3)
+    small_sets = [[round(rng.uniform(0, 100), 2) for _ in range(rng.randrange(1, 5))] for _ in range(3000)]
+
+    # 2. Act
+    summary = RankedColumn([57.18, 57.19]).summary()
+
+    # 3. Assert
+    assert summary == calculate_statistics(rows, 'final_grade')
+    for values in small_sets:
+        assert RankedColumn(values).summary() == calculate_statistics([{'g': v} for v in values], 'g')
+
+# --- Test 3: Ranks, top/bottom k and statistics follow StudentIndex.update_student ---
+def test_index_ranking_updates():
+    # 1. Arrange: student 7 appears twice, and both rows count, as in calculate_statistics
+    records = make_records(500) + [{'student_id': 7, 'section': 'S02', 'final_grade': 12.5}]
+    index = StudentIndex(StudentTable.from_rows(records, 0))
+
+    # 2. Act: correct some grades, drop one, add a new student
+    rng = random.Random(11)
+    for student_id in rng.sample(range(1, 501), 50):
+        records[student_id - 1]['final_grade'] = round(rng.uniform(40, 100), 2)
+        assert index.update_student(student_id, {'final_grade': records[student_id - 1]['final_grade']})
+    records[9]['final_grade'] = None
+    index.update_student(10, {'final_grade': None})
+    records.append({'student_id': 999, 'section': 'S02', 'final_grade': 100.0})
+    index.add_student(records[-1])
+
+    # 3. Assert
+    graded = [row for row in records if row['final_grade'] is not None]
+    by_grade = sorted(enumerate(graded), key=lambda item: (-item[1]['final_grade'], -item[0]))
+    assert len(index.by_grade) == 501
+    assert index.statistics() == calculate_statistics(records, 'final_grade')
+    assert index.percentiles([10, 50, 90]) == find_percentiles(records, 'final_grade', [10, 50, 90])
+    assert [row['student_id'] for row in index.top(3)] == [row['student_id'] for _, row in by_grade[:3]]
+    assert [row['student_id'] for row in index.bottom(1)] == [7]  # the duplicate row's 12.5
+    assert index.rank(999) == 1
+    assert index.rank(10) is None
+    student = graded[123]
+    assert index.rank(student['student_id']) == 1 + sum(row['final_grade'] > student['final_grade'] for row in graded)
+
+# --- Test 4: Menu option [7] corrects one grade and reads back the new rank ---
+def test_menu_grade_correction(monkeypatch, capsys):
+    # 1. Arrange
+    records = [dict(row, first_name='A', last_name='B', letter_grade='F', attendance_percent=90.0)
+               for row in make_records(20)]
+    index = StudentIndex(records)
+    answers = iter(['5', '101'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    config = {'grade_cutoffs': {'A': 90, 'B': 80, 'C': 70, 'D': 60}}
+
+    # 2. Act
+    correct_final_grade(index, config)
+    output = capsys.readouterr().out
+    show_statistics(records, index)  # [2] answers from the index, no re-sort
+    from_index = capsys.readouterr().out
+    show_statistics(records)
+    from_sort = capsys.readouterr().out
+
+    # 3. Assert
+    assert (records[4]['final_grade'], records[4]['letter_grade']) == (101.0, 'A')
+    assert "Student 5: 101.0 (A), rank 1 of 20" in output
+    assert "Max:    101.0" in output
+    assert index.statistics() == calculate_statistics(records, 'final_grade')
+    assert from_index == from_sort
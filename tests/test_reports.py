@@ -0,0 +1,86 @@
+import os
+from src import reports
+from src.table import StudentTable
+
+def make_rows():
+    rows = []
+    for i in range(30):
+        rows.append({
+            'student_id': i + 1, 'last_name': f'Last{i}', 'first_name': f'First, {i}',
+            'section': f'S{i % 7}', 'quiz1': None if i % 5 == 0 else 80.0 + i,
+            'final_grade': 60.0 + i, 'letter_grade': 'D' if i < 10 else 'C',
+            'attendance_percent': 75.0 + i % 10,
+        })
+    return rows
+
+def read_dir(path):
+    return {name: (path / name).read_bytes() for name in sorted(os.listdir(path))}
+
+# --- Test 1: The parallel engine writes exactly what the old exporters wrote ---
+def test_write_reports_matches_sequential_exports(tmp_path):
+    # 1. Arrange
+    rows = make_rows()
+    at_risk = [row for row in rows if row['final_grade'] < 65]
+    table = StudentTable.from_rows(rows, 1)
+    for name in ('old', 'threads', 'old_table', 'table'):
+        (tmp_path / name).mkdir()
+
+    # 2. Act
+    reports.export_at_risk_csv(at_risk, str(tmp_path / 'old'))
+    reports.export_section_reports(rows, str(tmp_path / 'old'))
+    summary = reports.write_reports(rows, at_risk, str(tmp_path / 'threads'), workers=4)
+    reports.export_at_risk_csv(StudentTable.from_rows(at_risk, 1), str(tmp_path / 'old_table'))
+    reports.export_section_reports(table, str(tmp_path / 'old_table'))
+    reports.write_reports(table, StudentTable.from_rows(at_risk, 1), str(tmp_path / 'table'), workers=1)
+
+    # 3. Assert: same bytes, no temp files left, summary counts them
+    expected = read_dir(tmp_path / 'old')
+    assert read_dir(tmp_path / 'threads') == expected
+    assert read_dir(tmp_path / 'table') == read_dir(tmp_path / 'old_table')
+    assert summary['ok']
+    assert sorted(summary['files']) == sorted(expected)
+    assert summary['bytes'] == sum(len(content) for content in expected.values())
+
+# --- Test 2: The grouping is computed once and can be reused ---
+def test_group_by_section_keeps_file_order():
+    # 1. Arrange
+    rows = make_rows()
+
+    # 2. Act
+    sections = reports.group_by_section(rows)
+
+    # 3. Assert
+    assert list(sections) == [f'S{i}' for i in range(7)]
+    assert sections['S0'] == [0, 7, 14, 21, 28]
+    assert reports.group_by_section(StudentTable.from_rows(rows, 1)) == sections
+
+# --- Test 3: Grouped statistics export, one line per (section, field) ---
+def test_export_grouped_statistics(tmp_path):
+    # 1. Arrange
+    grouped = {'S1': {'final_grade': {'count': 2, 'mean': 70.0, 'median': 70.0,
+                                      'min': 60.0, 'max': 80.0, 'p90': 80.0}}}
+
+    # 2. Act
+    file_name = reports.export_grouped_statistics(grouped, str(tmp_path))
+
+    # 3. Assert
+    assert file_name == 'section_statistics.csv'
+    assert (tmp_path / file_name).read_text().splitlines() == [
+        'section,field,count,mean,median,min,max,p90',
+        'S1,final_grade,2,70.0,70.0,60.0,80.0,80.0',
+    ]
+
+# --- Test 4: A failed write leaves no temp file behind ---
+def test_failed_report_write_cleans_up(tmp_path, monkeypatch):
+    # 1. Arrange: every rename fails, as on a full or read-only disk
+    rows = make_rows()
+    def failing_replace(source, target):
+        raise OSError("disk full")
+    monkeypatch.setattr(reports.os, 'replace', failing_replace)
+
+    # 2. Act
+    summary = reports.write_reports(rows, rows[:3], str(tmp_path), workers=4)
+
+    # 3. Assert
+    assert not summary['ok']
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,72 @@
+import copy
+from collections import Counter
+import pytest
+from benchmarks import datagen
+from src import analyze, transform
+from src.ingest import read_and_validate_csv
+from src.scenarios import build_scenarios, run_scenarios
+
+CONFIG = {
+    "weights": {"quizzes": 0.30, "midterm": 0.30, "final": 0.30, "attendance": 0.10},
+    "curve_settings": {"apply_curve": True, "target_max_grade": 100, "curve_cap": 100},
+    "grade_cutoffs": {"A": 90, "B": 80, "C": 70, "D": 60},
+    "thresholds": {"at_risk_grade": 65, "at_risk_attendance": 80},
+}
+GRID = {
+    "weights": [{"quizzes": 0.2, "final": 0.4}],
+    "curve_settings": [{"apply_curve": False}, {"target_max_grade": 95, "curve_cap": 98}],
+    "grade_cutoffs": [{"A": 93, "B": 85}],
+    "thresholds": [{"at_risk_grade": 75}],
+}
+
+def full_run(records, scenario, quiz_count):
+    """What the pipeline's transform + analysis stages give for one scenario."""
+    records = copy.deepcopy(records)
+    transform.compute_weighted_grade(records, scenario['weights'], quiz_count)
+    if scenario['curve_settings'].get('apply_curve', False):
+        transform.apply_grade_curve(records, scenario['curve_settings'])
+    transform.assign_letter_grade(records, scenario['grade_cutoffs'])
+    at_risk, _ = analyze.find_at_risk_students(
+        records, scenario['thresholds']['at_risk_grade'], scenario['thresholds']['at_risk_attendance']
+    )
+    return records, at_risk
+
+# --- Test 1: Every scenario matches a full transform run with that config ---
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_scenarios_match_full_runs(tmp_path, backend):
+    # 1. Arrange
+    if backend == "numpy" and transform.transform_numpy is None:
+        pytest.skip("NumPy is not installed")
+    previous = transform.BACKEND
+    transform.set_backend(backend)
+    csv_path = str(tmp_path / 'input.csv')
+    datagen.write_csv(csv_path, 3000, quiz_count=4, missing_rate=0.05, sections=6, seed=3)
+    records, _ = read_and_validate_csv(csv_path, 4)
+    scenarios = build_scenarios(CONFIG, GRID)
+
+    # 2. Act
+    try:
+        rows = run_scenarios(records, scenarios, 4, workers=3)
+        expected = [full_run(records, scenario, 4) for scenario in scenarios]
+    finally:
+        transform.set_backend(previous)
+
+    # 3. Assert
+    assert len(rows) == 2 * 3 * 2 * 2
+    assert rows[0]['scenario'] == 'current config'
+    baseline_letters = [row['letter_grade'] for row in expected[0][0]]
+    for row, (graded, at_risk) in zip(rows, expected):
+        letters = [student['letter_grade'] for student in graded]
+        assert row['letters'] == Counter(letters)
+        assert row['at_risk'] == len(at_risk)
+        assert row['mean'] == analyze.calculate_statistics(graded, 'final_grade')['mean']
+        assert row['letters_changed'] == sum(a != b for a, b in zip(letters, baseline_letters))
+
+# --- Test 2: A grid can only vary the grading sections ---
+def test_build_scenarios_rejects_other_sections():
+    # 1. Arrange
+    grid = {"paths": [{"input_csv": "other.csv"}]}
+
+    # 2. Act / 3. Assert
+    with pytest.raises(ValueError):
+        build_scenarios(CONFIG, grid)
@@ -0,0 +1,74 @@
+import pytest
+from src.cache import stage_key
+from src.snapshot import Snapshot, SnapshotError, load_snapshot, write_snapshot
+from src.table import StudentTable
+
+QUIZ_COUNT = 2
+
+def make_table():
+    rows = [
+        {'student_id': 1, 'last_name': 'Cruz', 'first_name': 'Ana', 'section': 'A',
+         'quiz1': 90.0, 'quiz2': None, 'midterm': 80.0, 'final': 85.5, 'attendance_percent': 95.0},
+        {'student_id': 2, 'last_name': 'Reyes', 'first_name': 'Ñino', 'section': 'B',
+         'quiz1': None, 'quiz2': 70.0, 'midterm': 60.0, 'final': None, 'attendance_percent': 70.0},
+        {'student_id': 3, 'last_name': 'Santos', 'first_name': 'Ben', 'section': 'A',
+         'quiz1': 75.0, 'quiz2': 65.0, 'midterm': 55.0, 'final': 60.0, 'attendance_percent': 88.0},
+    ]
+    return rows, StudentTable.from_rows(rows, QUIZ_COUNT)
+
+# --- Test 1: Write, reopen with zero-copy views, and round-trip the records ---
+def test_snapshot_round_trip(tmp_path):
+    # 1. Arrange
+    rows, table = make_table()
+    path = str(tmp_path / "records.snapshot")
+    key = stage_key('ingest', 'input-digest', QUIZ_COUNT)
+
+    # 2. Act
+    write_snapshot(table, path, key)
+    loaded = load_snapshot(path, key)
+
+    # 3. Assert: same rows, missing scores still None
+    assert loaded.to_rows() == rows
+    with Snapshot(path) as snapshot:
+        assert snapshot.row_count == 3
+        assert list(snapshot.column('student_id')) == [1, 2, 3]
+        assert list(snapshot.column('final')) == [85.5, 0.0, 60.0]
+        assert list(snapshot.missing_mask('final')) == [0, 1, 0]
+        assert snapshot.text('section') == ['A', 'B', 'A']
+
+# --- Test 2: Stale, corrupt and unknown files are rejected ---
+def test_snapshot_detects_stale_and_corrupt_files(tmp_path):
+    # 1. Arrange
+    _, table = make_table()
+    path = tmp_path / "records.snapshot"
+    key = stage_key('ingest', 'input-digest', QUIZ_COUNT)
+    write_snapshot(table, str(path), key)
+
+    # 2. Act / 3. Assert: built from a different input
+    with pytest.raises(SnapshotError, match="stale"):
+        load_snapshot(str(path), stage_key('ingest', 'changed-digest', QUIZ_COUNT))
+
+    # One flipped byte in the data, or in the column directory, fails the checksum
+    original = path.read_bytes()
+    data = bytearray(original)
+    data[-20] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="checksum"):
+        load_snapshot(str(path), key)
+    data = bytearray(original)
+    data[original.index(b'"name"') + 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="checksum"):
+        load_snapshot(str(path), key)
+    with pytest.raises(SnapshotError, match="corrupt column directory"):
+        load_snapshot(str(path), key, verify=False)
+    # ...and so does a damaged row count in the header
+    data = bytearray(original)
+    data[16] ^= 0x01
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="checksum"):
+        load_snapshot(str(path), key)
+
+    path.write_bytes(b'not a snapshot at all, just some text padding it out' * 2)
+    with pytest.raises(SnapshotError, match="not a snapshot"):
+        load_snapshot(str(path))
@@ -0,0 +1,95 @@
+import json
+import sqlite3
+from benchmarks import datagen
+from src import analyze, cli, main, transform
+from src.index import StudentIndex
+from src.ingest import read_and_validate_csv
+from src.store import StudentStore, load_store, open_store, write_store
+
+def graded_table(tmp_path, rows=3000):
+    csv_path = str(tmp_path / 'input.csv')
+    datagen.write_csv(csv_path, rows, quiz_count=4, missing_rate=0.1, sections=5, seed=21)
+    table, _ = read_and_validate_csv(csv_path, 4, as_table=True)
+    transform.compute_weighted_grade(table, {"quizzes": 0.3, "midterm": 0.3, "final": 0.3, "attendance": 0.1}, 4)
+    transform.assign_letter_grade(table, {"A": 90, "B": 80, "C": 70, "D": 60})
+    return table
+
+def write_config(tmp_path, pipeline_config):
+    config = pipeline_config(store={'enabled': True, 'path': str(tmp_path / 'students.db')})
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config))
+    return str(config_path), config
+
+# --- Test 1: The store holds exactly the records, and its queries match the Python versions ---
+def test_store_queries_match_python(tmp_path):
+    # 1. Arrange
+    table = graded_table(tmp_path)
+    records = table.to_rows()
+    path = str(tmp_path / 'students.db')
+
+    # 2. Act
+    rows_written = write_store(table, path, 'key')
+    with StudentStore(path) as store:
+        reloaded = store.to_table()
+        at_risk = store.at_risk(65, 80)
+        lookup = store.lookup([records[10]['student_id'], records[3]['student_id'], -1])
+        grade_stats = store.statistics('final_grade')
+        section_stats = store.section_statistics(['final_grade', 'attendance_percent'])
+        in_range = store.grade_range(70, 80)
+
+    # 3. Assert
+    assert rows_written == len(table)
+    assert reloaded.to_rows() == records
+    expected_at_risk, _ = analyze.find_at_risk_students(records, 65, 80)
+    assert at_risk == expected_at_risk
+    assert lookup == [row for row in records if row['student_id'] in (records[3]['student_id'], records[10]['student_id'])]
+    assert grade_stats == analyze.calculate_statistics(records, 'final_grade')
+    assert section_stats == analyze.grouped_statistics(records, by='section',
+                                                       fields=['final_grade', 'attendance_percent'])
+    assert in_range == StudentIndex(records).grade_range(70, 80)
+
+# --- Test 2: The queries are served by the indexes ---
+def test_queries_use_indexes(tmp_path):
+    # 1. Arrange
+    path = str(tmp_path / 'students.db')
+    write_store(graded_table(tmp_path, rows=500), path, 'key')
+    connection = sqlite3.connect(path)
+
+    # 2. Act
+    def plan(query, parameters=()):
+        return " ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + query, parameters))
+    lookup_plan = plan("SELECT * FROM students WHERE student_id = ?", (1,))
+    section_plan = plan("SELECT * FROM students WHERE section = ?", ('S1',))
+    at_risk_plan = plan("SELECT * FROM students WHERE final_grade < ? OR attendance_percent < ?", (65, 80))
+    connection.close()
+
+    # 3. Assert
+    assert "idx_student_id" in lookup_plan
+    assert "idx_section_grade" in section_plan
+    assert "idx_final_grade" in at_risk_plan and "idx_attendance" in at_risk_plan
+
+# --- Test 3: A run fills the store; the CLI answers from it and it goes stale with the config ---
+def test_cli_uses_store_until_config_changes(tmp_path, pipeline_config, capsys, monkeypatch):
+    # 1. Arrange
+    config_path, config = write_config(tmp_path, pipeline_config)
+    records = main.run_full_pipeline(config)
+    capsys.readouterr()
+
+    def no_pipeline(*args, **kwargs):
+        raise AssertionError("the pipeline should not run")
+    monkeypatch.setattr(main, 'run_full_pipeline', no_pipeline)
+
+    # 2. Act
+    lookup_code = cli.main(['--config', config_path, 'lookup', '3'])
+    at_risk_code = cli.main(['--config', config_path, 'at-risk'])
+    output = capsys.readouterr().out
+    stored = load_store(config)
+    config['weights']['final'] = 0.25
+    stale = open_store(config)
+
+    # 3. Assert
+    assert lookup_code == cli.EXIT_OK and at_risk_code == cli.EXIT_OK
+    assert "Hugo General" in output
+    assert "1 student(s) at risk" in output
+    assert stored.to_rows() == list(records)
+    assert stale is None
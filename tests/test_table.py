@@ -0,0 +1,53 @@
+from src.table import StudentTable
+from src.transform import compute_weighted_grade, apply_grade_curve, assign_letter_grade
+from src.analyze import calculate_statistics, find_at_risk_students
+
+def _sample_rows():
+    return [
+        {'student_id': 1, 'last_name': 'A', 'first_name': 'X', 'section': 'S01',
+         'quiz1': 100.0, 'quiz2': 100.0, 'midterm': 100.0, 'final': 100.0, 'attendance_percent': 100.0},
+        {'student_id': 2, 'last_name': 'B', 'first_name': 'Y', 'section': 'S02',
+         'quiz1': 50.0, 'quiz2': None, 'midterm': 70.0, 'final': None, 'attendance_percent': 60.0},
+        {'student_id': 3, 'last_name': 'C', 'first_name': 'Z', 'section': 'S01',
+         'quiz1': 81.5, 'quiz2': 77.25, 'midterm': 64.0, 'final': 88.0, 'attendance_percent': 93.0},
+    ]
+
+# --- Test 1: The dict-row view round-trips the original rows ---
+def test_table_round_trip():
+    # 1. Arrange
+    rows = _sample_rows()
+
+    # 2. Act
+    table = StudentTable.from_rows(rows, quiz_count=2)
+
+    # 3. Assert
+    assert len(table) == 3
+    assert table.to_rows() == rows
+    assert table[1]['quiz2'] is None
+    assert table.values('final') == [100.0, 88.0]
+    # Sections are interned, so equal sections share one string object
+    assert table.text['section'][0] is table.text['section'][2]
+
+# --- Test 2: Table and list-of-dicts give the same results ---
+def test_table_matches_dict_pipeline():
+    # 1. Arrange
+    weights = {"quizzes": 0.30, "midterm": 0.30, "final": 0.30, "attendance": 0.10}
+    curve = {"apply_curve": True, "target_max_grade": 100, "curve_cap": 100}
+    cutoffs = {"A": 90, "B": 80, "C": 70, "D": 60}
+    rows = _sample_rows()
+    rows[0]['final'] = 90.0  # so the curve actually moves grades
+    table = StudentTable.from_rows(rows, quiz_count=2)
+
+    # 2. Act
+    for data in (rows, table):
+        compute_weighted_grade(data, weights, 2)
+        apply_grade_curve(data, curve)
+        assign_letter_grade(data, cutoffs)
+
+    # 3. Assert
+    assert table.to_rows() == rows
+    assert calculate_statistics(table, 'final_grade') == calculate_statistics(rows, 'final_grade')
+    at_risk_rows, safe_rows = find_at_risk_students(rows, 65, 80)
+    at_risk_table, safe_table = find_at_risk_students(table, 65, 80)
+    assert at_risk_table.to_rows() == at_risk_rows
+    assert safe_table.to_rows() == safe_rows
@@ -0,0 +1,40 @@
+# The numpy transform backend must give exactly the rows the python backend gives
+import copy
+import random
+import pytest
+from src import transform
+from src.transform import compute_weighted_grade, apply_grade_curve, assign_letter_grade
+
+# --- Test 1: Both backends give exactly the same rows ---
+def test_backends_match_exactly():
+    pytest.importorskip('numpy')
+    # 1. Arrange: random scores with gaps, so rounding and the cap both get exercised
+    rng = random.Random(42)
+    fields = ['quiz1', 'quiz2', 'quiz3', 'midterm', 'final', 'attendance_percent']
+    rows = [
+        {name: (None if rng.random() < 0.1 else round(rng.uniform(0, 100), rng.choice([0, 1, 2])))
+         for name in fields}
+        for _ in range(2000)
+    ]
+    weights = {"quizzes": 0.25, "midterm": 0.35, "final": 0.3, "attendance": 0.1}
+    curve = {"apply_curve": True, "target_max_grade": 103, "curve_cap": 100}
+    cutoffs = {"A": 90, "B": 80, "C": 70, "D": 60}
+
+    # 2. Act
+    results = {}
+    previous = transform.BACKEND
+    try:
+        for name in ('python', 'numpy'):
+            transform.set_backend(name)
+            data = copy.deepcopy(rows)
+            compute_weighted_grade(data, weights, 3)
+            apply_grade_curve(data, curve)
+            assign_letter_grade(data, cutoffs)
+            results[name] = data
+    finally:
+        transform.set_backend(previous)
+
+    # 3. Assert: same values and same types (the capped grade stays the int cap)
+    assert results['numpy'] == results['python']
+    assert [type(r['final_grade']) for r in results['numpy']] == \
+           [type(r['final_grade']) for r in results['python']]
@@ -0,0 +1,111 @@
+import os
+from src.main import run_full_pipeline
+from src.watch import IncrementalPipeline
+from src import analyze
+
+HEADER = "student_id,last_name,first_name,section,quiz1,quiz2,quiz3,quiz4,quiz5,midterm,final,attendance_percent\n"
+ROWS = [
+    "1,Eman,nuel,S01,88,92,100,95,89,85,91,95\n",
+    "2,Jarapojop,Amor,S02,95,90,98,99,100,92,96,88\n",
+    "3,General,Hugo,S01,75,80,70,82,,80,85,92\n",
+    "4,Dewey,Arpa,S02,105,99,100,98,97,95,94,100\n",
+    "5,Jamelito,jhamell,S03,50,65,70,55,60,72,68,75\n",
+]
+
+def output_files(directory):
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            files[name] = f.read()
+    return files
+
+def assert_matches_full_run(tmp_path, pipeline_config, pipeline):
+    reference = pipeline_config('reference', tmp_path / 'input.csv')
+    for name in os.listdir(tmp_path / 'reference') if (tmp_path / 'reference').exists() else []:
+        os.remove(tmp_path / 'reference' / name)
+    records = run_full_pipeline(reference)
+    assert output_files(tmp_path / 'watched') == output_files(tmp_path / 'reference')
+    assert pipeline.records == records
+    assert pipeline.statistics() == analyze.calculate_statistics(records, 'final_grade')
+
+# --- Test 1: Appends, edits and a new top scorer give the same files as a full run ---
+def test_incremental_refresh_matches_full_pipeline(tmp_path, pipeline_config):
+    # 1. Arrange
+    csv_path = tmp_path / 'input.csv'
+    csv_path.write_text(HEADER + ''.join(ROWS))
+    pipeline = IncrementalPipeline(pipeline_config('watched', tmp_path / 'input.csv'))
+    pipeline.refresh()
+    assert_matches_full_run(tmp_path, pipeline_config, pipeline)
+
+    # 2. Act: edit one S03 row (the curve stays the same) and append a bad row
+    edited = ROWS[:4] + ["5,Jamelito,jhamell,S03,60,65,70,55,60,72,68,90\n", "6,Bad,Row,S01,abc,1,1,1,1,1,1,1\n"]
+    csv_path.write_text(HEADER + ''.join(edited))
+    summary = pipeline.refresh()
+
+    # 3. Assert: only S03 was rewritten (its student left the at-risk report)
+    assert summary['rows_changed'] == 2
+    assert not summary['curve_changed']
+    assert 'section_S03_report.csv' in summary['files_written']
+    assert 'section_S01_report.csv' not in summary['files_written']
+    assert summary['bad_rows'] == 2  # row 4 (score 105) and the new row 6
+    assert_matches_full_run(tmp_path, pipeline_config, pipeline)
+
+    # 4. Act: a new top scorer moves the curve, so every grade changes
+    csv_path.write_text(HEADER + ''.join(edited) + "7,Top,Scorer,S04,100,100,100,100,100,100,100,100\n")
+    summary = pipeline.refresh()
+
+    # 5. Assert
+    assert summary['curve_changed']
+    assert_matches_full_run(tmp_path, pipeline_config, pipeline)
+
+    # 6. Act: the top scorer leaves and a section empties, the old max is back
+    csv_path.write_text(HEADER + ''.join(edited[:4]))
+    summary = pipeline.refresh()
+
+    # 7. Assert
+    assert summary['rows_removed'] == 3
+    assert 'section_S03_report.csv' in summary['files_deleted']
+    assert_matches_full_run(tmp_path, pipeline_config, pipeline)
+
+# --- Test 2: poll() does nothing while the file is unchanged ---
+def test_poll_skips_unchanged_file(tmp_path, pipeline_config):
+    # 1. Arrange
+    (tmp_path / 'input.csv').write_text(HEADER + ''.join(ROWS))
+    pipeline = IncrementalPipeline(pipeline_config('watched', tmp_path / 'input.csv'))
+
+    # 2. Act
+    first = pipeline.poll()
+    second = pipeline.poll()
+
+    # 3. Assert
+    assert first['rows_changed'] == len(ROWS)
+    assert second is None
+
+# --- Test 3: Moved rows and a new header give the same files as a full run ---
+def test_reorder_and_new_header_match_full_pipeline(tmp_path, pipeline_config):
+    # 1. Arrange
+    csv_path = tmp_path / 'input.csv'
+    csv_path.write_text(HEADER + ''.join(ROWS))
+    pipeline = IncrementalPipeline(pipeline_config('watched', tmp_path / 'input.csv'))
+    pipeline.refresh()
+
+    # 2. Act: the same rows, students 1 and 3 swapped
+    csv_path.write_text(HEADER + ''.join([ROWS[2], ROWS[1], ROWS[0], ROWS[3], ROWS[4]]))
+    summary = pipeline.refresh()
+
+    # 3. Assert: nothing changed content, but the S01 report order did
+    assert summary['rows_changed'] == 0
+    assert 'section_S01_report.csv' in summary['files_written']
+    assert_matches_full_run(tmp_path, pipeline_config, pipeline)
+
+    # 4. Act: section moves to the last column, and the only S03 student joins S02
+    def section_last(line):
+        values = line.rstrip('\n').split(',')
+        return ','.join(values[:3] + values[4:] + [values[3]]) + '\n'
+    moved = ROWS[:4] + [ROWS[4].replace('S03', 'S02')]
+    csv_path.write_text(''.join(map(section_last, [HEADER] + moved)))
+    summary = pipeline.refresh()
+
+    # 5. Assert: the S03 report from the old header's rows is gone
+    assert 'section_S03_report.csv' in summary['files_deleted']
+    assert_matches_full_run(tmp_path, pipeline_config, pipeline)